@@ -1,8 +1,7 @@
 import streamlit as st
-from streamlit_autorefresh import st_autorefresh
 import time
-from modules.Quant_A.dashboard import render_quant_a_dashboard
-from modules.Quant_B.dashboard import render_quant_b_dashboard
+from modules.core.result_cache import get_result_cache
+from modules.core.instrumentation import METRICS_EXPORT, enabled, get_registry, timed
 
 # Page configuration
 st.set_page_config(
@@ -14,8 +13,46 @@ st.set_page_config(
 # Initialisation de l'état pour l'heure de mise à jour si elle n'existe pas
 if 'last_update' not in st.session_state:
     st.session_state['last_update'] = None
+if 'next_data_update' not in st.session_state:
+    st.session_state['next_data_update'] = None
+
+REFRESH_INTERVAL = 300
+
+
+@st.fragment(run_every=1)
+def render_refresh_clock(auto_refresh: bool):
+    """Countdown ticking every second on its own: only this fragment reruns, not the dashboards"""
+    if not auto_refresh:
+        st.session_state["next_data_update"] = None
+        st.info("Auto-refresh disabled")
+        return
+
+    now = time.time()
+    if st.session_state["next_data_update"] is None:
+        st.session_state["next_data_update"] = now + REFRESH_INTERVAL
+
+    if now >= st.session_state["next_data_update"]:
+        # data refresh: the whole page reruns once and picks up the new bars
+        st.session_state["next_data_update"] = now + REFRESH_INTERVAL
+        st.rerun(scope="app")
+
+    remaining = max(0, int(st.session_state["next_data_update"] - now))
+    st.info(f"Next refresh in: {remaining // 60} min {remaining % 60:02d} s")
+
+
+def render_debug_panel():
+    """Stage latencies of this server process, shown when INSTRUMENTATION=1"""
+    registry = get_registry()
+    with st.sidebar.expander("Debug: stage timings"):
+        table = registry.summary()
+        if table.empty:
+            st.caption("No samples yet")
+        else:
+            st.dataframe(table.round(2))
+        col1, col2 = st.columns(2)
+        col1.download_button("Prometheus", registry.to_prometheus(), "metrics.prom")
+        col2.download_button("JSON lines", registry.to_json_lines(), "metrics.jsonl")
 
-st_autorefresh(interval=1000, key="ui_clock")
 
 def main():
     st.markdown('<h1 style="text-align: center; color: #1f77b4;"> Quantitative Finance Dashboard</h1>',
@@ -39,34 +76,27 @@ def main():
         - Daily automated reports
         """)
 
-    REFRESH_INTERVAL = 300
-
-    if auto_refresh:
-        now = time.time()
-        if st.session_state["next_data_update"] is None:
-            st.session_state["next_data_update"] =  now+ REFRESH_INTERVAL
-
-        if now >= st.session_state["next_data_update"]:
-            st.session_state["next_data_update"] = now + REFRESH_INTERVAL
-
-        remaining = int(st.session_state["next_data_update"] - time.time())
-        remaining = max(0, remaining)
-        st.sidebar.info(
-            f"Next refresh in: {remaining // 60} min {remaining % 60:02d} s"
-        )
-    else:
-        st.session_state["next_data_update"] = None
-        st.sidebar.info("Auto-refresh disabled")
-
+    with st.sidebar:
+        render_refresh_clock(auto_refresh)
 
     if page_selection == "Single Asset Analysis (Quant A)":
         st.sidebar.subheader("Module Quant A")
-        render_quant_a_dashboard()
+        # dashboards are imported on first use: only the selected module's dependencies are loaded
+        from modules.Quant_A.dashboard import render_quant_a_dashboard
+        with timed("render.quant_a"):
+            render_quant_a_dashboard()
     else:
         st.sidebar.subheader("Module Quant B")
-        render_quant_b_dashboard()
+        from modules.Quant_B.dashboard import render_quant_b_dashboard
+        with timed("render.quant_b"):
+            render_quant_b_dashboard()
     #Footer
     st.sidebar.markdown("---")
+    st.sidebar.caption(f"Result cache: {get_result_cache().summary()}")
+    if enabled():
+        render_debug_panel()
+        if METRICS_EXPORT:
+            get_registry().export(METRICS_EXPORT)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,51 @@
+"""
+Rebalancing speed: previous per-date loop vs the vectorized segment engine
+
+    python -m benchmarks.bench_rebalancing
+"""
+import time
+import numpy as np
+import pandas as pd
+from modules.core.providers import synthetic_panel
+from modules.Quant_B.rebalancing import simulate_rebalancing
+
+SIZES = [(1260, 10), (1260, 300), (5040, 1000), (25200, 2000)]
+
+
+def legacy_compute_portfolio_value(prices, weights, rebal_freq_days, start_capital=1_000_000):
+    """Discrete-rebalancing branch of compute_portfolio_value before the vectorized engine"""
+    dates = prices.index
+    n_assets = prices.shape[1]
+    pv = pd.Series(index=dates, dtype=float)
+    last_rebal_idx = 0
+    current_shares = np.zeros(n_assets)
+    for i, date in enumerate(dates):
+        if i == 0 or (i - last_rebal_idx) >= rebal_freq_days:
+            px = prices.iloc[i]
+            current_shares = (weights * start_capital) / px.values
+            last_rebal_idx = i
+        pv.iloc[i] = (prices.iloc[i].values * current_shares).sum()
+    return pv
+
+
+def best_of(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    print(f"{'bars':>7} {'assets':>6} {'loop (s)':>10} {'engine (s)':>11} {'speedup':>8}")
+    for n_bars, n_assets in SIZES:
+        prices = synthetic_panel(n_assets, n_bars, seed=0)
+        weights = np.full(n_assets, 1 / n_assets)
+        engine = best_of(lambda: simulate_rebalancing(prices, weights, rule=21))
+        loop = best_of(lambda: legacy_compute_portfolio_value(prices, weights, 21), repeat=1)
+        print(f"{n_bars:>7} {n_assets:>6} {loop:>10.3f} {engine:>11.4f} {loop / engine:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
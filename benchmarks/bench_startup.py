@@ -0,0 +1,53 @@
+"""
+Cold-start import time of the compute modules, each in a fresh interpreter
+
+    python -m benchmarks.bench_startup
+
+Also reports which heavy packages an import drags in: batch jobs and worker
+processes should load neither streamlit nor plotly.
+"""
+import sys
+import json
+import subprocess
+
+MODULES = [
+    "pandas",
+    "modules.core.analytics",
+    "modules.Quant_A.strategies",
+    "modules.Quant_A.data_fetcher",
+    "modules.Quant_B.qwant_b",
+    "modules.Quant_B.risk",
+    "modules.reports.daily",
+    "modules.Quant_A.dashboard",
+    "modules.Quant_B.dashboard",
+]
+HEAVY = ["streamlit", "plotly", "yfinance", "scipy"]
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str, repeat: int = 3) -> dict:
+    """Best of `repeat` cold imports of `module`"""
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+                             capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return min(runs, key=lambda r: r["seconds"])
+
+
+def main():
+    print(f"{'module':<30} {'import (ms)':>11}  heavy dependencies loaded")
+    for module in MODULES:
+        run = measure(module)
+        print(f"{module:<30} {run['seconds'] * 1000:>11.0f}  {', '.join(run['loaded']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
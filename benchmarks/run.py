@@ -0,0 +1,182 @@
+"""
+Benchmark suite of the hot paths on seeded synthetic panels
+
+    python -m benchmarks.run                      # default sizes, compared with the baseline
+    python -m benchmarks.run --sizes full         # up to 10^7 bars and 5,000 assets
+    python -m benchmarks.run --cases strategies   # cases whose name starts with "strategies"
+    python -m benchmarks.run --save-baseline      # make this run the new reference
+
+Every measurement (wall time, peak memory, bars/sec) is appended to a JSON-lines history
+together with the commit and library versions. When a baseline exists, cases more than
+--tolerance slower (or heavier) than it are reported and the exit code is 1.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+import tracemalloc
+import numpy as np
+import pandas as pd
+from modules.core.providers import synthetic_panel
+from modules.Quant_A.strategies import TradingStrategies
+from modules.Quant_A.metrics import PerformanceMetrics
+from modules.Quant_B.qwant_b import compute_portfolio_value, compute_returns
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HISTORY = os.path.join(HERE, "results", "history.jsonl")
+DEFAULT_BASELINE = os.path.join(HERE, "baseline.json")
+
+# single: bars of one asset, panel: (bars, assets)
+SIZES = {
+    "quick": {"single": [10 ** 3, 10 ** 4, 10 ** 5], "panel": [(1260, 10), (1260, 100)]},
+    "default": {"single": [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6], "panel": [(1260, 10), (1260, 300), (5040, 1000)]},
+    "full": {"single": [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7],
+             "panel": [(1260, 10), (1260, 300), (5040, 1000), (2520, 5000)]},
+}
+
+
+def synthetic_prices(n_bars: int, n_assets: int, seed: int = 0) -> pd.DataFrame:
+    # minute bars beyond ~200 years of daily data, to stay within the timestamp range
+    return synthetic_panel(n_assets, n_bars, seed=seed, interval="1d" if n_bars <= 50_000 else "1m")
+
+
+def _single(n_bars, n_assets, seed):
+    return synthetic_prices(n_bars, 1, seed).iloc[:, 0]
+
+
+def _strategy_frame(n_bars, n_assets, seed):
+    return TradingStrategies.sma_crossover(_single(n_bars, n_assets, seed))
+
+
+def _panel(n_bars, n_assets, seed):
+    return synthetic_prices(n_bars, n_assets, seed)
+
+
+def _returns(n_bars, n_assets, seed):
+    return compute_returns(_panel(n_bars, n_assets, seed))
+
+
+# name -> (grid, setup(n_bars, n_assets, seed) -> input, timed function of the input)
+CASES = {
+    "strategies.buy_and_hold": ("single", _single, TradingStrategies.buy_and_hold),
+    "strategies.sma_crossover": ("single", _single, TradingStrategies.sma_crossover),
+    "strategies.momentum": ("single", _single, TradingStrategies.momentum),
+    "strategies.mean_reversion": ("single", _single, TradingStrategies.mean_reversion),
+    "metrics.calculate_all_metrics": ("single", _strategy_frame, PerformanceMetrics.calculate_all_metrics),
+    "qwant_b.compute_returns": ("panel", _panel, compute_returns),
+    "qwant_b.compute_portfolio_value": (
+        "panel", _panel, lambda prices: compute_portfolio_value(prices, np.full(prices.shape[1], 1 / prices.shape[1]), 21)
+    ),
+    "returns.corr": ("panel", _returns, lambda returns: returns.corr()),
+}
+
+
+def measure(fn, data, repeat: int = 3) -> dict:
+    """Best wall time over `repeat` calls, then one traced call for the peak memory"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(data)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn(data)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(times), "peak_mb": peak / 2 ** 20}
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "numpy": np.__version__,
+            "pandas": pd.__version__, "machine": platform.machine(), "cpus": os.cpu_count()}
+
+
+def run_suite(sizes: str = "default", cases=None, seed: int = 0, repeat: int = 3):
+    """Run the selected cases over the size grid; yields one record per (case, size)"""
+    for name, (grid, setup, fn) in CASES.items():
+        if cases and not any(name.startswith(c) for c in cases):
+            continue
+        for size in SIZES[sizes][grid]:
+            n_bars, n_assets = (size, 1) if grid == "single" else size
+            data = setup(n_bars, n_assets, seed)
+            record = {"case": name, "n_bars": n_bars, "n_assets": n_assets, **measure(fn, data, repeat)}
+            record["bars_per_sec"] = n_bars * n_assets / record["seconds"]
+            del data
+            yield record
+
+
+def compare(records, baseline: dict, tolerance: float) -> list:
+    """Records slower or heavier than the baseline by more than `tolerance` (fraction)"""
+    regressions = []
+    for r in records:
+        ref = baseline.get(f"{r['case']}|{r['n_bars']}|{r['n_assets']}")
+        if ref is None:
+            continue
+        r["time_ratio"] = r["seconds"] / ref["seconds"]
+        r["memory_ratio"] = r["peak_mb"] / ref["peak_mb"] if ref["peak_mb"] > 0 else 1.0
+        # ignore timer noise under 0.5 ms and memory noise under 1 MB
+        slower = r["time_ratio"] > 1 + tolerance and r["seconds"] - ref["seconds"] > 5e-4
+        heavier = r["memory_ratio"] > 1 + tolerance and r["peak_mb"] - ref["peak_mb"] > 1
+        if slower or heavier:
+            regressions.append(r)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark strategies, metrics and portfolio valuation")
+    parser.add_argument("--sizes", choices=list(SIZES), default="default")
+    parser.add_argument("--cases", nargs="*", help="case name prefixes (default: all)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="timed calls per case (best kept)")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON-lines file the results are appended to")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before flagging")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    env = environment()
+    stamp = pd.Timestamp.now(tz="UTC").isoformat()
+    os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+    records = []
+    print(f"{'case':<34} {'bars':>9} {'assets':>6} {'time (ms)':>10} {'peak (MB)':>10} {'bars/s':>10} {'vs base':>8}")
+    with open(args.history, "a") as history:
+        for r in run_suite(args.sizes, args.cases, args.seed, args.repeat):
+            ref = baseline.get(f"{r['case']}|{r['n_bars']}|{r['n_assets']}")
+            ratio = f"{r['seconds'] / ref['seconds']:.2f}x" if ref else "-"
+            print(f"{r['case']:<34} {r['n_bars']:>9} {r['n_assets']:>6} {r['seconds'] * 1000:>10.2f} "
+                  f"{r['peak_mb']:>10.1f} {r['bars_per_sec']:>10.3g} {ratio:>8}", flush=True)
+            history.write(json.dumps({"timestamp": stamp, "sizes": args.sizes, "seed": args.seed, **env, **r}) + "\n")
+            records.append(r)
+
+    if args.save_baseline:
+        # cases not run this time keep their previous reference
+        baseline.update({f"{r['case']}|{r['n_bars']}|{r['n_assets']}": r for r in records})
+        with open(args.baseline, "w") as f:
+            json.dump({"timestamp": stamp, **env, "results": baseline}, f, indent=1)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    regressions = compare(records, baseline, args.tolerance)
+    for r in regressions:
+        print(f"REGRESSION {r['case']} {r['n_bars']}x{r['n_assets']}: "
+              f"time {r['time_ratio']:.2f}x, memory {r['memory_ratio']:.2f}x baseline")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+# Columns produced by every backtest, after the strategy-specific ones
+BACKTEST_COLUMNS = ["Position", "Returns", "Strategy_Returns", "Cumulative_Returns", "Portfolio_Value"]
+
+
+def run_backtest(price: np.ndarray, signal: np.ndarray, initial_capital: float = 10000,
+                 out: np.ndarray = None) -> dict:
+    """
+    Core backtest on contiguous float64 arrays: signal -> next-bar position -> returns -> compounded value
+
+    Time is the last axis, so a panel (n_assets, T) is backtested column-wise in one pass.
+
+    Args:
+        price: (..., T) prices
+        signal: (..., T) target exposure decided at each bar close
+        initial_capital: starting capital
+        out: optional preallocated (5, ..., T) buffer, reused across calls by batch jobs
+
+    Returns:
+        Dictionary column name -> array (rows of `out` when given), NaN on the first bar
+        like the pandas implementation
+    """
+    if out is None:
+        out = np.empty((len(BACKTEST_COLUMNS),) + price.shape)
+    position, returns, strategy_returns, cumulative, value = out
+
+    position[..., 0] = np.nan
+    position[..., 1:] = signal[..., :-1]  # trade on next bar
+
+    returns[..., 0] = np.nan
+    np.divide(price[..., 1:], price[..., :-1], out=returns[..., 1:])
+    returns[..., 1:] -= 1.0
+
+    np.multiply(returns, position, out=strategy_returns)
+
+    # compound, skipping missing bars like pandas cumprod does
+    missing = np.isnan(strategy_returns)
+    np.add(strategy_returns, 1.0, out=cumulative)
+    cumulative[missing] = 1.0
+    np.cumprod(cumulative, axis=-1, out=cumulative)
+    cumulative[missing] = np.nan
+
+    np.multiply(cumulative, initial_capital, out=value)
+    return dict(zip(BACKTEST_COLUMNS, out))
+
+
+class BacktestResult:
+    """
+    Backtest output kept as NumPy arrays
+
+    Columns are exposed as pandas Series on access (no copy) and the full
+    DataFrame is only built by to_frame(), e.g. for a CSV export. Other DataFrame
+    attributes (iloc, tail, plot, ...) are served by that DataFrame, so code written
+    for the former DataFrame return type keeps working.
+    """
+
+    def __init__(self, index: pd.Index, arrays: dict):
+        self.index = index
+        self.arrays = arrays  # column name -> ndarray, in DataFrame column order
+
+    @property
+    def columns(self) -> list:
+        return list(self.arrays)
+
+    @property
+    def empty(self) -> bool:
+        return len(self.index) == 0
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.arrays
+
+    def __getitem__(self, column):
+        if isinstance(column, list):
+            return self.to_frame()[column]
+        return pd.Series(self.arrays[column], index=self.index, name=column, copy=False)
+
+    def __getattr__(self, name: str):
+        if name.startswith("_") or name in ("index", "arrays"):
+            raise AttributeError(name)
+        return getattr(self.to_frame(), name)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Materialize the classic strategy DataFrame"""
+        return pd.DataFrame(self.arrays, index=self.index)
+
+    def to_csv(self, *args, **kwargs):
+        return self.to_frame().to_csv(*args, **kwargs)
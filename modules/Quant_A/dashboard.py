@@ -3,9 +3,23 @@ import time
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
+import numpy as np
 from modules.Quant_A.data_fetcher import DataFetcher
-from modules.Quant_A.strategies import TradingStrategies
+from modules.Quant_A.strategies import TradingStrategies, OnlineStrategy, ONLINE_STRATEGIES
 from modules.Quant_A.metrics import PerformanceMetrics
+from modules.Quant_A.sweeps import ParameterSweep
+from modules.Quant_A.walk_forward import WalkForward
+from modules.core.rolling import rolling_metrics
+from modules.core.charts import line_trace, plotly_chart, rolling_metrics_figure, zoom_slider
+from modules.core.instrumentation import timed
+from modules.core.result_cache import get_result_cache, make_key
+
+# Parameter grids explored by the sweep heatmap and the walk-forward optimizer
+SWEEP_GRIDS = {
+    "SMA Crossover": {"short_windows": np.arange(5, 51), "long_windows": np.arange(20, 201, 2)},
+    "Momentum": {"lookbacks": np.arange(5, 61)},
+    "Mean Reversion": {"windows": np.arange(10, 51), "entry_stds": np.round(np.arange(1.0, 3.01, 0.1), 1)},
+}
 
 def render_quant_a_dashboard():
     """Main dashboard for single asset analysis"""
@@ -66,64 +80,83 @@ def render_quant_a_dashboard():
     prices = historical_data['Close']
 
     if strategy_type == "Buy & Hold":
-        strategy_df = TradingStrategies.buy_and_hold(prices, initial_capital)
+        params = {}
+        run = lambda: TradingStrategies.buy_and_hold(prices, initial_capital)
 
     elif strategy_type == "SMA Crossover":
         short_window = st.sidebar.slider("Short MA Window", 5, 50, 20)
         long_window = st.sidebar.slider("Long MA Window", 20, 200, 50)
-        strategy_df = TradingStrategies.sma_crossover(prices, short_window, long_window, initial_capital)
+        params = {"short_window": short_window, "long_window": long_window}
+        run = lambda: TradingStrategies.sma_crossover(prices, short_window, long_window, initial_capital)
 
     elif strategy_type == "Momentum":
         lookback = st.sidebar.slider("Lookback Period (days)", 5, 60, 20)
-        strategy_df = TradingStrategies.momentum(prices, lookback, initial_capital)
+        params = {"lookback": lookback}
+        run = lambda: TradingStrategies.momentum(prices, lookback, initial_capital)
 
     else:  # Mean Reversion
         window = st.sidebar.slider("Bollinger Band Window", 10, 50, 20)
         entry_std = st.sidebar.slider("Entry Std Dev", 1.0, 3.0, 2.0, 0.1)
-        strategy_df = TradingStrategies.mean_reversion(prices, window, entry_std, initial_capital)
+        params = {"window": window, "entry_std": entry_std}
+        run = lambda: TradingStrategies.mean_reversion(prices, window, entry_std, initial_capital)
+
+    # one computation per (inputs, data version), shared by every session until the data changes
+    cache = get_result_cache()
+    backtest_key = make_key("quant_a.backtest", ticker, period, strategy_type, params, initial_capital, prices)
+    strategy_df = cache.get_or_compute(backtest_key, run)
 
     # Main chart: Price + Strategy Performance
     st.subheader("Asset Price vs Strategy Performance")
 
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-    # Add price trace
-    fig.add_trace(
-        go.Scatter(
-            x=strategy_df.index,
-            y=strategy_df['Price'],
-            name="Asset Price",
-            line=dict(color='#1f77b4', width=2)
-        ),
-        secondary_y=False
-    )
+    # Zoom: the selected range is plotted at full resolution up to the point budget
+    zoom_start, zoom_end = zoom_slider(strategy_df.index, key="quant_a_zoom")
 
-    # Add strategy portfolio value trace
-    fig.add_trace(
-        go.Scatter(
-            x=strategy_df.index,
-            y=strategy_df['Portfolio_Value'],
-            name="Portfolio Value",
-            line=dict(color='#2ca02c', width=2)
-        ),
-        secondary_y=True
-    )
+    with timed("figure.quant_a.price"):
+        fig = make_subplots(specs=[[{"secondary_y": True}]])
 
-    fig.update_layout(
-        height=600,
-        hovermode='x unified',
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-    )
+        # Add price trace
+        fig.add_trace(
+            line_trace(
+                strategy_df['Price'].loc[zoom_start:zoom_end],
+                name="Asset Price",
+                line=dict(color='#1f77b4', width=2)
+            ),
+            secondary_y=False
+        )
+
+        # Add strategy portfolio value trace
+        fig.add_trace(
+            line_trace(
+                strategy_df['Portfolio_Value'].loc[zoom_start:zoom_end],
+                name="Portfolio Value",
+                line=dict(color='#2ca02c', width=2)
+            ),
+            secondary_y=True
+        )
+
+        fig.update_layout(
+            height=600,
+            hovermode='x unified',
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+        )
+
+        fig.update_yaxes(title_text="Asset Price ($)", secondary_y=False)
+        fig.update_yaxes(title_text="Portfolio Value ($)", secondary_y=True)
 
-    fig.update_yaxes(title_text="Asset Price ($)", secondary_y=False)
-    fig.update_yaxes(title_text="Portfolio Value ($)", secondary_y=True)
+    plotly_chart(fig, stage="quant_a.price", use_container_width=True)
 
-    st.plotly_chart(fig, use_container_width=True)
+    # Rolling analytics under the equity curve
+    rolling_window = st.select_slider("Rolling window (bars)", options=[21, 63, 126, 252], value=63,
+                                      key="quant_a_rolling_window")
+    rolling = cache.get_or_compute(f"{backtest_key}:rolling:{rolling_window}",
+                                   lambda: rolling_metrics(strategy_df['Strategy_Returns'], rolling_window))
+    plotly_chart(rolling_metrics_figure(rolling), stage="quant_a.rolling", use_container_width=True)
 
     # Performance metrics
     st.subheader("Performance Metrics")
 
-    metrics = PerformanceMetrics.calculate_all_metrics(strategy_df)
+    metrics = cache.get_or_compute(f"{backtest_key}:metrics",
+                                   lambda: PerformanceMetrics.calculate_all_metrics(strategy_df))
 
     col1, col2, col3 = st.columns(3)
     col1.metric("Total Return", f"{metrics['Total Return (%)']:.2f}%")
@@ -140,6 +173,103 @@ def render_quant_a_dashboard():
         metrics_df = pd.DataFrame.from_dict(metrics, orient='index', columns=['Value'])
         st.dataframe(metrics_df, use_container_width=True)
 
+        if st.checkbox("Bootstrap 95% confidence intervals (10,000 resamples)"):
+            intervals = cache.get_or_compute(f"{backtest_key}:bootstrap",
+                                             lambda: PerformanceMetrics.bootstrap_metrics(strategy_df, seed=0))
+            st.dataframe(intervals.round(4), use_container_width=True)
+
+    render_live_signal(ticker, period, strategy_type, params, prices, initial_capital)
+    render_parameter_sweep(prices, strategy_type)
+    render_walk_forward(prices, strategy_type, initial_capital)
+
+
+def render_live_signal(ticker: str, period: str, strategy_type: str, params: dict, prices: pd.Series,
+                       initial_capital: float = 10000):
+    """Current position from the incremental strategy kept in the session (only new bars are processed)"""
+    key = f"online::{ticker}::{period}::{strategy_type}::{sorted(params.items())}::{initial_capital}"
+    saved = st.session_state.get(key)
+    strategy = OnlineStrategy.from_dict(saved) if saved else ONLINE_STRATEGIES[strategy_type](initial_capital=initial_capital, **params)
+    strategy.advance(prices)
+    st.session_state[key] = strategy.to_dict()
+
+    labels = {1.0: "Long", 0.0: "Flat", -1.0: "Short"}
+    col1, col2 = st.columns(2)
+    col1.metric("Live Signal (next bar)", labels.get(strategy.signal, f"{strategy.signal:.2f}"))
+    col2.metric("Live Cumulative Return", f"{(strategy.cumulative - 1) * 100:.2f}%")
+
+
+def render_parameter_sweep(prices: pd.Series, strategy_type: str):
+    """Heatmap of one metric over the whole parameter grid of the selected strategy"""
+    if strategy_type == "Buy & Hold":
+        return
+
+    with st.expander("Parameter Sweep"):
+        metric = st.selectbox(
+            "Metric",
+            ["Sharpe Ratio", "Total Return (%)", "Max Drawdown (%)", "Win Rate (%)", "Volatility (Annual %)"],
+            key="sweep_metric"
+        )
+
+        grid = SWEEP_GRIDS[strategy_type]
+        if strategy_type == "SMA Crossover":
+            sweep = ParameterSweep.sma_crossover
+        elif strategy_type == "Momentum":
+            sweep = ParameterSweep.momentum
+        else:
+            sweep = ParameterSweep.mean_reversion
+        result = get_result_cache().get_or_compute(make_key("quant_a.sweep", strategy_type, prices),
+                                                   lambda: sweep(prices, *grid.values()))
+
+        grid = result.grid(metric)
+        if grid.shape[1] == 1:
+            fig = go.Figure(go.Scatter(x=grid.index, y=grid[metric], mode="lines+markers"))
+            fig.update_layout(height=400, xaxis_title=grid.index.name, yaxis_title=metric)
+        else:
+            fig = go.Figure(go.Heatmap(z=grid.values, x=grid.columns, y=grid.index, colorscale="Viridis",
+                                       colorbar=dict(title=metric)))
+            fig.update_layout(height=500, xaxis_title=grid.columns.name, yaxis_title=grid.index.name)
+        plotly_chart(fig, stage="quant_a.sweep", use_container_width=True)
+
+        best = result.best(metric)
+        st.caption("Best parameters: " + ", ".join(f"{k} = {v:.2f}" if isinstance(v, float) else f"{k} = {v}"
+                                                   for k, v in best.items()))
+
+
+def render_walk_forward(prices: pd.Series, strategy_type: str, initial_capital: float):
+    """Out-of-sample check of the parameter grid: optimize on each training window, trade the next test window"""
+    if strategy_type == "Buy & Hold":
+        return
+
+    with st.expander("Walk-Forward Analysis"):
+        col1, col2, col3 = st.columns(3)
+        train_size = col1.number_input("Training window (bars)", min_value=50, value=252, step=21)
+        test_size = col2.number_input("Test window (bars)", min_value=5, value=63, step=21)
+        expanding = col3.checkbox("Expanding training window", value=False)
+
+        if len(prices) <= train_size:
+            st.info("Not enough history for one training window, pick a longer period.")
+            return
+        if not st.button("Run walk-forward"):
+            return
+
+        with st.spinner("Optimizing folds..."):
+            result = WalkForward.run(prices, strategy_type, SWEEP_GRIDS[strategy_type], int(train_size),
+                                     int(test_size), expanding, initial_capital=initial_capital)
+
+        buy_hold = initial_capital * prices.loc[result.equity.index] / prices.loc[result.equity.index].iloc[0]
+        fig = go.Figure()
+        fig.add_trace(line_trace(result.equity, name="Walk-forward (out-of-sample)"))
+        fig.add_trace(line_trace(buy_hold, name="Buy & Hold", line=dict(dash="dot")))
+        fig.update_layout(height=400, yaxis_title="Portfolio Value ($)")
+        plotly_chart(fig, stage="quant_a.walk_forward", use_container_width=True)
+
+        oos = result.metrics()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("OOS Total Return", f"{oos['Total Return (%)']:.2f}%")
+        col2.metric("OOS Sharpe Ratio", f"{oos['Sharpe Ratio']:.2f}")
+        col3.metric("OOS Max Drawdown", f"{oos['Max Drawdown (%)']:.2f}%")
+        st.dataframe(result.folds.round(3), use_container_width=True, hide_index=True)
+
 
 if __name__ == "__main__":
     render_quant_a_dashboard()
\ No newline at end of file
@@ -1,8 +1,11 @@
-import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
-import streamlit as st
 import numpy as np
+from modules.core.price_store import get_price_store
+from modules.core.fetch_coordinator import get_coordinator
+from modules.core.ingestion import read_latest_bars
+from modules.core.runtime import cache_data, report_error
+from modules.core.instrumentation import timed
 
 class DataFetcher:
     """Fetch and cache financial data for single assets"""
@@ -16,12 +19,21 @@ class DataFetcher:
             "^GSPC": "S&P 500"
         }
 
-    @st.cache_data(ttl=300)  # Cache for 5 minutes
-    def fetch_realtime_price(_self, ticker: str) -> dict:
-        """Fetch current price and basic info"""
+    @cache_data(ttl=300)  # Cache for 5 minutes
+    def _fetch_intraday(_self, ticker: str) -> pd.DataFrame:
+        """Today's 1-minute bars straight from the provider"""
+        return get_coordinator().fetch([ticker], interval="1m", period="1d")[ticker]
+
+    @timed("fetch.realtime")
+    def fetch_realtime_price(self, ticker: str) -> dict:
+        """Fetch current price and basic info (from the ingestion ring buffer when it is running)"""
         try:
-            stock = yf.Ticker(ticker)
-            history = stock.history(period="1d", interval="1m")
+            history = read_latest_bars(ticker, interval="1m")
+            if history is not None:
+                # keep the last session only
+                history = history[history.index.normalize() == history.index[-1].normalize()]
+            else:
+                history = self._fetch_intraday(ticker)
 
             if history.empty:
                 return None
@@ -36,15 +48,16 @@ class DataFetcher:
                 "volume": int(history['Volume'].sum())
             }
         except Exception as e:
-            st.error(f"Error fetching data for {ticker}: {e}")
+            report_error(f"Error fetching data for {ticker}: {e}")
             return None
 
-    @st.cache_data(ttl=600)
-    def fetch_historical_data(_self, ticker: str, period: str = "1y") -> pd.DataFrame:
-        """Fetch historical OHLCV data"""
+    @timed("fetch.historical")
+    @cache_data(ttl=600)
+    def fetch_historical_data(_self, ticker: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
+        """Fetch historical OHLCV data (served from the local price store, only new bars are downloaded)"""
         try:
-            data = yf.download(ticker, period=period, progress=False)
+            data = get_price_store().fetch(ticker, period=period, interval=interval)
             return data
         except Exception as e:
-            st.error(f"Error fetching historical data: {e}")
+            report_error(f"Error fetching historical data: {e}")
             return pd.DataFrame()
\ No newline at end of file
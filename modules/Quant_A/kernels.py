@@ -0,0 +1,121 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from modules.core.analytics import metric_arrays, METRIC_NAMES
+
+# Array building blocks shared by the vectorized strategy engines.
+# Time is always the last axis, so a single series (T,), a parameter grid
+# (n_params, T) or a panel (n_assets, T) go through the same code.
+
+
+def _window_sums(x: np.ndarray, window: int, squares: bool = False, block: int = 256):
+    """
+    Sums (and sums of squares) of the valid values and number of valid values in each full
+    window along the last axis, for the windows ending at bars window-1 .. T-1
+
+    The windows are cut in blocks of `block`, each block summed from its own overlapping
+    segment of block + window - 1 bars, so rounding errors never build up along the series.
+    With `squares`, each segment is shifted by its first valid value first (the variance is
+    unchanged, the sums are not the raw sums). NaNs are skipped instead of spreading.
+    """
+    valid = ~np.isnan(x)
+    complete = valid.all()
+    if not complete:
+        x = np.where(valid, x, 0.0)
+    n = x.shape[-1] - window + 1
+    step = max(block, window)
+    n_blocks = -(-n // step)
+    widths = [(0, 0)] * (x.ndim - 1) + [(0, n_blocks * step + window - 1 - x.shape[-1])]
+    zero = np.zeros(x.shape[:-1] + (n_blocks, 1))
+
+    def segments(values):
+        padded = np.pad(values, widths)
+        return sliding_window_view(padded, step + window - 1, axis=-1)[..., ::step, :]
+
+    def windows(values):
+        cs = np.concatenate([zero, np.cumsum(values, axis=-1)], axis=-1)
+        return (cs[..., window:] - cs[..., :-window]).reshape(x.shape[:-1] + (-1,))[..., :n]
+
+    seg = segments(x)
+    s2 = None
+    if squares:
+        if complete:
+            seg = seg - seg[..., :1]
+        else:
+            first = np.argmax(segments(valid), axis=-1)[..., None]
+            seg = seg - np.take_along_axis(seg, first, axis=-1)
+        s2 = windows(seg * seg)
+    s = windows(seg)
+    count = np.full(s.shape, float(window)) if complete else windows(segments(valid).astype(np.float64))
+    return s, s2, count
+
+
+def rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """Rolling mean along the last axis through cumulative sums (NaN until the window is full of valid values)"""
+    x = np.asarray(x, dtype=np.float64)
+    out = np.full(x.shape, np.nan)
+    if window > x.shape[-1]:
+        return out
+    s, _, count = _window_sums(x, window, block=2048)
+    out[..., window - 1:] = np.where(count == window, s / window, np.nan)
+    return out
+
+
+def rolling_means(x: np.ndarray, windows) -> np.ndarray:
+    """Rolling means of a 1D series for several windows, sharing one cumulative sum -> (n_windows, T)"""
+    x = np.asarray(x, dtype=np.float64)
+    T = x.shape[-1]
+    valid = ~np.isnan(x)
+    cs = np.concatenate([[0.0], np.cumsum(np.where(valid, x, 0.0))])
+    cn = np.concatenate([[0], np.cumsum(valid)])
+    out = np.full((len(windows), T), np.nan)
+    for i, w in enumerate(windows):
+        if w <= T:
+            out[i, w - 1:] = np.where(cn[w:] - cn[:-w] == w, (cs[w:] - cs[:-w]) / w, np.nan)
+    return out
+
+
+def rolling_std(x: np.ndarray, window: int, ddof: int = 1) -> np.ndarray:
+    """Rolling standard deviation along the last axis through sums of squares"""
+    x = np.asarray(x, dtype=np.float64)
+    out = np.full(x.shape, np.nan)
+    T = x.shape[-1]
+    if window > T or window <= ddof:
+        return out
+    s, s2, count = _window_sums(x, window, squares=True)
+    var = (s2 - s * s / window) / (window - ddof)
+    out[..., window - 1:] = np.where(count == window, np.sqrt(np.maximum(var, 0.0)), np.nan)
+    return out
+
+
+def ffill_nonzero(signal: np.ndarray) -> np.ndarray:
+    """Carry the last non-zero value forward along the last axis (leading zeros stay 0)"""
+    T = signal.shape[-1]
+    idx = np.where(signal != 0, np.arange(T), 0)
+    np.maximum.accumulate(idx, axis=-1, out=idx)
+    return np.take_along_axis(signal, idx, axis=-1)
+
+
+def simple_returns(prices: np.ndarray) -> np.ndarray:
+    """Period returns along the last axis, NaN on the first bar (like pct_change)"""
+    prices = np.asarray(prices, dtype=np.float64)
+    out = np.empty(prices.shape)
+    out[..., 0] = np.nan
+    np.divide(prices[..., 1:], prices[..., :-1], out=out[..., 1:])
+    out[..., 1:] -= 1.0
+    return out
+
+
+def batch_metrics(strategy_returns: np.ndarray, periods_per_year: float = 252,
+                  risk_free_rate: float = 0.02, axis: int = -1) -> dict:
+    """
+    PerformanceMetrics.calculate_all_metrics for many return series at once
+
+    Args:
+        strategy_returns: array of valid strategy returns (first NaN bar already dropped)
+        axis: time axis (axis 0 of a C-ordered array is fastest)
+
+    Returns:
+        Dictionary metric name -> array with the time axis removed
+    """
+    arrays = metric_arrays(strategy_returns, periods_per_year, risk_free_rate, axis=axis)
+    return {name: arrays[name] for name in METRIC_NAMES}
@@ -1,25 +1,29 @@
 import pandas as pd
 import numpy as np
+from modules.Quant_A.kernels import batch_metrics
+from modules.core.analytics import compute_metrics, metric_arrays, periods_per_year, METRIC_NAMES
+
+# Metrics where a lower value is better (used for the bootstrap p-values)
+LOWER_IS_BETTER = {"Volatility (Annual %)"}
+
 
 class PerformanceMetrics:
-    """Calculate trading strategy performance metrics"""
+    """Calculate trading strategy performance metrics (thin wrappers over modules.core.analytics)"""
 
     @staticmethod
-    def sharpe_ratio(returns: pd.Series, risk_free_rate: float = 0.02) -> float:
+    def sharpe_ratio(returns: pd.Series, risk_free_rate: float = 0.02, interval: str = "1d") -> float:
         """
         Calculate annualized Sharpe ratio
 
         Args:
             returns: Series of strategy returns
             risk_free_rate: Annual risk-free rate
+            interval: bar interval used for annualization
 
         Returns:
             Sharpe ratio
         """
-        excess_returns = returns - risk_free_rate/252  # Daily risk-free rate
-        if excess_returns.std() == 0:
-            return 0.0
-        return np.sqrt(252) * excess_returns.mean() / excess_returns.std()
+        return float(compute_metrics(returns, "returns", interval, risk_free_rate)["Sharpe Ratio"].iloc[0])
 
     @staticmethod
     def max_drawdown(cumulative_returns: pd.Series) -> dict:
@@ -29,36 +33,80 @@ class PerformanceMetrics:
         Returns:
             Dictionary with max_drawdown (%), peak date, trough date
         """
-        running_max = cumulative_returns.cummax()
-        drawdown = (cumulative_returns - running_max) / running_max * 100
-
-        max_dd = drawdown.min()
-        max_dd_date = drawdown.idxmin()
-
-        # Find peak before max drawdown
-        peak_date = running_max[:max_dd_date].idxmax()
-
+        table = compute_metrics(cumulative_returns, "nav").iloc[0]
         return {
-            "max_drawdown_pct": max_dd,
-            "peak_date": peak_date,
-            "trough_date": max_dd_date
+            "max_drawdown_pct": table["Max Drawdown (%)"],
+            "peak_date": table.get("Peak Date"),
+            "trough_date": table.get("Trough Date")
         }
 
     @staticmethod
-    def calculate_all_metrics(strategy_df: pd.DataFrame) -> dict:
-        """Calculate comprehensive performance metrics"""
+    def calculate_all_metrics(strategy_df, interval: str = "1d", risk_free_rate: float = 0.02) -> dict:
+        """Calculate comprehensive performance metrics (interval sets the annualization)"""
         returns = strategy_df['Strategy_Returns'].dropna()
-        cum_returns = strategy_df['Cumulative_Returns'].iloc[-1] - 1
-
-        metrics = {
-            "Total Return (%)": cum_returns * 100,
-            "Annualized Return (%)": (1 + cum_returns) ** (252 / len(returns)) - 1 if len(returns) > 0 else 0,
-            "Volatility (Annual %)": returns.std() * np.sqrt(252) * 100,
-            "Sharpe Ratio": PerformanceMetrics.sharpe_ratio(returns),
-            "Max Drawdown (%)": PerformanceMetrics.max_drawdown(strategy_df['Cumulative_Returns'])["max_drawdown_pct"],
-            "Win Rate (%)": (returns > 0).sum() / len(returns) * 100 if len(returns) > 0 else 0,
-            "Best Day (%)": returns.max() * 100,
-            "Worst Day (%)": returns.min() * 100
-        }
+        arrays = metric_arrays(returns.to_numpy(dtype=np.float64), periods_per_year(interval), risk_free_rate)
+        return {name: float(arrays[name]) for name in METRIC_NAMES}
+
+
+    @staticmethod
+    def bootstrap_metrics(strategy_df, n_resamples: int = 10000, block_size: int = 20,
+                          confidence: float = 0.95, memory_budget_mb: float = 256,
+                          seed: int = None) -> pd.DataFrame:
+        """
+        Confidence intervals of every calculate_all_metrics value by circular block bootstrap
+
+        Strategy and buy-and-hold returns are resampled with the same blocks, so the
+        p-value is the share of resamples where the strategy does not beat buy and hold.
+        Resamples are drawn as (n_days x chunk) arrays, chunked to fit `memory_budget_mb`.
+
+        Args:
+            strategy_df: strategy output (DataFrame or BacktestResult)
+            n_resamples: number of bootstrap resamples
+            block_size: block length in bars (keeps volatility clustering)
+            confidence: interval coverage
+            memory_budget_mb: memory allowed for resampled arrays
+            seed: random seed for reproducible intervals
+
+        Returns:
+            DataFrame indexed by metric with Estimate, Lower, Upper and p-value vs Buy & Hold
+        """
+        valid = strategy_df['Strategy_Returns'].notna() & strategy_df['Returns'].notna()
+        returns = strategy_df['Strategy_Returns'][valid].to_numpy(dtype=np.float64)
+        benchmark = strategy_df['Returns'][valid].to_numpy(dtype=np.float64)
+        n = len(returns)
+        if n < 2:
+            return pd.DataFrame(columns=["Estimate", "Lower", "Upper", "p-value vs Buy & Hold"])
+
+        rng = np.random.default_rng(seed)
+        block_size = max(1, min(block_size, n))
+        n_blocks = -(-n // block_size)
+        # index, strategy sample and benchmark sample per value, plus working buffers
+        chunk = max(1, int(memory_budget_mb * 2 ** 20 // (n * 8 * 6)))
+
+        # block starts are drawn upfront so results do not depend on the chunking
+        all_starts = rng.integers(0, n, size=(n_blocks, n_resamples))
+        samples, beaten = {}, {}
+        for start in range(0, n_resamples, chunk):
+            starts = all_starts[:, start:start + chunk]
+            size = starts.shape[1]
+            idx = (starts[:, None, :] + np.arange(block_size)[None, :, None]).reshape(-1, size)[:n] % n
+            strat = batch_metrics(returns[idx], axis=0)
+            bench = batch_metrics(benchmark[idx], axis=0)
+            for k, v in strat.items():
+                samples.setdefault(k, []).append(v)
+                worse = v >= bench[k] if k in LOWER_IS_BETTER else v <= bench[k]
+                beaten[k] = beaten.get(k, 0) + int(np.count_nonzero(worse))
 
-        return metrics
\ No newline at end of file
+        estimates = batch_metrics(returns)
+        alpha = (1 - confidence) / 2
+        rows = {}
+        for k, chunks in samples.items():
+            values = np.concatenate(chunks)
+            lower, upper = np.nanquantile(values, [alpha, 1 - alpha])
+            rows[k] = {
+                "Estimate": float(estimates[k]),
+                "Lower": lower,
+                "Upper": upper,
+                "p-value vs Buy & Hold": beaten[k] / n_resamples,
+            }
+        return pd.DataFrame.from_dict(rows, orient='index')
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+from modules.Quant_A.kernels import batch_metrics
+from modules.Quant_A.backtest import run_backtest, BacktestResult
+from modules.Quant_A.strategies import (
+    buy_and_hold_signal,
+    sma_crossover_signal,
+    momentum_signal,
+    mean_reversion_signal
+)
+
+# Strategy name -> (signal builder, default parameters)
+PANEL_STRATEGIES = {
+    "Buy & Hold": (buy_and_hold_signal, {}),
+    "SMA Crossover": (sma_crossover_signal, {"short_window": 20, "long_window": 50}),
+    "Momentum": (momentum_signal, {"lookback": 20}),
+    "Mean Reversion": (mean_reversion_signal, {"window": 20, "entry_std": 2.0}),
+}
+
+
+class PanelResult:
+    """Backtests of several strategies over a whole price panel, stored as (n_assets, T) arrays"""
+
+    def __init__(self, index: pd.Index, tickers: list, price: np.ndarray, results: dict, metrics: pd.DataFrame):
+        self.index = index
+        self.tickers = tickers
+        self.price = price  # (n_assets, T)
+        self.results = results  # strategy -> {column -> (n_assets, T) array}
+        self.metrics = metrics  # one row per (ticker, strategy)
+
+    def result(self, strategy: str, ticker: str) -> BacktestResult:
+        """Single-ticker view, equivalent to the matching TradingStrategies call"""
+        i = self.tickers.index(ticker)
+        arrays = {"Price": self.price[i]}
+        arrays.update({col: values[i] for col, values in self.results[strategy].items()})
+        return BacktestResult(self.index, arrays)
+
+    def rank(self, metric: str = "Sharpe Ratio", ascending: bool = False) -> pd.DataFrame:
+        """Metrics table sorted by `metric`, with a 1-based Rank column"""
+        table = self.metrics.sort_values(metric, ascending=ascending).reset_index(drop=True)
+        table.insert(0, "Rank", np.arange(1, len(table) + 1))
+        return table
+
+
+class PanelBacktester:
+    """Run TradingStrategies column-wise over a dates x tickers panel in single vectorized passes"""
+
+    @staticmethod
+    def run(prices: pd.DataFrame, strategies: dict = None, initial_capital: float = 10000,
+            **metric_kwargs) -> PanelResult:
+        """
+        Backtest every ticker of `prices` with every strategy
+
+        Args:
+            prices: DataFrame dates x tickers (as returned by fetch_price_series)
+            strategies: strategy name -> parameter overrides (default: all PANEL_STRATEGIES)
+            initial_capital: starting capital per ticker
+
+        Returns:
+            PanelResult with per-ticker arrays and the metrics table
+        """
+        strategies = strategies or {name: {} for name in PANEL_STRATEGIES}
+        # gaps (holidays of one market) are carried as flat prices; bars before a late listing
+        # stay NaN, so the ticker has no position and its metrics start at its first return
+        filled = prices.ffill()
+        price = np.ascontiguousarray(filled.to_numpy(dtype=np.float64).T)
+        tickers = list(prices.columns)
+        first = np.argmax(~np.isnan(price), axis=1)
+        late = np.flatnonzero(first > 0)
+
+        results, tables = {}, []
+        for name, overrides in strategies.items():
+            builder, defaults = PANEL_STRATEGIES[name]
+            params = {**defaults, **overrides}
+            indicators, signal = builder(price, **params)
+            arrays = dict(indicators)
+            arrays.update(run_backtest(price, signal, initial_capital))
+            if name == "Buy & Hold":
+                arrays["Position"][:, 0] = 1.0
+            results[name] = arrays
+
+            returns = arrays["Strategy_Returns"][:, 1:]
+            metrics = batch_metrics(returns, **metric_kwargs)
+            for i in late:  # measured from the first return after the listing
+                for metric, value in batch_metrics(returns[i, first[i]:], **metric_kwargs).items():
+                    metrics[metric][i] = value
+            table = pd.DataFrame(metrics)
+            table.insert(0, "Strategy", name)
+            table.insert(0, "Ticker", tickers)
+            tables.append(table)
+
+        return PanelResult(prices.index, tickers, price, results, pd.concat(tables, ignore_index=True))
@@ -1,109 +1,360 @@
 import pandas as pd
 import numpy as np
+from collections import deque
+from modules.Quant_A.kernels import rolling_mean, rolling_std, ffill_nonzero
+from modules.Quant_A.backtest import run_backtest, BacktestResult
+
+
+def _price_array(prices: pd.Series) -> np.ndarray:
+    return np.ascontiguousarray(prices.to_numpy(dtype=np.float64))
+
+
+# Signal builders work on the last axis, for one series (T,) or a panel (n_assets, T).
+# Each returns (indicator columns, signal).
+
+def buy_and_hold_signal(price: np.ndarray):
+    signal = np.ones(price.shape)  # Always long
+    return {}, signal
+
+
+def sma_crossover_signal(price: np.ndarray, short_window: int = 20, long_window: int = 50):
+    sma_short = rolling_mean(price, short_window)
+    sma_long = rolling_mean(price, long_window)
+    # Long while short MA > long MA, flat otherwise (and while MAs are undefined)
+    signal = (sma_short > sma_long).astype(np.float64)
+    return {"SMA_Short": sma_short, "SMA_Long": sma_long, "Signal": signal}, signal
+
+
+def momentum_signal(price: np.ndarray, lookback: int = 20):
+    momentum = np.full(price.shape, np.nan)
+    if lookback < price.shape[-1]:
+        momentum[..., lookback:] = price[..., lookback:] - price[..., :-lookback]
+    signal = (momentum > 0).astype(np.float64)
+    return {"Momentum": momentum, "Signal": signal}, signal
+
+
+def mean_reversion_signal(price: np.ndarray, window: int = 20, entry_std: float = 2.0):
+    sma = rolling_mean(price, window)
+    std = rolling_std(price, window)
+    upper = sma + entry_std * std
+    lower = sma - entry_std * std
+    # Buy below the lower band, short above the upper band, hold in between
+    signal = np.where(price < lower, 1.0, np.where(price > upper, -1.0, 0.0))
+    signal = ffill_nonzero(signal)
+    return {"SMA": sma, "STD": std, "Upper_Band": upper, "Lower_Band": lower, "Signal": signal}, signal
+
+
+def _result(prices: pd.Series, price: np.ndarray, signal: np.ndarray, initial_capital: float,
+            indicators: dict, out: np.ndarray = None) -> BacktestResult:
+    arrays = {"Price": price}
+    arrays.update(indicators)
+    arrays.update(run_backtest(price, signal, initial_capital, out=out))
+    return BacktestResult(prices.index, arrays)
+
+
 class TradingStrategies:
-    """Implementation of various backtesting strategies"""
+    """
+    Implementation of various backtesting strategies
+
+    Every strategy runs on NumPy arrays and returns a BacktestResult, which
+    behaves like the strategy DataFrame for column access (result['Portfolio_Value'])
+    and builds the actual DataFrame only through to_frame().
+    """
 
     @staticmethod
-    def buy_and_hold(prices: pd.Series, initial_capital: float = 10000) -> pd.DataFrame:
+    def buy_and_hold(prices: pd.Series, initial_capital: float = 10000, out: np.ndarray = None) -> BacktestResult:
         """
         Simple buy and hold strategy
 
         Args:
             prices: Series of closing prices
             initial_capital: Starting capital
+            out: optional preallocated (5, T) buffer for the backtest columns
 
         Returns:
-            DataFrame with position, returns, and cumulative value
+            BacktestResult with position, returns, and cumulative value
         """
-        df = pd.DataFrame(index=prices.index)
-        df['Price'] = prices
-        df['Position'] = 1.0  # Always long
-        df['Returns'] = prices.pct_change()
-        df['Strategy_Returns'] = df['Returns'] * df['Position']
-        df['Cumulative_Returns'] = (1 + df['Strategy_Returns']).cumprod()
-        df['Portfolio_Value'] = initial_capital * df['Cumulative_Returns']
-
-        return df
+        price = _price_array(prices)
+        indicators, signal = buy_and_hold_signal(price)
+        result = _result(prices, price, signal, initial_capital, indicators, out)
+        result.arrays["Position"][0] = 1.0  # held from the first bar
+        return result
 
     @staticmethod
     def sma_crossover(prices: pd.Series, short_window: int = 20,
-                      long_window: int = 50, initial_capital: float = 10000) -> pd.DataFrame:
+                      long_window: int = 50, initial_capital: float = 10000,
+                      out: np.ndarray = None) -> BacktestResult:
         """
         Simple Moving Average crossover strategy
 
         Buy signal: Short MA crosses above Long MA
         Sell signal: Short MA crosses below Long MA
         """
-        df = pd.DataFrame(index=prices.index)
-        df['Price'] = prices
-        df['SMA_Short'] = prices.rolling(window=short_window).mean()
-        df['SMA_Long'] = prices.rolling(window=long_window).mean()
-
-        # Generate signals
-        df['Signal'] = 0.0
-        df.loc[df['SMA_Short'] > df['SMA_Long'], 'Signal'] = 1.0  # Long
-        df.loc[df['SMA_Short'] <= df['SMA_Long'], 'Signal'] = 0.0  # Exit
-
-        # Calculate returns
-        df['Position'] = df['Signal'].shift(1)  # Trade on next day
-        df['Returns'] = prices.pct_change()
-        df['Strategy_Returns'] = df['Returns'] * df['Position']
-        df['Cumulative_Returns'] = (1 + df['Strategy_Returns']).cumprod()
-        df['Portfolio_Value'] = initial_capital * df['Cumulative_Returns']
-
-        return df
+        price = _price_array(prices)
+        indicators, signal = sma_crossover_signal(price, short_window, long_window)
+        return _result(prices, price, signal, initial_capital, indicators, out)
 
     @staticmethod
     def momentum(prices: pd.Series, lookback: int = 20,
-                 initial_capital: float = 10000) -> pd.DataFrame:
+                 initial_capital: float = 10000, out: np.ndarray = None) -> BacktestResult:
         """
         Momentum strategy: Buy if price > price N days ago
         """
-        df = pd.DataFrame(index=prices.index)
-        df['Price'] = prices
-        df['Momentum'] = prices - prices.shift(lookback)
-
-        # Generate signals
-        df['Signal'] = 0.0
-        df.loc[df['Momentum'] > 0, 'Signal'] = 1.0
-        df.loc[df['Momentum'] <= 0, 'Signal'] = 0.0
-
-        # Calculate returns
-        df['Position'] = df['Signal'].shift(1)
-        df['Returns'] = prices.pct_change()
-        df['Strategy_Returns'] = df['Returns'] * df['Position']
-        df['Cumulative_Returns'] = (1 + df['Strategy_Returns']).cumprod()
-        df['Portfolio_Value'] = initial_capital * df['Cumulative_Returns']
-
-        return df
+        price = _price_array(prices)
+        indicators, signal = momentum_signal(price, lookback)
+        return _result(prices, price, signal, initial_capital, indicators, out)
 
     @staticmethod
     def mean_reversion(prices: pd.Series, window: int = 20,
-                       entry_std: float = 2.0, initial_capital: float = 10000) -> pd.DataFrame:
+                       entry_std: float = 2.0, initial_capital: float = 10000,
+                       out: np.ndarray = None) -> BacktestResult:
         """
         Mean reversion strategy using Bollinger Bands
 
         Buy when price < lower band
         Sell when price > upper band
         """
-        df = pd.DataFrame(index=prices.index)
-        df['Price'] = prices
-        df['SMA'] = prices.rolling(window=window).mean()
-        df['STD'] = prices.rolling(window=window).std()
-        df['Upper_Band'] = df['SMA'] + (entry_std * df['STD'])
-        df['Lower_Band'] = df['SMA'] - (entry_std * df['STD'])
-
-        # Generate signals
-        df['Signal'] = 0.0
-        df.loc[df['Price'] < df['Lower_Band'], 'Signal'] = 1.0  # Buy
-        df.loc[df['Price'] > df['Upper_Band'], 'Signal'] = -1.0  # Sell/Short
-        df['Signal'] = df['Signal'].replace(0, np.nan).ffill().fillna(0)
-
-        # Calculate returns
-        df['Position'] = df['Signal'].shift(1)
-        df['Returns'] = prices.pct_change()
-        df['Strategy_Returns'] = df['Returns'] * df['Position']
-        df['Cumulative_Returns'] = (1 + df['Strategy_Returns']).cumprod()
-        df['Portfolio_Value'] = initial_capital * df['Cumulative_Returns']
-
-        return df
+        price = _price_array(prices)
+        indicators, signal = mean_reversion_signal(price, window, entry_std)
+        return _result(prices, price, signal, initial_capital, indicators, out)
+
+
+class OnlineStrategy:
+    """
+    Incremental version of a strategy: O(1) work per new bar
+
+    Same rules as TradingStrategies (signal decided at the close, traded on the
+    next bar). The whole state round-trips through to_dict()/from_dict(), so it
+    can be cached between reruns and only new bars are ever processed.
+    """
+
+    name = None
+
+    def __init__(self, initial_capital: float = 10000):
+        self.initial_capital = initial_capital
+        self.signal = 0.0
+        self.cumulative = 1.0
+        self.last_price = None
+        self.last_timestamp = None
+        self.n_bars = 0
+
+    def _next_signal(self, price: float) -> float:
+        """Update the indicator windows with `price` and return the new signal"""
+        raise NotImplementedError
+
+    def update(self, price: float, timestamp=None) -> dict:
+        """Process one new bar and return its row of the backtest"""
+        position = self.signal if self.n_bars else np.nan
+        if self.last_price is None:
+            returns = strategy_returns = np.nan
+        else:
+            returns = price / self.last_price - 1
+            strategy_returns = returns * position
+            self.cumulative *= 1 + strategy_returns
+
+        self.signal = self._next_signal(price)
+        self.last_price = price
+        self.last_timestamp = timestamp
+        self.n_bars += 1
+        return {
+            "Price": price,
+            "Signal": self.signal,
+            "Position": position,
+            "Returns": returns,
+            "Strategy_Returns": strategy_returns,
+            "Portfolio_Value": self.portfolio_value,
+        }
+
+    def advance(self, prices: pd.Series) -> int:
+        """Feed the bars of `prices` newer than the last processed one; returns how many were new"""
+        if self.last_timestamp is not None:
+            prices = prices[prices.index > pd.Timestamp(self.last_timestamp)]
+        for ts, price in zip(prices.index, prices.to_numpy(dtype=np.float64)):
+            self.update(float(price), ts.isoformat())
+        return len(prices)
+
+    @property
+    def portfolio_value(self) -> float:
+        return self.initial_capital * self.cumulative
+
+    def params(self) -> dict:
+        return {}
+
+    def _state(self) -> dict:
+        return {}
+
+    def _load_state(self, state: dict):
+        pass
+
+    def to_dict(self) -> dict:
+        """JSON-serializable snapshot of the strategy"""
+        return {
+            "strategy": self.name,
+            "params": self.params(),
+            "initial_capital": self.initial_capital,
+            "signal": self.signal,
+            "cumulative": self.cumulative,
+            "last_price": self.last_price,
+            "last_timestamp": self.last_timestamp,
+            "n_bars": self.n_bars,
+            "state": self._state(),
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> "OnlineStrategy":
+        """Rebuild a strategy saved with to_dict()"""
+        strategy = ONLINE_STRATEGIES[data["strategy"]](initial_capital=data["initial_capital"], **data["params"])
+        for key in ("signal", "cumulative", "last_price", "last_timestamp", "n_bars"):
+            setattr(strategy, key, data[key])
+        strategy._load_state(data["state"])
+        return strategy
+
+
+class _RollingWindow:
+    """Fixed-size window with running sum and sum of squares (re-summed every `window` bars to cap drift)"""
+
+    def __init__(self, window: int, values=(), center: float = None):
+        self.window = window
+        self.values = deque(values, maxlen=window)
+        self.center = center
+        self._since_resum = 0
+        self._resum()
+
+    def _resum(self):
+        c = self.center or 0.0
+        self.sum = float(sum(v - c for v in self.values))
+        self.sum_sq = float(sum((v - c) ** 2 for v in self.values))
+        self._since_resum = 0
+
+    def push(self, value: float):
+        if self.center is None:
+            self.center = value  # centering limits cancellation in the variance
+        c = self.center
+        if len(self.values) == self.window:
+            old = self.values[0] - c
+            self.sum -= old
+            self.sum_sq -= old * old
+        self.values.append(value)
+        self.sum += value - c
+        self.sum_sq += (value - c) ** 2
+        self._since_resum += 1
+        if self._since_resum >= self.window:
+            self._resum()
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.window
+
+    @property
+    def mean(self) -> float:
+        return self.center + self.sum / self.window
+
+    @property
+    def std(self) -> float:
+        var = (self.sum_sq - self.sum * self.sum / self.window) / (self.window - 1)
+        return float(np.sqrt(max(var, 0.0)))
+
+    def state(self) -> dict:
+        return {"values": list(self.values), "center": self.center}
+
+
+class OnlineBuyAndHold(OnlineStrategy):
+    name = "Buy & Hold"
+
+    def __init__(self, initial_capital: float = 10000):
+        super().__init__(initial_capital)
+        self.signal = 1.0
+
+    def update(self, price: float, timestamp=None) -> dict:
+        row = super().update(price, timestamp)
+        if self.n_bars == 1:
+            row["Position"] = 1.0  # held from the first bar
+        return row
+
+    def _next_signal(self, price):
+        return 1.0
+
+
+class OnlineSMACrossover(OnlineStrategy):
+    name = "SMA Crossover"
+
+    def __init__(self, short_window: int = 20, long_window: int = 50, initial_capital: float = 10000):
+        super().__init__(initial_capital)
+        self.short = _RollingWindow(short_window)
+        self.long = _RollingWindow(long_window)
+
+    def _next_signal(self, price):
+        self.short.push(price)
+        self.long.push(price)
+        if not (self.short.full and self.long.full):
+            return 0.0
+        return 1.0 if self.short.mean > self.long.mean else 0.0
+
+    def params(self):
+        return {"short_window": self.short.window, "long_window": self.long.window}
+
+    def _state(self):
+        return {"short": self.short.state(), "long": self.long.state()}
+
+    def _load_state(self, state):
+        self.short = _RollingWindow(self.short.window, **state["short"])
+        self.long = _RollingWindow(self.long.window, **state["long"])
+
+
+class OnlineMomentum(OnlineStrategy):
+    name = "Momentum"
+
+    def __init__(self, lookback: int = 20, initial_capital: float = 10000):
+        super().__init__(initial_capital)
+        self.lookback = lookback
+        self.lagged = deque(maxlen=lookback + 1)
+
+    def _next_signal(self, price):
+        self.lagged.append(price)
+        if len(self.lagged) <= self.lookback:
+            return 0.0
+        return 1.0 if price - self.lagged[0] > 0 else 0.0
+
+    def params(self):
+        return {"lookback": self.lookback}
+
+    def _state(self):
+        return {"lagged": list(self.lagged)}
+
+    def _load_state(self, state):
+        self.lagged = deque(state["lagged"], maxlen=self.lookback + 1)
+
+
+class OnlineMeanReversion(OnlineStrategy):
+    name = "Mean Reversion"
+
+    def __init__(self, window: int = 20, entry_std: float = 2.0, initial_capital: float = 10000):
+        super().__init__(initial_capital)
+        self.entry_std = entry_std
+        self.bands = _RollingWindow(window)
+
+    def _next_signal(self, price):
+        self.bands.push(price)
+        if not self.bands.full:
+            return self.signal
+        mean, width = self.bands.mean, self.entry_std * self.bands.std
+        if price < mean - width:
+            return 1.0
+        if price > mean + width:
+            return -1.0
+        return self.signal  # hold the last position between the bands
+
+    def params(self):
+        return {"window": self.bands.window, "entry_std": self.entry_std}
+
+    def _state(self):
+        return {"bands": self.bands.state()}
+
+    def _load_state(self, state):
+        self.bands = _RollingWindow(self.bands.window, **state["bands"])
+
+
+# Dashboard strategy name -> online implementation
+ONLINE_STRATEGIES = {
+    cls.name: cls for cls in (OnlineBuyAndHold, OnlineSMACrossover, OnlineMomentum, OnlineMeanReversion)
+}
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+from modules.Quant_A.kernels import rolling_means, rolling_mean, rolling_std, ffill_nonzero, simple_returns, batch_metrics
+
+
+class SweepResult:
+    """Metrics cube of a parameter sweep: one array per metric, one axis per parameter"""
+
+    def __init__(self, strategy: str, params: dict, metrics: dict):
+        self.strategy = strategy
+        self.params = params  # axis name -> parameter values
+        self.metrics = metrics  # metric name -> ndarray of shape (len(p) for p in params)
+
+    def grid(self, metric: str = "Sharpe Ratio") -> pd.DataFrame:
+        """2D grid of one metric (first parameter as rows, second as columns)"""
+        names = list(self.params)
+        values = self.metrics[metric]
+        if len(names) == 1:
+            return pd.DataFrame({metric: values}, index=pd.Index(self.params[names[0]], name=names[0]))
+        return pd.DataFrame(values, index=pd.Index(self.params[names[0]], name=names[0]),
+                            columns=pd.Index(self.params[names[1]], name=names[1]))
+
+    def best(self, metric: str = "Sharpe Ratio") -> dict:
+        """Parameters of the best combination for `metric` (lowest drawdown counts as best too)"""
+        values = np.nan_to_num(self.metrics[metric], nan=-np.inf)
+        pos = np.unravel_index(np.argmax(values), values.shape)
+        best = {name: self.params[name][i].item() for name, i in zip(self.params, pos)}
+        best[metric] = float(self.metrics[metric][pos])
+        return best
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long format: one row per combination, parameters + metrics as columns"""
+        index = pd.MultiIndex.from_product(list(self.params.values()), names=list(self.params))
+        return pd.DataFrame({m: v.ravel() for m, v in self.metrics.items()}, index=index).reset_index()
+
+
+def _as_array(prices) -> np.ndarray:
+    return np.ascontiguousarray(np.asarray(prices, dtype=np.float64))
+
+
+def _chunk_size(cells_per_row: int, max_cells: int) -> int:
+    return max(1, int(max_cells // max(cells_per_row, 1)))
+
+
+def _metrics_from_signals(signals: np.ndarray, returns: np.ndarray, **kwargs) -> dict:
+    """
+    Trade each signal on the next bar and score it
+
+    Args:
+        signals: (T, ...) array, time first so accumulations run across contiguous rows
+        returns: (T,) simple returns
+    """
+    strategy_returns = signals[:-1]
+    strategy_returns *= returns[1:].reshape((-1,) + (1,) * (signals.ndim - 1))
+    return batch_metrics(strategy_returns, axis=0, **kwargs)
+
+
+def _collect(chunks: list) -> dict:
+    return {m: np.concatenate([c[m] for c in chunks]) for m in chunks[0]}
+
+
+class ParameterSweep:
+    """Evaluate every parameter combination of a TradingStrategies strategy in batched NumPy passes"""
+
+    @staticmethod
+    def sma_crossover(prices, short_windows, long_windows, max_cells: int = 20_000_000,
+                      **metric_kwargs) -> SweepResult:
+        """
+        SMA crossover over the grid short_windows x long_windows
+
+        All moving averages come from one cumulative sum; the (short, long, time)
+        signal cube is processed in blocks of at most `max_cells` values.
+        """
+        price = _as_array(prices)
+        short_windows = np.asarray(short_windows, dtype=int)
+        long_windows = np.asarray(long_windows, dtype=int)
+        returns = simple_returns(price)
+
+        windows = np.union1d(short_windows, long_windows)
+        means = rolling_means(price, windows)
+        short_ma = np.ascontiguousarray(means[np.searchsorted(windows, short_windows)].T)
+        long_ma = np.ascontiguousarray(means[np.searchsorted(windows, long_windows)].T)
+
+        step = _chunk_size(len(long_windows) * len(price), max_cells)
+        chunks = []
+        for i in range(0, len(short_windows), step):
+            signals = (short_ma[:, i:i + step, None] > long_ma[:, None, :]).astype(np.float64)
+            chunks.append(_metrics_from_signals(signals, returns, **metric_kwargs))
+
+        return SweepResult("SMA Crossover", {"short_window": short_windows, "long_window": long_windows},
+                           _collect(chunks))
+
+    @staticmethod
+    def momentum(prices, lookbacks, **metric_kwargs) -> SweepResult:
+        """Momentum for every lookback in one pass"""
+        price = _as_array(prices)
+        lookbacks = np.asarray(lookbacks, dtype=int)
+        returns = simple_returns(price)
+
+        signals = np.zeros((len(price), len(lookbacks)))
+        for i, lb in enumerate(lookbacks):
+            if lb < len(price):
+                signals[lb:, i] = price[lb:] > price[:-lb]
+
+        return SweepResult("Momentum", {"lookback": lookbacks},
+                           _metrics_from_signals(signals, returns, **metric_kwargs))
+
+    @staticmethod
+    def mean_reversion(prices, windows, entry_stds, max_cells: int = 20_000_000,
+                       **metric_kwargs) -> SweepResult:
+        """Bollinger mean reversion over the grid windows x entry_stds"""
+        price = _as_array(prices)
+        windows = np.asarray(windows, dtype=int)
+        entry_stds = np.asarray(entry_stds, dtype=np.float64)
+        returns = simple_returns(price)
+
+        step = _chunk_size(len(entry_stds) * len(price), max_cells)
+        chunks = []
+        for i in range(0, len(windows), step):
+            block = windows[i:i + step]
+            sma = np.stack([rolling_mean(price, w) for w in block])[:, None, :]
+            std = np.stack([rolling_std(price, w) for w in block])[:, None, :]
+            width = entry_stds[None, :, None] * std
+            signals = np.where(price < sma - width, 1.0, np.where(price > sma + width, -1.0, 0.0))
+            signals = np.ascontiguousarray(np.moveaxis(ffill_nonzero(signals), -1, 0))
+            chunks.append(_metrics_from_signals(signals, returns, **metric_kwargs))
+
+        return SweepResult("Mean Reversion", {"window": windows, "entry_std": entry_stds}, _collect(chunks))
@@ -0,0 +1,144 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from modules.Quant_A.kernels import simple_returns, batch_metrics
+from modules.Quant_A.sweeps import ParameterSweep
+from modules.Quant_A.strategies import sma_crossover_signal, momentum_signal, mean_reversion_signal
+
+# Strategy name -> (grid sweep, signal builder); sweep axis names are the builder's kwargs
+WALK_FORWARD_STRATEGIES = {
+    "SMA Crossover": (ParameterSweep.sma_crossover, sma_crossover_signal),
+    "Momentum": (ParameterSweep.momentum, momentum_signal),
+    "Mean Reversion": (ParameterSweep.mean_reversion, mean_reversion_signal),
+}
+
+
+def walk_forward_folds(n_bars: int, train_size: int, test_size: int, expanding: bool = False) -> list:
+    """
+    Train/test windows as (train_start, test_start, test_end) bar indices
+
+    Rolling windows keep `train_size` bars of history; expanding windows always
+    start at bar 0. Test windows are consecutive and never overlap.
+    """
+    folds = []
+    test_start = train_size
+    while test_start < n_bars:
+        train_start = 0 if expanding else test_start - train_size
+        folds.append((train_start, test_start, min(test_start + test_size, n_bars)))
+        test_start += test_size
+    return folds
+
+
+_attached = {}
+
+
+def _attach(name: str, shape: tuple) -> np.ndarray:
+    """Map the shared price array in a worker (once per process)"""
+    if name not in _attached:
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:  # Python < 3.13: workers share the parent's resource tracker
+            shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = shm
+    return np.ndarray(shape, dtype=np.float64, buffer=_attached[name].buf)
+
+
+def _run_fold(shm_name: str, shape: tuple, strategy: str, grid: dict, fold: tuple, metric: str) -> dict:
+    """Pick the best parameters in-sample, then trade them on the test window"""
+    price = _attach(shm_name, shape)
+    train_start, test_start, test_end = fold
+    sweep, builder = WALK_FORWARD_STRATEGIES[strategy]
+
+    in_sample = sweep(price[train_start:test_start], *grid.values())
+    best = in_sample.best(metric)
+    params = {k: best[k] for k in in_sample.params}
+
+    # indicators are warmed up on the training bars, only test bars are scored
+    window = price[train_start:test_end]
+    _, signal = builder(window, **params)
+    returns = simple_returns(window)
+    offset = test_start - train_start
+    oos_returns = signal[offset - 1:-1] * returns[offset:]
+
+    return {
+        "fold": fold,
+        "params": params,
+        "in_sample": best[metric],
+        "out_of_sample": float(batch_metrics(oos_returns)[metric]),
+        "returns": oos_returns,
+    }
+
+
+class WalkForwardResult:
+    """Per-fold choices and the stitched out-of-sample equity curve"""
+
+    def __init__(self, folds: pd.DataFrame, returns: pd.Series, initial_capital: float):
+        self.folds = folds
+        self.returns = returns  # out-of-sample strategy returns
+        self.equity = initial_capital * (1 + returns).cumprod()
+
+    def metrics(self, **metric_kwargs) -> dict:
+        """calculate_all_metrics of the stitched out-of-sample returns"""
+        return {k: float(v) for k, v in batch_metrics(self.returns.to_numpy(), **metric_kwargs).items()}
+
+
+class WalkForward:
+    """Walk-forward optimization of TradingStrategies parameters, folds evaluated on a process pool"""
+
+    @staticmethod
+    def run(prices: pd.Series, strategy: str, grid: dict, train_size: int = 504, test_size: int = 126,
+            expanding: bool = False, metric: str = "Sharpe Ratio", initial_capital: float = 10000,
+            max_workers: int = None) -> WalkForwardResult:
+        """
+        Args:
+            prices: Series of closing prices
+            strategy: 'SMA Crossover', 'Momentum' or 'Mean Reversion'
+            grid: parameter grid in sweep order, e.g. {"short_windows": [...], "long_windows": [...]}
+            train_size, test_size: window lengths in bars
+            expanding: expanding instead of rolling training windows
+            metric: in-sample selection criterion (any calculate_all_metrics key)
+            max_workers: pool size (default: CPU count); 0 runs the folds in this process
+
+        Returns:
+            WalkForwardResult
+        """
+        price = np.ascontiguousarray(prices.to_numpy(dtype=np.float64))
+        folds = walk_forward_folds(len(price), train_size, test_size, expanding)
+        if not folds:
+            raise ValueError("Not enough bars for one training window")
+
+        # prices are published once in shared memory instead of being pickled per fold
+        shm = shared_memory.SharedMemory(create=True, size=price.nbytes)
+        try:
+            np.ndarray(price.shape, dtype=np.float64, buffer=shm.buf)[:] = price
+            args = (shm.name, price.shape, strategy, grid)
+            if max_workers == 0:
+                outputs = [_run_fold(*args, fold, metric) for fold in folds]
+            else:
+                workers = min(max_workers or os.cpu_count() or 1, len(folds))
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    outputs = list(pool.map(_run_fold, *zip(*[args + (fold, metric) for fold in folds])))
+        finally:
+            attached = _attached.pop(shm.name, None)
+            if attached is not None:
+                attached.close()
+            shm.close()
+            shm.unlink()
+
+        rows = []
+        for out in outputs:
+            train_start, test_start, test_end = out["fold"]
+            rows.append({
+                "Train Start": prices.index[train_start],
+                "Test Start": prices.index[test_start],
+                "Test End": prices.index[test_end - 1],
+                **out["params"],
+                f"In-Sample {metric}": out["in_sample"],
+                f"Out-of-Sample {metric}": out["out_of_sample"],
+            })
+        test_index = prices.index[folds[0][1]:folds[-1][2]]
+        returns = pd.Series(np.concatenate([out["returns"] for out in outputs]), index=test_index,
+                            name="Strategy_Returns")
+        return WalkForwardResult(pd.DataFrame(rows), returns, initial_capital)
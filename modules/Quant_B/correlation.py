@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+from scipy.cluster.hierarchy import fcluster, leaves_list, linkage
+from scipy.spatial.distance import squareform
+
+# Above this many assets the heatmap is aggregated (clusters or tiles) instead of drawn cell by cell
+MAX_HEATMAP_SIDE = 120
+
+
+def correlation_matrix(returns: pd.DataFrame, block: int = 512, dtype=np.float32) -> pd.DataFrame:
+    """
+    Pearson correlation as a blocked matrix product of standardized returns
+
+    Only the upper triangle of blocks is computed (and mirrored), so peak memory is
+    the standardized panel plus one block x block tile.
+
+    Args:
+        returns: DataFrame of returns (dates x tickers); missing values count as the mean
+        block: number of assets per tile
+        dtype: float32 halves memory and doubles throughput, plenty for display
+
+    Returns:
+        DataFrame (tickers x tickers)
+    """
+    x = returns.to_numpy(dtype=np.float64)
+    n_obs, n = x.shape
+    mean = np.nanmean(x, axis=0)
+    std = np.nanstd(x, axis=0)
+    std[std == 0] = np.inf  # constant series: zero correlation with everything
+    z = np.nan_to_num((x - mean) / std).astype(dtype) / np.sqrt(n_obs, dtype=dtype)
+
+    corr = np.empty((n, n), dtype=dtype)
+    for i in range(0, n, block):
+        zi = z[:, i:i + block]
+        for j in range(i, n, block):
+            tile = zi.T @ z[:, j:j + block]
+            corr[i:i + block, j:j + block] = tile
+            if j != i:
+                corr[j:j + block, i:i + block] = tile.T
+    np.clip(corr, -1, 1, out=corr)
+    corr.flat[::n + 1] = 1
+    return pd.DataFrame(corr, index=returns.columns, columns=returns.columns)
+
+
+def cluster_linkage(corr: pd.DataFrame) -> np.ndarray:
+    """Average-linkage tree on the correlation distance sqrt((1 - rho) / 2)"""
+    dist = np.sqrt(np.clip((1 - corr.to_numpy(dtype=np.float64)) / 2, 0, None))
+    np.fill_diagonal(dist, 0)
+    return linkage(squareform(dist, checks=False), method="average")
+
+
+def cluster_order(corr: pd.DataFrame, tree: np.ndarray = None) -> pd.DataFrame:
+    """Rows and columns reordered so that correlated assets sit next to each other"""
+    if len(corr) < 3:
+        return corr
+    order = leaves_list(cluster_linkage(corr) if tree is None else tree)
+    return corr.iloc[order, order]
+
+
+def cluster_correlation(corr: pd.DataFrame, n_clusters: int, tree: np.ndarray = None):
+    """
+    Average correlation between (and within) clusters of the hierarchical tree
+
+    Returns:
+        (DataFrame n_clusters x n_clusters, Series cluster label per ticker)
+    """
+    tree = cluster_linkage(corr) if tree is None else tree
+    labels = fcluster(tree, n_clusters, criterion="maxclust") - 1
+    # clusters numbered in dendrogram order so the aggregated view keeps the block structure
+    first_leaf = {}
+    for pos, leaf in enumerate(leaves_list(tree)):
+        first_leaf.setdefault(labels[leaf], pos)
+    rank = {c: r for r, c in enumerate(sorted(first_leaf, key=first_leaf.get))}
+    labels = np.array([rank[c] for c in labels])
+
+    k = len(rank)
+    member = np.zeros((len(corr), k), dtype=np.float32)
+    member[np.arange(len(corr)), labels] = 1
+    counts = member.sum(axis=0)
+    mean = member.T @ corr.to_numpy(dtype=np.float32) @ member / np.outer(counts, counts)
+    names = [f"C{c + 1} ({int(counts[c])})" for c in range(k)]
+    return pd.DataFrame(mean, index=names, columns=names), pd.Series(np.array(names)[labels], index=corr.index)
+
+
+def tile_correlation(corr: pd.DataFrame, max_side: int = MAX_HEATMAP_SIDE) -> pd.DataFrame:
+    """Block-averaged matrix of at most max_side x max_side tiles, labelled by their first and last ticker"""
+    n = len(corr)
+    edges = np.linspace(0, n, min(n, max_side) + 1).astype(int)
+    starts = edges[:-1]
+    values = corr.to_numpy(dtype=np.float32)
+    sizes = np.diff(edges)
+    tiles = np.add.reduceat(np.add.reduceat(values, starts, axis=0), starts, axis=1) / np.outer(sizes, sizes)
+    names = [f"{corr.index[s]}…{corr.index[e - 1]}" if e - s > 1 else str(corr.index[s])
+             for s, e in zip(starts, edges[1:])]
+    return pd.DataFrame(tiles, index=names, columns=names)
+
+
+def correlation_view(returns: pd.DataFrame, mode: str = "clusters", max_side: int = MAX_HEATMAP_SIDE):
+    """
+    Correlation matrix ready to plot, with a bounded number of cells
+
+    Args:
+        returns: DataFrame of returns (dates x tickers)
+        mode: aggregation above max_side assets, 'clusters' (mean correlation between
+            clusters) or 'tiles' (block-averaged image in clustering order)
+        max_side: largest matrix sent to the browser
+
+    Returns:
+        (DataFrame to plot, full correlation matrix in clustering order)
+    """
+    corr = correlation_matrix(returns)
+    if len(corr) < 3:
+        return corr, corr
+    tree = cluster_linkage(corr)
+    ordered = cluster_order(corr, tree)
+    if len(corr) <= max_side:
+        return ordered, ordered
+    if mode == "clusters":
+        return cluster_correlation(corr, max_side, tree)[0], ordered
+    return tile_correlation(ordered, max_side), ordered
@@ -3,6 +3,11 @@ import time
 import plotly.graph_objects as go
 import numpy as np
 import pandas as pd
+from modules.Quant_B.correlation import MAX_HEATMAP_SIDE, correlation_view, tile_correlation
+from modules.Quant_B.frontier import random_portfolios
+from modules.Quant_B.optimization import OPTIMIZERS, optimize_portfolio
+from modules.Quant_B.risk import risk_report
+from modules.Quant_B.rolling_correlation import rolling_correlation_cube
 from modules.Quant_B.qwant_b import (
     fetch_price_series,
     compute_returns,
@@ -10,6 +15,14 @@ from modules.Quant_B.qwant_b import (
     max_drawdown,
     annualized_sharpe
 )
+from modules.Quant_A.panel import PanelBacktester
+from modules.core.rolling import rolling_metrics
+from modules.core.analytics import compute_metrics, periods_per_year
+from modules.core.charts import (
+    correlation_heatmap, frontier_figure, line_trace, plotly_chart, rolling_metrics_figure, zoom_slider
+)
+from modules.core.instrumentation import timed
+from modules.core.result_cache import get_result_cache, make_key
 
 def render_quant_b_dashboard():
     """Main dashboard for multi assets analysis"""
@@ -25,7 +38,7 @@ def render_quant_b_dashboard():
 
     st.sidebar.markdown("---")
     st.sidebar.header("Portfolio Strategy")
-    strategy = st.sidebar.selectbox("Strategy", ["Equal Weight", "Custom Weights", "Buy & Hold"])
+    strategy = st.sidebar.selectbox("Strategy", ["Equal Weight", "Custom Weights", "Buy & Hold", *OPTIMIZERS])
     start_capital = st.sidebar.number_input("Start capital (EUR)", value=1_000_000, step=10_000, min_value=1000)
 
     if strategy == "Custom Weights":
@@ -44,8 +57,19 @@ def render_quant_b_dashboard():
     else:
         weights = None
 
+    if strategy in OPTIMIZERS:
+        opt_window = st.sidebar.select_slider("Covariance window (bars)", options=[63, 126, 252, 504], value=252)
+        max_weight = st.sidebar.slider("Max weight per asset (%)", 5, 100, 100) / 100
+        risk_aversion, target_return = 3.0, None
+        if strategy == "Mean-Variance":
+            risk_aversion = st.sidebar.slider("Risk aversion", 0.5, 20.0, 3.0, 0.5)
+            if st.sidebar.checkbox("Target return instead of risk aversion"):
+                target_return = st.sidebar.number_input("Target annual return (%)", value=10.0, step=1.0) / 100
+
     rebal_option = st.sidebar.selectbox("Rebalancing",
-                                        ["No rebalancing (Buy&Hold)", "Daily", "Weekly", "Monthly", "Custom days"])
+                                        ["No rebalancing (Buy&Hold)", "Daily", "Weekly", "Monthly", "Custom days",
+                                         "Month-end", "Quarter-end", "Drift threshold"])
+    drift_threshold = None
     if rebal_option == "Daily":
         rebal_days = 1
     elif rebal_option == "Weekly":
@@ -53,10 +77,21 @@ def render_quant_b_dashboard():
     elif rebal_option == "Monthly":
         rebal_days = 21
     elif rebal_option == "Custom days":
-        rebal_days = st.sidebar.number_input("Rebalance every X trading days", min_value=1, value=21)
+        rebal_days = int(st.sidebar.number_input("Rebalance every X trading days", min_value=1, value=21))
+    elif rebal_option == "Month-end":
+        rebal_days = "month-end"
+    elif rebal_option == "Quarter-end":
+        rebal_days = "quarter-end"
+    elif rebal_option == "Drift threshold":
+        rebal_days = None
+        drift_threshold = st.sidebar.slider("Rebalance when a weight drifts by (%)", 1, 20, 5) / 100
     else:
         rebal_days = None
 
+    cost_bps = st.sidebar.number_input("Transaction cost (bps)", min_value=0.0, value=0.0, step=1.0)
+    cash_weight = st.sidebar.slider("Cash allocation (%)", 0, 50, 0) / 100
+    cash_rate = st.sidebar.number_input("Cash rate (annual %)", min_value=0.0, value=2.0, step=0.25) / 100
+
     # Fetch data
     with st.spinner("Fetching market data..."):
         prices = fetch_price_series(tickers, period=period, interval=interval)
@@ -72,40 +107,62 @@ def render_quant_b_dashboard():
         w = np.array([1 / len(tickers)] * len(tickers))  # initial equal allocation for display; no rebalancing
     elif strategy == "Custom Weights":
         w = weights / np.sum(weights)
+    elif strategy in OPTIMIZERS:
+        # shrunk covariance cached per universe/window, only new bars are folded in on refresh
+        w = optimize_portfolio(compute_returns(prices), strategy, window=opt_window, interval=interval,
+                               max_weight=max_weight, risk_aversion=risk_aversion,
+                               target_return=target_return).reindex(prices.columns).to_numpy()
     else:
         w = np.array([1 / len(tickers)] * len(tickers))
 
-    # Portfolio valuation
-    rebal_days_used = None if (rebal_days is None or strategy == "Buy & Hold") else int(rebal_days)
-    portfolio_nav = compute_portfolio_value(prices, w, rebal_freq_days=rebal_days_used, start_capital=start_capital)
+    # Portfolio valuation, computed once per (inputs, data version) for all sessions
+    cache = get_result_cache()
+    buy_and_hold = strategy == "Buy & Hold"
+    rebal_days_used = None if buy_and_hold else rebal_days
+    valuation = dict(rebal_freq_days=rebal_days_used, start_capital=start_capital,
+                     threshold=None if buy_and_hold else drift_threshold, cost_bps=cost_bps,
+                     cash_weight=cash_weight, cash_rate=cash_rate, interval=interval)
+    nav_key = make_key("quant_b.nav", tuple(tickers), period, interval, strategy, valuation, w, prices)
+    portfolio_nav = cache.get_or_compute(nav_key, lambda: compute_portfolio_value(prices, w, **valuation))
 
     # Metrics
     returns = compute_returns(prices)
     portfolio_returns = portfolio_nav.pct_change().dropna()
-    ann_sharpe = annualized_sharpe(portfolio_returns)
-    ann_return = (portfolio_nav.iloc[-1] / portfolio_nav.iloc[0]) ** (252 / len(portfolio_nav)) - 1 if len(
-        portfolio_nav) > 1 else np.nan
-    ann_vol = portfolio_returns.std() * np.sqrt(252)
-    mdd = max_drawdown(portfolio_nav)
+    # one vectorized pass, annualized according to the bar interval
+    with timed("metrics.quant_b"):
+        nav_metrics = compute_metrics(portfolio_nav, "nav", interval=interval, risk_free_rate=0.0).iloc[0]
+    ann_sharpe = nav_metrics["Sharpe Ratio"] if nav_metrics["Volatility (Annual %)"] > 0 else np.nan
+    ann_return = nav_metrics["Annualized Return (%)"] / 100 if len(portfolio_nav) > 1 else np.nan
+    ann_vol = nav_metrics["Volatility (Annual %)"] / 100
+    mdd = nav_metrics["Max Drawdown (%)"] / 100
 
     # Layout: main plots + side metrics
     col1, col2 = st.columns((3, 1))
 
     with col1:
         st.subheader("Asset Prices & Portfolio Value")
-        fig = go.Figure()
-        # asset prices normalized to 1 at start for overlay
-        normalized = prices / prices.iloc[0]
-        for c in normalized.columns:
-            fig.add_trace(go.Scatter(x=normalized.index, y=normalized[c], mode="lines", name=c))
-        # add portfolio nav normalized
-        norm_portfolio = portfolio_nav / portfolio_nav.iloc[0]
-        fig.add_trace(go.Scatter(x=norm_portfolio.index, y=norm_portfolio, mode="lines", name="Portfolio (NAV)",
-                                 line=dict(width=3, dash='dash', color='green')))
-
-        fig.update_layout(height=600, xaxis_title="Date", yaxis_title="Normalized value (start=1)",
-                          legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
-        st.plotly_chart(fig, use_container_width=True)
+        zoom_start, zoom_end = zoom_slider(prices.index, key="quant_b_zoom")
+        with timed("figure.quant_b.nav"):
+            fig = go.Figure()
+            # asset prices normalized to 1 at start for overlay (downsampled per trace)
+            normalized = (prices / prices.iloc[0]).loc[zoom_start:zoom_end]
+            for c in normalized.columns:
+                fig.add_trace(line_trace(normalized[c], name=c))
+            # add portfolio nav normalized
+            norm_portfolio = (portfolio_nav / portfolio_nav.iloc[0]).loc[zoom_start:zoom_end]
+            fig.add_trace(line_trace(norm_portfolio, name="Portfolio (NAV)", line=dict(width=3, dash='dash', color='green')))
+
+            fig.update_layout(height=600, xaxis_title="Date", yaxis_title="Normalized value (start=1)",
+                              legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+        plotly_chart(fig, stage="quant_b.nav", use_container_width=True)
+
+        # Rolling analytics of the portfolio under the NAV chart
+        rolling_window = st.select_slider("Rolling window (bars)", options=[21, 63, 126, 252], value=63,
+                                          key="quant_b_rolling_window")
+        rolling = cache.get_or_compute(f"{nav_key}:rolling:{rolling_window}",
+                                       lambda: rolling_metrics(portfolio_returns, rolling_window,
+                                                               periods_per_year(interval)))
+        plotly_chart(rolling_metrics_figure(rolling), stage="quant_b.rolling", use_container_width=True)
 
     with col2:
         st.subheader("Metrics (Portfolio)")
@@ -118,20 +175,51 @@ def render_quant_b_dashboard():
     st.markdown("---")
     # Correlation matrix
     st.subheader("Correlation Matrix (Returns)")
-    corr = returns.corr()
-
-    fig_corr = go.Figure(data=go.Heatmap(
-        z=corr.values,
-        x=corr.columns,
-        y=corr.columns,
-        colorscale='RdBu',
-        zmid=0,
-        text=corr.values.round(2),
-        texttemplate='%{text}',
-        textfont={"size": 10}
-    ))
-    fig_corr.update_layout(height=400)
-    st.plotly_chart(fig_corr, use_container_width=True)
+    mode = "clusters"
+    if returns.shape[1] > MAX_HEATMAP_SIDE:
+        mode = st.radio("Large universe view", ["clusters", "tiles"], horizontal=True,
+                        format_func={"clusters": "Cluster averages", "tiles": "Tiled image"}.get)
+    # blocked float32 product, assets in hierarchical clustering order
+    corr_view, corr = cache.get_or_compute(make_key("quant_b.correlation", mode, prices),
+                                           lambda: correlation_view(returns, mode))
+    plotly_chart(correlation_heatmap(corr_view, height=400 if len(corr_view) <= 25 else 600),
+                 stage="quant_b.correlation", use_container_width=True)
+
+    with st.expander("Rolling Correlation & Beta to the portfolio"):
+        corr_window = st.select_slider("Correlation window (bars)", options=[21, 63, 126, 252], value=63,
+                                       key="quant_b_corr_window")
+        if len(returns) <= corr_window:
+            st.info("Not enough history for one window, pick a longer period.")
+        else:
+            # memory-mapped cube on disk, reused as long as the data and window are unchanged
+            cube = rolling_correlation_cube(returns, corr_window, benchmark=portfolio_returns)
+            # only the first and last dates go to the browser; the day maps to its last window
+            ends = returns.index[corr_window - 1:]
+            day = ends[-1].date()
+            if ends[0].date() < day:
+                day = st.slider("Window ending on", min_value=ends[0].date(), max_value=day, value=day,
+                                format="YYYY-MM-DD", key="quant_b_corr_date")
+            day_end = pd.Timestamp(day) + pd.Timedelta(days=1)
+            if ends.tz is not None:
+                day_end = day_end.tz_localize(ends.tz)
+            date = ends[max(0, ends.searchsorted(day_end, side="left") - 1)]
+            snapshot = cube.at(date).loc[corr.index, corr.columns]  # static clustering order
+            if len(snapshot) > MAX_HEATMAP_SIDE:
+                snapshot = tile_correlation(snapshot)
+            plotly_chart(correlation_heatmap(snapshot, height=400 if len(snapshot) <= 25 else 600),
+                         stage="quant_b.rolling_correlation", use_container_width=True)
+
+            fig_beta = go.Figure()
+            betas = cube.betas.iloc[corr_window - 1:]
+            for c in betas.columns[:25]:
+                fig_beta.add_trace(line_trace(betas[c], name=c))
+            average = cache.get_or_compute(make_key("quant_b.correlation_average", cube.path, corr_window),
+                                           cube.average)
+            fig_beta.add_trace(line_trace(average.iloc[corr_window - 1:], name="Average correlation",
+                                          line=dict(width=3, color="black")))
+            fig_beta.update_layout(height=400, yaxis_title="Beta to portfolio / correlation",
+                                   legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+            plotly_chart(fig_beta, stage="quant_b.beta", use_container_width=True)
 
     col_perf1, col_perf2 = st.columns(2)
 
@@ -155,6 +243,39 @@ def render_quant_b_dashboard():
         w_df["Weight"] = w_df["Weight"].astype(str) + "%"
         st.dataframe(w_df, use_container_width=True, hide_index=True)
 
+    with st.expander("Tail Risk (VaR / CVaR)"):
+        col_r1, col_r2 = st.columns(2)
+        horizons = col_r1.multiselect("Horizons (bars)", [1, 5, 10, 21, 63, 252], default=[1, 10, 21])
+        n_paths = col_r2.select_slider("Monte Carlo paths", options=[10_000, 100_000, 1_000_000], value=100_000)
+        if horizons:
+            report = cache.get_or_compute(make_key("quant_b.risk", w, sorted(horizons), n_paths, prices),
+                                          lambda: risk_report(returns, w, horizons=sorted(horizons),
+                                                              n_paths=n_paths, seed=0))
+            st.dataframe(report.round(2), use_container_width=True)
+            st.caption("Losses in % of portfolio value. Monte Carlo: correlated log-normal paths "
+                       "from the sample mean and covariance, current weights held over the horizon.")
+
+    with st.expander("Efficient Frontier (random portfolios)"):
+        col_f1, col_f2 = st.columns(2)
+        n_portfolios = col_f1.select_slider("Random portfolios", options=[10_000, 50_000, 200_000, 500_000, 1_000_000],
+                                            value=200_000)
+        alpha = col_f2.select_slider("Dirichlet concentration", options=[0.1, 0.3, 1.0, 3.0], value=1.0,
+                                     help="Below 1: concentrated portfolios, above 1: close to equal weight")
+        if st.button("Simulate portfolios"):
+            with st.spinner("Sampling portfolios..."):
+                frontier = random_portfolios(returns, n_portfolios, interval=interval, alpha=alpha, seed=0)
+            plotly_chart(frontier_figure(frontier), stage="quant_b.frontier", use_container_width=True)
+            best = frontier.max_sharpe
+            st.caption(f"Best sampled Sharpe {best.attrs['Sharpe Ratio']:.2f} — "
+                       + ", ".join(f"{t} {v:.0%}" for t, v in best.sort_values(ascending=False).head(10).items()))
+
+    # Single-asset strategies screened over the whole universe
+    with st.expander("Strategy Screen (Quant A strategies on every ticker)"):
+        rank_metric = st.selectbox("Rank by", ["Sharpe Ratio", "Total Return (%)", "Max Drawdown (%)", "Win Rate (%)"],
+                                   key="screen_metric")
+        screen = cache.get_or_compute(make_key("quant_b.screen", prices), lambda: PanelBacktester.run(prices))
+        st.dataframe(screen.rank(rank_metric).round(2), use_container_width=True, hide_index=True)
+
         # Download section
     st.markdown("---")
     st.subheader("Download Data")
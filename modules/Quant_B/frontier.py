@@ -0,0 +1,100 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from modules.core.analytics import periods_per_year
+from modules.Quant_B.optimization import RollingCovariance, efficient_frontier
+
+
+class FrontierResult:
+    """Density of random portfolios in the (volatility, return) plane plus the exact efficient frontier"""
+
+    def __init__(self, counts, vol_edges, ret_edges, max_sharpe, min_vol, frontier, n_portfolios):
+        self.counts = counts  # (len(ret_edges) - 1) x (len(vol_edges) - 1) histogram
+        self.vol_edges = vol_edges  # annualized, in %
+        self.ret_edges = ret_edges
+        self.max_sharpe = max_sharpe  # best sampled portfolios: Series of weights + Return / Volatility / Sharpe
+        self.min_vol = min_vol
+        self.frontier = frontier  # DataFrame Volatility (%), Return (%)
+        self.n_portfolios = n_portfolios
+
+
+def _sample_chunk(mean, cov, seed, size, alpha, vol_edges, ret_edges, risk_free):
+    """Draw `size` Dirichlet weight vectors and bin their (volatility, return)"""
+    rng = np.random.default_rng(seed)
+    # float32 halves the cost of the products, far below the histogram resolution
+    w = rng.standard_gamma(alpha, size=(size, len(mean)), dtype=np.float32)
+    w /= w.sum(axis=1, keepdims=True)
+    ret = (w @ mean.astype(np.float32)).astype(np.float64)
+    var = np.einsum("ij,ij->i", w @ cov.astype(np.float32), w)  # row-wise w' C w
+    vol = np.sqrt(np.maximum(var, 0)).astype(np.float64)
+    counts = np.histogram2d(ret, vol, bins=(ret_edges, vol_edges))[0]
+
+    sharpe = (ret - risk_free) / np.where(vol > 0, vol, np.inf)
+    best, low = np.argmax(sharpe), np.argmin(vol)
+    return counts, (sharpe[best], ret[best], vol[best], w[best]), (vol[low], ret[low], w[low])
+
+
+def random_portfolios(returns: pd.DataFrame, n_portfolios: int = 200_000, interval: str = "1d",
+                      risk_free: float = 0.0, bins: int = 150, alpha: float = 1.0, seed: int = None,
+                      memory_budget_mb: float = 64, max_workers: int = 0) -> FrontierResult:
+    """
+    Monte Carlo of long-only random portfolios, summarized as a 2D histogram
+
+    Weights are drawn from a Dirichlet(alpha) (alpha = 1: uniform on the simplex) in chunks
+    sized to `memory_budget_mb`; each chunk gets its own child of SeedSequence(seed), so
+    results do not depend on the number of workers. Histogram edges are fixed upfront:
+    a long-only portfolio's return lies between the asset returns and its volatility below
+    the largest asset volatility.
+
+    Args:
+        returns: DataFrame of returns (dates x tickers)
+        n_portfolios: number of random weight vectors
+        interval: bar interval, for annualization
+        risk_free: annual risk-free rate for the Sharpe ratio
+        bins: histogram resolution per axis
+        alpha: Dirichlet concentration (small = concentrated portfolios)
+        seed: random seed
+        memory_budget_mb: memory allowed per chunk of weights
+        max_workers: 0 runs in this process, None uses one process per CPU
+
+    Returns:
+        FrontierResult
+    """
+    returns = returns.dropna()
+    # whole sample: a one-off estimate, not worth a rolling cache entry
+    est = RollingCovariance(returns.shape[1])
+    est.add(returns.to_numpy(dtype=np.float64))
+    cov, mean = est.covariance(), est.mean
+    ppy = periods_per_year(interval)
+    n_assets = len(mean)
+
+    vol_edges = np.linspace(0, np.sqrt(np.diag(cov).max()) * 1.0001, bins + 1)
+    spread = max(mean.max() - mean.min(), 1e-12) * 1e-4
+    ret_edges = np.linspace(mean.min() - spread, mean.max() + spread, bins + 1)
+
+    # W and W @ C dominate the chunk footprint
+    chunk = max(1, int(memory_budget_mb * 2 ** 20 // (n_assets * 4 * 2)))
+    sizes = [min(chunk, n_portfolios - start) for start in range(0, n_portfolios, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(mean, cov, s, size, alpha, vol_edges, ret_edges, risk_free / ppy) for s, size in zip(seeds, sizes)]
+    if max_workers == 0 or len(sizes) == 1:
+        outputs = [_sample_chunk(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers or os.cpu_count() or 1, len(sizes))) as pool:
+            outputs = list(pool.map(_sample_chunk, *zip(*args)))
+
+    counts = sum(out[0] for out in outputs)
+    sharpe, ret, vol, w = max((out[1] for out in outputs), key=lambda b: b[0])
+    max_sharpe = pd.Series(w, index=returns.columns)
+    max_sharpe.attrs.update({"Return (%)": ret * ppy * 100, "Volatility (%)": vol * np.sqrt(ppy) * 100,
+                             "Sharpe Ratio": sharpe * np.sqrt(ppy)})
+    vol, ret, w = min((out[2] for out in outputs), key=lambda b: b[0])
+    min_vol = pd.Series(w, index=returns.columns)
+    min_vol.attrs.update({"Return (%)": ret * ppy * 100, "Volatility (%)": vol * np.sqrt(ppy) * 100})
+
+    curve = efficient_frontier(mean, cov)
+    frontier = pd.DataFrame({"Volatility (%)": curve[:, 0] * np.sqrt(ppy) * 100,
+                             "Return (%)": curve[:, 1] * ppy * 100})
+    return FrontierResult(counts, vol_edges * np.sqrt(ppy) * 100, ret_edges * ppy * 100,
+                          max_sharpe, min_vol, frontier, n_portfolios)
@@ -0,0 +1,323 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from scipy.linalg import eigh
+from scipy.optimize import minimize
+from modules.core.analytics import periods_per_year
+from modules.core.result_cache import data_version
+
+OPTIMIZERS = ["Minimum Variance", "Max Sharpe", "Risk Parity", "Mean-Variance"]
+
+
+class RollingCovariance:
+    """
+    Ledoit-Wolf shrunk covariance over a sliding window of returns, updated in place
+
+    Only running sums are stored (n, sum x, sum x x^T, sum |x|^2 x, sum |x|^4) so new bars
+    are added and expired ones removed with rank-one updates instead of a full re-estimation.
+    The shrinkage intensity is the same as sklearn.covariance.ledoit_wolf on the window.
+    """
+
+    def __init__(self, n_assets: int):
+        self.n = 0
+        self.updates = 0  # rank-one updates since the sums were last rebuilt
+        self.sum_x = np.zeros(n_assets)
+        self.sum_xx = np.zeros((n_assets, n_assets))
+        self.sum_sq_x = np.zeros(n_assets)  # sum of |x|^2 * x
+        self.sum_sq2 = 0.0  # sum of |x|^4
+
+    def _apply(self, rows: np.ndarray, sign: float):
+        sq = np.einsum("ij,ij->i", rows, rows)
+        self.n += int(sign) * len(rows)
+        self.sum_x += sign * rows.sum(axis=0)
+        self.sum_xx += sign * (rows.T @ rows)
+        self.sum_sq_x += sign * (sq @ rows)
+        self.sum_sq2 += sign * float(sq @ sq)
+        self.updates += len(rows)
+
+    def add(self, rows: np.ndarray):
+        """Add new bars (rows = bars, columns = assets)"""
+        self._apply(np.atleast_2d(rows), 1.0)
+
+    def remove(self, rows: np.ndarray):
+        """Remove bars that left the window"""
+        self._apply(np.atleast_2d(rows), -1.0)
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self.sum_x / self.n
+
+    def empirical(self) -> np.ndarray:
+        """Maximum likelihood covariance (divided by n, like sklearn)"""
+        m = self.mean
+        return self.sum_xx / self.n - np.outer(m, m)
+
+    def shrinkage(self, emp: np.ndarray = None) -> float:
+        """Ledoit-Wolf shrinkage intensity towards mu * I"""
+        n, p = self.n, len(self.sum_x)
+        emp = self.empirical() if emp is None else emp
+        m = self.mean
+        # sum over the window of |x - m|^4, expanded on the stored sums
+        mm = m @ m
+        a = np.trace(self.sum_xx)
+        sum_y4 = (self.sum_sq2 + 4 * m @ self.sum_xx @ m + n * mm ** 2 - 4 * self.sum_sq_x @ m
+                  + 2 * mm * a - 4 * mm * (self.sum_x @ m))
+        mu = np.trace(emp) / p
+        emp_norm = np.sum(emp ** 2)
+        beta = (sum_y4 / n - emp_norm) / (p * n)
+        delta = (emp_norm - 2 * mu * np.trace(emp) + p * mu ** 2) / p
+        beta = min(beta, delta)
+        return 0.0 if beta <= 0 else beta / delta
+
+    def covariance(self) -> np.ndarray:
+        """Shrunk covariance (1 - s) * S + s * mu * I"""
+        emp = self.empirical()
+        s = self.shrinkage(emp)
+        mu = np.trace(emp) / len(emp)
+        cov = (1 - s) * emp
+        cov.flat[::len(emp) + 1] += s * mu
+        return cov
+
+
+# (universe, window) -> (RollingCovariance, last bar, bars in the window, data version of the window), LRU
+_COV_CACHE = OrderedDict()
+_COV_CACHE_SIZE = 32
+_cov_lock = threading.Lock()
+
+
+def cached_covariance(returns: pd.DataFrame, window: int = 252):
+    """
+    Shrunk covariance and mean of the last `window` returns, reusing the previous estimate
+
+    When the universe and window were seen before and the new frame extends the cached one
+    with the same values over the cached window, only the new bars are added and the expired
+    ones removed. The sums are rebuilt from scratch every `window` updates to keep rounding
+    errors from accumulating. An entry is taken out of the cache while it is updated, so
+    concurrent sessions never interleave their updates (the loser simply rebuilds).
+
+    Args:
+        returns: DataFrame of returns (dates x tickers), no NaN
+        window: number of bars in the estimation window
+
+    Returns:
+        (covariance, mean) as numpy arrays, per bar (not annualized)
+    """
+    key = (tuple(returns.columns), window)
+    values = returns.to_numpy(dtype=np.float64)
+    n = len(values)
+    start = max(0, n - window)
+    with _cov_lock:
+        cached = _COV_CACHE.pop(key, None)
+
+    pos = old_start = -1
+    if cached is not None and len(returns):
+        est, last, count, version = cached
+        pos = returns.index.get_indexer([last])[0]
+        old_start = pos + 1 - count  # the cached window covered bars old_start..pos
+        if old_start >= 0 and data_version(values[old_start:pos + 1]) != version:
+            pos = -1  # revised bars: the cached sums no longer match the data
+    if pos < 0 or old_start < 0 or old_start > start or est.updates + 2 * (n - 1 - pos) > 2 * window:
+        est = RollingCovariance(values.shape[1])
+        est.add(values[start:])
+    elif pos < n - 1:
+        # new bars in, expired bars out
+        est.add(values[pos + 1:])
+        est.remove(values[old_start:start])
+    cov, mean = est.covariance(), est.mean
+
+    if len(returns):
+        with _cov_lock:
+            _COV_CACHE[key] = (est, returns.index[-1], n - start, data_version(values[start:]))
+            while len(_COV_CACHE) > _COV_CACHE_SIZE:
+                _COV_CACHE.popitem(last=False)
+    return cov, mean
+
+
+def _project(v, lo, hi):
+    """Euclidean projection on {sum(w) = 1, lo <= w <= hi} (bisection on the shift)"""
+    low, high = v.min() - hi, v.max() - lo
+    for _ in range(60):
+        tau = 0.5 * (low + high)
+        if np.clip(v - tau, lo, hi).sum() > 1.0:
+            low = tau
+        else:
+            high = tau
+    return np.clip(v - 0.5 * (low + high), lo, hi)
+
+
+def _solve_qp(cov, mean, risk_aversion, bounds, lipschitz, w0=None, max_iter=5000, tol=1e-10):
+    """
+    Fully invested portfolio minimizing risk_aversion / 2 * w'Cw - mean'w within bounds
+
+    Accelerated projected gradient (FISTA with restart): one matrix-vector product per
+    iteration, so hundreds of assets are solved in milliseconds.
+    """
+    lo, hi = bounds
+    step = 1.0 / (risk_aversion * lipschitz)
+    w = _project(np.full(len(cov), 1.0 / len(cov)) if w0 is None else w0, lo, hi)
+    y, t = w, 1.0
+    for _ in range(max_iter):
+        grad = risk_aversion * (cov @ y) - mean
+        w_next = _project(y - step * grad, lo, hi)
+        if np.abs(w_next - w).max() < tol:
+            return w_next
+        if (y - w_next) @ (w_next - w) > 0:  # momentum goes uphill, restart
+            t = 1.0
+        t_next = 0.5 * (1 + np.sqrt(1 + 4 * t * t))
+        y = w_next + (t - 1) / t_next * (w_next - w)
+        w, t = w_next, t_next
+    return w
+
+
+def _largest_eigenvalue(cov):
+    return float(eigh(cov, eigvals_only=True, subset_by_index=[len(cov) - 1, len(cov) - 1])[0])
+
+
+def min_variance_weights(cov, bounds=(0.0, 1.0)):
+    """Fully invested portfolio with the smallest variance"""
+    return _solve_qp(cov, np.zeros(len(cov)), 1.0, bounds, _largest_eigenvalue(cov))
+
+
+def mean_variance_weights(mean, cov, risk_aversion=3.0, target_return=None, bounds=(0.0, 1.0)):
+    """
+    Markowitz portfolio: maximizes return - risk_aversion / 2 * variance,
+    or has the smallest variance among the portfolios reaching target_return
+    """
+    lipschitz = _largest_eigenvalue(cov)
+    if target_return is None:
+        return _solve_qp(cov, mean, risk_aversion, bounds, lipschitz)
+
+    # the expected return of the frontier portfolio grows with 1 / risk_aversion: bisection on it
+    w = _solve_qp(cov, np.zeros(len(cov)), 1.0, bounds, lipschitz)
+    if w @ mean >= target_return:
+        return w
+    low, high = 0.0, 1.0
+    while True:
+        w = _solve_qp(cov, high * mean, 1.0, bounds, lipschitz, w)
+        if w @ mean >= target_return or high > 1e8:
+            break  # beyond 1e8 the target is out of reach, keep the highest-return portfolio
+        low, high = high, high * 10
+    best = w
+    for _ in range(40):
+        mid = 0.5 * (low + high)
+        w = _solve_qp(cov, mid * mean, 1.0, bounds, lipschitz, w)
+        if w @ mean >= target_return:
+            high, best = mid, w
+        else:
+            low = mid
+    return best
+
+
+def max_sharpe_weights(mean, cov, risk_free=0.0, bounds=(0.0, 1.0)):
+    """
+    Tangency portfolio: maximizes (return - risk_free) / volatility
+
+    The tangency portfolio lies on the efficient frontier, along which the Sharpe ratio is
+    unimodal: golden-section search on log(1 / risk_aversion).
+    """
+    lipschitz = _largest_eigenvalue(cov)
+    w = _solve_qp(cov, np.zeros(len(cov)), 1.0, bounds, lipschitz)
+    cache = {}
+
+    def sharpe(x):
+        nonlocal w
+        if x not in cache:
+            w = _solve_qp(cov, np.exp(x) * mean, 1.0, bounds, lipschitz, w)
+            cache[x] = (w, (w @ mean - risk_free) / np.sqrt(max(w @ cov @ w, 1e-18)))
+        return cache[x][1]
+
+    # bracket on the scale of the per-bar variance / mean ratio
+    center = np.log(np.trace(cov) / len(cov) / max(np.abs(mean).mean(), 1e-12))
+    a, b = center - 10, center + 10
+    ratio = (np.sqrt(5) - 1) / 2
+    for _ in range(40):
+        c, d = b - ratio * (b - a), a + ratio * (b - a)
+        # ties go left: past the highest-return corner the frontier is flat
+        if sharpe(c) >= sharpe(d) - 1e-9 * abs(sharpe(d)):
+            b = d
+        else:
+            a = c
+    return max(cache.values(), key=lambda item: item[1])[0]
+
+
+def efficient_frontier(mean, cov, n_points: int = 40, bounds=(0.0, 1.0)) -> np.ndarray:
+    """
+    (volatility, return) of frontier portfolios, from minimum variance to maximum return
+
+    Sweeps the mean-variance trade-off on a log grid, each solve warm-started from the previous one.
+    """
+    lipschitz = _largest_eigenvalue(cov)
+    scale = np.trace(cov) / len(cov) / max(np.abs(mean).mean(), 1e-12)
+    w = _solve_qp(cov, np.zeros(len(cov)), 1.0, bounds, lipschitz)
+    points = [(np.sqrt(max(w @ cov @ w, 0)), w @ mean)]
+    for tradeoff in scale * np.logspace(-3, 3, n_points - 1):
+        w = _solve_qp(cov, tradeoff * mean, 1.0, bounds, lipschitz, w)
+        points.append((np.sqrt(max(w @ cov @ w, 0)), w @ mean))
+    return np.array(points)
+
+
+def risk_parity_weights(cov, bounds=(0.0, 1.0)):
+    """
+    Equal risk contribution portfolio (long only)
+
+    Solved on the convex form min 1/2 w'Cw - 1/n sum(log w), whose solution rescaled
+    to sum to one has equal risk contributions. Weights above the upper bound are
+    capped and the excess is spread over the other assets pro rata.
+    """
+    n = len(cov)
+    scale = np.sqrt(np.diag(cov).mean())
+    c = cov / scale ** 2  # better conditioned for the solver
+
+    def objective(w):
+        cw = c @ w
+        return 0.5 * w @ cw - np.log(w).sum() / n, cw - 1.0 / (n * w)
+
+    x0 = 1.0 / np.sqrt(np.diag(c)) / n
+    res = minimize(objective, x0, jac=True, method="L-BFGS-B", bounds=[(1e-12, None)] * n)
+    w = res.x / res.x.sum()
+    upper = bounds[1]
+    capped = np.zeros(n, dtype=bool)
+    while (w > upper + 1e-12).any() and not capped.all():
+        capped |= w > upper
+        free = w[~capped].sum()
+        w = np.where(capped, upper, w * (1 - upper * capped.sum()) / free if free > 0 else 0.0)
+    return w
+
+
+def optimize_portfolio(returns: pd.DataFrame, method: str = "Minimum Variance", window: int = 252,
+                       interval: str = "1d", risk_free: float = 0.0, max_weight: float = 1.0,
+                       risk_aversion: float = 3.0, target_return: float = None) -> pd.Series:
+    """
+    Optimal weights from the cached shrunk covariance of the last `window` returns
+
+    Args:
+        returns: DataFrame of returns (dates x tickers)
+        method: one of OPTIMIZERS
+        window: estimation window in bars
+        interval: bar interval, used to annualize risk_free and target_return
+        risk_free: annual risk-free rate (Max Sharpe)
+        max_weight: upper bound per asset (long only)
+        risk_aversion: Mean-Variance risk aversion
+        target_return: annual target return (Mean-Variance), overrides risk_aversion
+
+    Returns:
+        pd.Series of weights indexed by ticker, summing to 1
+    """
+    returns = returns.dropna()
+    cov, mean = cached_covariance(returns, window)
+    ppy = periods_per_year(interval)
+    bounds = (0.0, max(max_weight, 1.0 / len(cov)))
+
+    if method == "Minimum Variance":
+        w = min_variance_weights(cov, bounds)
+    elif method == "Max Sharpe":
+        w = max_sharpe_weights(mean, cov, risk_free / ppy, bounds)
+    elif method == "Risk Parity":
+        w = risk_parity_weights(cov, bounds)
+    elif method == "Mean-Variance":
+        target = None if target_return is None else target_return / ppy
+        w = mean_variance_weights(mean, cov, risk_aversion, target, bounds)
+    else:
+        raise ValueError(f"Unknown optimizer: {method}")
+    return pd.Series(w, index=returns.columns)
@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+from modules.core.analytics import periods_per_year
+
+# Calendar rules accepted by rebalance_positions
+CALENDAR_RULES = {"month-end": "M", "quarter-end": "Q", "year-end": "Y"}
+
+
+class RebalanceResult:
+    """Portfolio NAV plus what happened at each rebalance"""
+
+    def __init__(self, nav: pd.Series, rebalances: pd.DataFrame):
+        self.nav = nav
+        self.rebalances = rebalances  # one row per rebalance date: Turnover, Cost
+
+
+def rebalance_positions(index: pd.DatetimeIndex, rule=None) -> np.ndarray:
+    """
+    Bar positions where the portfolio is (re)allocated, always starting with bar 0
+
+    Args:
+        index: dates of the price panel
+        rule: None (buy and hold), an int N (every N bars) or 'month-end' / 'quarter-end' / 'year-end'
+    """
+    n = len(index)
+    if rule is None:
+        return np.array([0])
+    if isinstance(rule, (int, np.integer)):
+        return np.arange(0, n, int(rule))
+    if rule not in CALENDAR_RULES:
+        raise ValueError(f"Unknown rebalancing rule: {rule}")
+    # last bar of each calendar period (the final bar of the data is not a rebalance)
+    periods = pd.DatetimeIndex(index).to_period(CALENDAR_RULES[rule]).asi8
+    ends = np.flatnonzero(periods[1:] != periods[:-1])
+    return np.unique(np.concatenate([[0], ends]))
+
+
+def _listed_weights(weights: np.ndarray, listed: np.ndarray) -> np.ndarray:
+    """Target weights restricted to the assets already trading, rescaled to the same total"""
+    held = weights * listed
+    total = held.sum(axis=-1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(total > 0, held * (weights.sum() / total), 0.0)
+
+
+def _drift_positions(prices: np.ndarray, weights: np.ndarray, threshold: float, listed: np.ndarray,
+                     block: int = 256) -> np.ndarray:
+    """Rebalance whenever a weight drifts more than `threshold` away from its target (or an asset lists)"""
+    n = len(prices)
+    positions = [0]
+    start = 0
+    t = 1
+    while t < n:
+        stop = min(t + block, n)
+        base = np.where(prices[start] > 0, prices[start], 1.0)
+        value = prices[t:stop] / base * _listed_weights(weights, listed[start])  # holdings per unit of NAV
+        drifted = value / value.sum(axis=1, keepdims=True)
+        target = _listed_weights(weights, listed[t:stop])
+        hit = np.flatnonzero(np.abs(drifted - target).max(axis=1) > threshold)
+        if len(hit):
+            start = t + hit[0]
+            positions.append(start)
+            t = start + 1
+        else:
+            t = stop
+    return np.array(positions)
+
+
+def simulate_rebalancing(prices: pd.DataFrame, weights, rule=None, threshold: float = None,
+                         cost_bps: float = 0.0, cash_weight: float = 0.0, cash_rate: float = 0.0,
+                         start_capital: float = 1_000_000, interval: str = "1d",
+                         chunk_rows: int = 65536) -> RebalanceResult:
+    """
+    Vectorized portfolio valuation with periodic, calendar or drift-triggered rebalancing
+
+    Between two rebalances the shares are fixed, so the NAV of a segment is
+    V_k * sum_i w_i * p_t,i / p_rk,i: it is computed with array operations over
+    whole segments instead of bar by bar.
+
+    Args:
+        prices: DataFrame of adjusted close prices (dates x assets)
+        weights: target weights aligned with the columns (sum to 1)
+        rule: None, every N bars, or a calendar rule (see rebalance_positions)
+        threshold: rebalance when any weight drifts more than this (overrides `rule`)
+        cost_bps: transaction cost in basis points of traded notional
+        cash_weight: share of the portfolio kept in cash (target weights are scaled down)
+        cash_rate: annual rate earned on cash
+        start_capital: initial portfolio value
+        interval: bar interval, used to accrue the cash rate
+        chunk_rows: bars valued per block, bounds memory for long minute-bar histories
+
+    Returns:
+        RebalanceResult with the NAV Series and turnover/cost per rebalance
+    """
+    if isinstance(rule, (int, np.integer)) and rule <= 0:
+        raise ValueError(f"Rebalancing every {rule} bars: the period must be a positive number of bars")
+    px = prices.to_numpy(dtype=np.float64)
+    listed = np.ones(px.shape, dtype=bool)
+    if np.isnan(px).any():
+        # gaps (market holidays of one asset) are valued at the last known price; before its
+        # first price an asset is not held and its weight goes to the listed ones, until the
+        # first rebalance after it lists (no look-ahead fill of the early history)
+        px = prices.ffill().to_numpy(dtype=np.float64, copy=True)
+        listed = ~np.isnan(px)
+        px[~listed] = 0.0
+    w = np.asarray(weights, dtype=np.float64) * (1 - cash_weight)
+    if cash_weight > 0:
+        cash_price = (1 + cash_rate) ** (np.arange(len(px)) / periods_per_year(interval))
+        px = np.column_stack([px, cash_price])
+        listed = np.column_stack([listed, np.ones(len(px), dtype=bool)])
+        w = np.append(w, cash_weight)
+
+    if threshold is not None:
+        positions = _drift_positions(px, w, threshold, listed)
+    else:
+        positions = rebalance_positions(prices.index, rule)
+
+    # target weights of each segment, then its growth up to the next rebalance and the turnover there
+    targets = _listed_weights(w, listed[positions])
+    base = px[positions]
+    base = np.where(base > 0, base, 1.0)  # assets not listed yet have no shares
+    nxt = np.append(positions[1:], len(px) - 1)
+    holdings = px[nxt] / base * targets
+    growth = holdings.sum(axis=1)
+    drifted = holdings / growth[:, None]
+    turnover = np.empty(len(positions))
+    turnover[0] = np.abs(targets[0]).sum()  # initial purchase
+    turnover[1:] = np.abs(drifted[:-1] - targets[1:]).sum(axis=1)
+    cost_rate = cost_bps / 1e4
+
+    # value invested at each rebalance, after paying costs
+    seg_value = np.empty(len(positions))
+    value = start_capital
+    for k in range(len(positions)):
+        if k:
+            value *= growth[k - 1]
+        value *= 1 - cost_rate * turnover[k]
+        seg_value[k] = value
+
+    # per-bar NAV: inside segment k it is px_t @ shares_k, with shares_k = V_k * w / p_rk
+    shares = seg_value[:, None] * targets / base
+    bounds = np.append(positions, len(px))
+    nav = np.empty(len(px))
+    for k in range(len(positions)):
+        for s in range(bounds[k], bounds[k + 1], chunk_rows):
+            e = min(s + chunk_rows, bounds[k + 1])
+            np.dot(px[s:e], shares[k], out=nav[s:e])
+
+    rebalances = pd.DataFrame({
+        "Turnover": turnover,
+        "Cost": seg_value / (1 - cost_rate * turnover) * cost_rate * turnover,
+    }, index=prices.index[positions])
+    return RebalanceResult(pd.Series(nav, index=prices.index), rebalances)
@@ -0,0 +1,184 @@
+import os
+import time
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+
+DEFAULT_CUBE_DIR = os.environ.get(
+    "CORRELATION_CUBE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "cubes")
+)
+# Disk budget of the cube directory, least recently used cubes are deleted beyond it
+DEFAULT_CUBE_MB = float(os.environ.get("CORRELATION_CUBE_MB", 2048))
+
+
+class CorrelationCube:
+    """Rolling pairwise correlations (T x N x N float32, memory-mapped) and betas to a benchmark (T x N)"""
+
+    def __init__(self, path: str, index: pd.DatetimeIndex, columns, window: int):
+        self.path = path
+        self.index = index
+        self.columns = list(columns)
+        self.window = window
+        self.cube = np.load(path, mmap_mode="r")
+        self.betas = pd.DataFrame(np.load(path[:-4] + "_beta.npy"), index=index, columns=self.columns)
+
+    def at(self, date) -> pd.DataFrame:
+        """Correlation matrix of the window ending at `date` (or the last bar before it)"""
+        t = max(0, self.index.searchsorted(pd.Timestamp(date), side="right") - 1)
+        return pd.DataFrame(np.asarray(self.cube[t]), index=self.columns, columns=self.columns)
+
+    def pair(self, a: str, b: str) -> pd.Series:
+        """Rolling correlation of two assets"""
+        return pd.Series(self.cube[:, self.columns.index(a), self.columns.index(b)], index=self.index)
+
+    def average(self) -> pd.Series:
+        """Mean off-diagonal correlation per date (diversification gauge)"""
+        n = len(self.columns)
+        if n < 2:
+            return pd.Series(np.nan, index=self.index)
+        total = np.array([np.asarray(m, dtype=np.float64).sum() for m in self.cube])
+        return pd.Series((total - n) / (n * (n - 1)), index=self.index)
+
+
+def cube_path(returns: pd.DataFrame, window: int, benchmark: pd.Series = None, directory: str = DEFAULT_CUBE_DIR):
+    """Cube file name derived from the inputs, so identical requests reuse the file on disk"""
+    digest = hashlib.sha1()
+    digest.update(str(window).encode())
+    digest.update("|".join(map(str, returns.columns)).encode())
+    digest.update(np.ascontiguousarray(returns.index.asi8).tobytes())
+    digest.update(np.ascontiguousarray(returns.to_numpy(dtype=np.float64)).tobytes())
+    if benchmark is not None:
+        digest.update(np.ascontiguousarray(benchmark.to_numpy(dtype=np.float64)).tobytes())
+    return os.path.join(directory, f"corr_{digest.hexdigest()[:16]}.npy")
+
+
+def evict_cubes(directory: str = DEFAULT_CUBE_DIR, budget_mb: float = DEFAULT_CUBE_MB, keep: str = None):
+    """
+    Delete least recently used cubes (and their betas) until the directory fits in `budget_mb`
+
+    Readers refresh a cube's mtime on every hit. Temp files of writers that died more than a
+    day ago are removed too. Unlinking a cube another session has mapped is safe: the mapping
+    stays valid until it is closed.
+    """
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+    now = time.time()
+    cubes = []
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if name.endswith(".tmp") and now - stat.st_mtime > 86400:
+            os.remove(path)
+        elif name.startswith("corr_") and name.endswith(".npy") and not name.endswith("_beta.npy"):
+            beta = path[:-4] + "_beta.npy"
+            size = stat.st_size + (os.path.getsize(beta) if os.path.exists(beta) else 0)
+            cubes.append((stat.st_mtime, path, size))
+    total = sum(size for _, _, size in cubes)
+    for _, path, size in sorted(cubes):
+        if total <= budget_mb * 2 ** 20:
+            break
+        if path == keep:
+            continue
+        for victim in (path, path[:-4] + "_beta.npy"):
+            try:
+                os.remove(victim)
+            except OSError:
+                pass
+        total -= size
+
+
+def rolling_correlation_cube(returns: pd.DataFrame, window: int = 63, benchmark: pd.Series = None,
+                             path: str = None, memory_budget_mb: float = 256) -> CorrelationCube:
+    """
+    All rolling pairwise correlations and betas in O(T * N^2)
+
+    Windowed sums of x and x x^T are carried from bar to bar (add the new outer product,
+    drop the expired one) as cumulative sums over chunks of bars. Each chunk restarts from
+    an exact matrix product over the window, so rounding errors never accumulate. The
+    benchmark is handled as one more column to get cov(asset, benchmark) / var(benchmark).
+
+    Args:
+        returns: DataFrame of returns (dates x tickers), no NaN
+        window: rolling window in bars (the first window - 1 dates are NaN)
+        benchmark: returns of the portfolio NAV for the betas (default: equal-weight average)
+        path: .npy file of the cube (default: derived from the inputs under DEFAULT_CUBE_DIR)
+        memory_budget_mb: memory allowed for the outer products of one chunk
+
+    Returns:
+        CorrelationCube
+    """
+    returns = returns.dropna()
+    if benchmark is None:
+        benchmark = returns.mean(axis=1)
+    benchmark = benchmark.reindex(returns.index).fillna(0.0)
+    path = path or cube_path(returns, window, benchmark)
+    if os.path.exists(path) and os.path.exists(path[:-4] + "_beta.npy"):
+        try:
+            os.utime(path)  # recently used, for the eviction order
+            return CorrelationCube(path, returns.index, returns.columns, window)
+        except OSError:
+            pass  # evicted in the meantime: rebuilt below
+
+    x = np.column_stack([returns.to_numpy(dtype=np.float64), benchmark.to_numpy(dtype=np.float64)])
+    t_bars, m = x.shape
+    n = m - 1
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # one temp file per writer: concurrent sessions building the same cube never share it
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path)[:-4] + ".", suffix=".tmp")
+    os.close(fd)
+    cube = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=(t_bars, n, n))
+    betas = np.full((t_bars, n), np.nan, dtype=np.float32)
+    cube[:window - 1] = np.nan
+
+    # windowed cross-product sums of a chunk (float64) plus one scratch buffer, reused across chunks
+    chunk = max(2, int(memory_budget_mb * 2 ** 20 // (2 * m * m * 8)))
+    sums, scratch = np.empty((chunk, m, m)), np.empty((chunk, m, m))
+    diag = np.arange(m)
+    for start in range(window - 1, t_bars, chunk):
+        stop = min(start + chunk, t_bars)
+        k = stop - start
+        sum_xx, tmp_xx = sums[:k], scratch[:k]
+        # exact windowed sums for the window ending at `start`, then add new / drop expired bars
+        base = x[start - window + 1:start + 1]
+        new, old = x[start + 1:stop], x[start + 1 - window:stop - window]
+        sum_x = np.cumsum(np.concatenate([base.sum(axis=0)[None], new - old]), axis=0)
+        sum_xx[0] = base.T @ base
+        np.multiply(new[:, :, None], new[:, None, :], out=sum_xx[1:])
+        np.multiply(old[:, :, None], old[:, None, :], out=tmp_xx[1:])
+        sum_xx[1:] -= tmp_xx[1:]
+        for i in range(1, k):  # running sum, faster than cumsum over the leading axis
+            sum_xx[i] += sum_xx[i - 1]
+
+        # windowed sums -> covariances -> correlations, in place
+        mean = sum_x / window
+        cov = sum_xx
+        cov /= window
+        np.multiply(mean[:, :, None], mean[:, None, :], out=tmp_xx)
+        cov -= tmp_xx
+        var = cov[:, diag, diag]
+        betas[start:stop] = cov[:, :n, n] / var[:, n:n + 1]
+        inv_std = 1 / np.sqrt(np.where(var > 0, var, np.nan))
+        np.multiply(inv_std[:, :, None], inv_std[:, None, :], out=tmp_xx)
+        cov *= tmp_xx
+        np.clip(cov, -1, 1, out=cov)
+        cov[:, diag, diag] = 1
+        cube[start:stop] = cov[:, :n, :n]
+
+    cube.flush()
+    del cube
+    # betas first: a reader only trusts a cube whose beta file exists
+    fd, tmp_beta = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path)[:-4] + "_beta.", suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        np.save(f, betas)
+    os.replace(tmp_beta, path[:-4] + "_beta.npy")
+    os.replace(tmp, path)
+    evict_cubes(directory, keep=path)
+    return CorrelationCube(path, returns.index, returns.columns, window)
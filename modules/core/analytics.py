@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+
+# Vectorized performance analytics shared by Quant A, Quant B and batch jobs.
+# Inputs are (time x columns) returns or NAVs; every metric of
+# PerformanceMetrics.calculate_all_metrics is computed for all columns at once.
+
+# Bars per year for each yfinance interval (intraday: 252 sessions of 6.5 hours)
+PERIODS_PER_YEAR = {
+    "1m": 252 * 390, "2m": 252 * 195, "5m": 252 * 78, "15m": 252 * 26, "30m": 252 * 13,
+    "60m": 252 * 6.5, "90m": 252 * 390 / 90, "1h": 252 * 6.5,
+    "1d": 252, "5d": 252 / 5, "1wk": 52, "1mo": 12, "3mo": 4,
+}
+
+METRIC_NAMES = ["Total Return (%)", "Annualized Return (%)", "Volatility (Annual %)", "Sharpe Ratio",
+                "Max Drawdown (%)", "Win Rate (%)", "Best Day (%)", "Worst Day (%)"]
+
+
+def periods_per_year(interval: str = "1d") -> float:
+    """Annualization factor of a bar interval"""
+    try:
+        return PERIODS_PER_YEAR[interval]
+    except KeyError:
+        raise ValueError(f"Unsupported interval: {interval}")
+
+
+def metric_arrays(returns: np.ndarray, periods_per_year: float = 252, risk_free_rate: float = 0.0,
+                  axis: int = 0, include_start: bool = False) -> dict:
+    """
+    All calculate_all_metrics values for many return series in one pass
+
+    Args:
+        returns: array of valid period returns (no NaN), time along `axis`
+        periods_per_year: annualization factor (see periods_per_year())
+        risk_free_rate: annual risk-free rate subtracted in the Sharpe ratio
+        axis: time axis (axis 0 of a C-ordered array is fastest)
+        include_start: count the starting value (before the first return) as a
+            drawdown peak, as for a NAV; otherwise the first bar is the first peak,
+            as for the Cumulative_Returns column of a strategy
+
+    Returns:
+        Dictionary metric name -> array with the time axis removed, plus
+        'peak_position' / 'trough_position' (bar indices of the max drawdown, -1
+        being the starting value)
+    """
+    r = np.moveaxis(np.asarray(returns, dtype=np.float64), axis, 0)
+    n = r.shape[0]
+    shape = r.shape[1:]
+
+    if n and r[0].size >= 256:
+        # wide blocks: growth, running peak and worst drawdown advance one bar at
+        # a time over whole rows, which beats ufunc.accumulate along the time axis
+        growth = np.ones(shape)
+        peak = np.ones(shape) if include_start else np.zeros(shape)
+        worst = np.ones(shape) if include_start else np.full(shape, np.inf)
+        peak_pos = np.full(shape, -1, dtype=np.int64)
+        best_peak = np.full(shape, -1, dtype=np.int64)
+        trough = np.full(shape, -1, dtype=np.int64)
+        tmp = np.empty(shape)
+        for t, row in enumerate(r):
+            np.add(row, 1.0, out=tmp)
+            growth *= tmp
+            new_peak = growth > peak
+            peak_pos[new_peak] = t
+            np.maximum(peak, growth, out=peak)
+            np.divide(growth, peak, out=tmp)
+            deeper = tmp < worst
+            trough[deeper] = t
+            best_peak[deeper] = peak_pos[deeper]
+            np.minimum(worst, tmp, out=worst)
+        peak_pos = best_peak
+    elif n:
+        path = np.cumprod(1.0 + r, axis=0)
+        growth = path[-1]
+        offset = int(include_start)
+        if include_start:
+            path = np.concatenate([np.ones((1,) + shape), path])
+        ratio = path / np.maximum.accumulate(path, axis=0)
+        trough = ratio.argmin(axis=0)
+        worst = np.take_along_axis(ratio, trough[None], axis=0)[0]
+        before = np.arange(len(path)).reshape((-1,) + (1,) * len(shape)) <= trough
+        peak_pos = np.where(before, path, -np.inf).argmax(axis=0) - offset
+        trough = trough - offset
+    else:
+        growth = worst = np.ones(shape)
+        peak_pos = trough = np.full(shape, -1, dtype=np.int64)
+
+    cum = growth - 1.0
+    mean = r.mean(axis=0) if n else np.zeros(shape)
+    if n > 1:
+        var = np.einsum("i...,i...->...", r, r) - n * mean * mean
+        std = np.sqrt(np.maximum(var, 0.0) / (n - 1))
+    else:
+        std = np.zeros(shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std == 0, 0.0,
+                          np.sqrt(periods_per_year) * (mean - risk_free_rate / periods_per_year) / std)
+        annualized = (1 + cum) ** (periods_per_year / n) - 1 if n else np.zeros(shape)
+
+    return {
+        "Total Return (%)": cum * 100,
+        "Annualized Return (%)": annualized * 100,
+        "Volatility (Annual %)": std * np.sqrt(periods_per_year) * 100,
+        "Sharpe Ratio": sharpe,
+        "Max Drawdown (%)": (worst - 1.0) * 100,
+        "Win Rate (%)": np.count_nonzero(r > 0, axis=0) / n * 100 if n else np.zeros(shape),
+        "Best Day (%)": r.max(axis=0) * 100 if n else np.zeros(shape),
+        "Worst Day (%)": r.min(axis=0) * 100 if n else np.zeros(shape),
+        "peak_position": peak_pos,
+        "trough_position": trough,
+    }
+
+
+def compute_metrics(data, kind: str = "returns", interval: str = "1d", risk_free_rate: float = 0.0,
+                    annualization: float = None) -> pd.DataFrame:
+    """
+    Full metrics table for every column of a returns or NAV panel
+
+    Args:
+        data: Series or DataFrame (time x strategies/assets), NaN marking missing bars
+        kind: 'returns' (period returns) or 'nav' (values / cumulative returns)
+        interval: bar interval driving annualization
+        risk_free_rate: annual risk-free rate for the Sharpe ratio
+        annualization: explicit periods per year, overrides `interval`
+
+    Returns:
+        DataFrame with one row per column of `data` and the calculate_all_metrics
+        columns plus 'Peak Date' and 'Trough Date'
+    """
+    frame = data.to_frame() if isinstance(data, pd.Series) else data
+    if kind not in ("returns", "nav"):
+        raise ValueError("kind must be 'returns' or 'nav'")
+    ppy = annualization if annualization is not None else periods_per_year(interval)
+
+    # missing values (the first pct_change bar, other calendars, late listings) are skipped
+    # column by column; columns missing the same bars are computed together
+    raw = frame.to_numpy(dtype=np.float64)
+    valid = ~np.isnan(raw)
+    if valid.all():
+        masks, groups = np.ones((len(raw), 1), dtype=bool), np.zeros(raw.shape[1], dtype=np.int64)
+    else:
+        masks, groups = np.unique(valid, axis=1, return_inverse=True)
+        groups = groups.ravel()
+
+    tables = []
+    for g in range(masks.shape[1]):
+        columns = np.flatnonzero(groups == g)
+        values, dates = raw[masks[:, g]][:, columns], frame.index[masks[:, g]]
+        offset = 0
+        if kind == "nav":
+            values, offset = values[1:] / values[:-1] - 1, 1
+        arrays = metric_arrays(np.ascontiguousarray(values), ppy, risk_free_rate, include_start=kind == "nav")
+        part = pd.DataFrame({name: arrays[name] for name in METRIC_NAMES}, index=columns)
+        if len(values):
+            part["Peak Date"] = dates[arrays["peak_position"] + offset]
+            part["Trough Date"] = dates[arrays["trough_position"] + offset]
+        tables.append(part)
+    table = pd.concat(tables).sort_index() if len(tables) > 1 else tables[0]
+    table.index = frame.columns
+    return table
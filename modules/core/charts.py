@@ -0,0 +1,104 @@
+import datetime
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from modules.core.downsample import MAX_POINTS, downsample
+from modules.core.instrumentation import enabled, record_size, timed
+
+# Plotly figure builders shared by both dashboards
+
+
+def line_trace(series, max_points: int = MAX_POINTS, **kwargs) -> go.Scatter:
+    """Line trace of a Series, LTTB-downsampled so the payload does not grow with the history length"""
+    series = downsample(series, max_points)
+    return go.Scatter(x=series.index, y=series.to_numpy(), mode="lines", **kwargs)
+
+
+@timed("figure.rolling_metrics")
+def rolling_metrics_figure(metrics, columns=("Rolling Sharpe", "Rolling Volatility (%)", "Rolling Max Drawdown (%)"),
+                           height: int = 450) -> go.Figure:
+    """One stacked panel per rolling metric, sharing the date axis"""
+    fig = make_subplots(rows=len(columns), cols=1, shared_xaxes=True, vertical_spacing=0.04,
+                        subplot_titles=list(columns))
+    for i, col in enumerate(columns, start=1):
+        fig.add_trace(line_trace(metrics[col], name=col, line=dict(width=1.5)), row=i, col=1)
+    fig.update_layout(height=height, showlegend=False, hovermode="x unified", margin=dict(t=30))
+    return fig
+
+
+@timed("figure.correlation_heatmap")
+def correlation_heatmap(corr, height: int = 400, text_limit: int = 25) -> go.Figure:
+    """Correlation heatmap, with per-cell values only when the matrix is small enough to read them"""
+    heatmap = dict(z=np.round(corr.values, 3), x=list(corr.columns), y=list(corr.index), colorscale="RdBu", zmid=0,
+                   zmin=-1, zmax=1)
+    if len(corr) <= text_limit:
+        heatmap.update(text=corr.values.round(2), texttemplate="%{text}", textfont={"size": 10})
+    fig = go.Figure(data=go.Heatmap(**heatmap))
+    fig.update_layout(height=height, yaxis=dict(autorange="reversed"))
+    if len(corr) > text_limit:
+        fig.update_xaxes(showticklabels=False)
+        fig.update_yaxes(showticklabels=False)
+    return fig
+
+
+@timed("figure.frontier")
+def frontier_figure(result, height: int = 500) -> go.Figure:
+    """Random-portfolio density (log scale) with the efficient frontier and the notable portfolios"""
+    vol = (result.vol_edges[:-1] + result.vol_edges[1:]) / 2
+    ret = (result.ret_edges[:-1] + result.ret_edges[1:]) / 2
+    density = np.where(result.counts > 0, np.log10(np.maximum(result.counts, 1)), np.nan)
+    fig = go.Figure(go.Heatmap(x=vol, y=ret, z=np.round(density, 2), colorscale="Blues", showscale=False,
+                               hovertemplate="Vol %{x:.2f}%<br>Return %{y:.2f}%<extra></extra>"))
+    fig.add_trace(go.Scatter(x=result.frontier["Volatility (%)"], y=result.frontier["Return (%)"],
+                             mode="lines", name="Efficient frontier", line=dict(color="black", width=2)))
+    for name, portfolio, symbol in [("Max Sharpe (sampled)", result.max_sharpe, "star"),
+                                    ("Min Volatility (sampled)", result.min_vol, "diamond")]:
+        fig.add_trace(go.Scatter(x=[portfolio.attrs["Volatility (%)"]], y=[portfolio.attrs["Return (%)"]],
+                                 mode="markers", name=name, marker=dict(size=14, symbol=symbol)))
+    fig.update_layout(height=height, xaxis_title="Annualized Volatility (%)", yaxis_title="Annualized Return (%)",
+                      legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
+    return fig
+
+
+def plotly_chart(fig: go.Figure, stage: str = "chart", **kwargs):
+    """
+    st.plotly_chart timed as serialize.<stage>
+
+    With instrumentation on, the JSON payload size is recorded too (one extra serialization).
+    """
+    import streamlit as st
+    with timed(f"serialize.{stage}"):
+        st.plotly_chart(fig, **kwargs)
+    if enabled():
+        record_size(f"serialize.{stage}", len(fig.to_json()))
+
+
+def zoom_slider(index: pd.DatetimeIndex, key: str, label: str = "Zoom"):
+    """
+    Date range slider between the first and last bar of `index`
+
+    Only the two bounds are sent to the browser, whatever the history length. Daily and
+    longer bars are selected by date, intraday bars to the minute.
+
+    Returns:
+        (start, end) Timestamps in the timezone of `index`, for .loc[start:end]
+    """
+    import streamlit as st
+    first, last = index[0], index[-1]
+    if index.tz is not None:
+        first, last = first.tz_convert("UTC").tz_localize(None), last.tz_convert("UTC").tz_localize(None)
+    intraday = len(index) > 1 and (last - first) / (len(index) - 1) < pd.Timedelta(days=1)
+    if intraday:
+        low, high = first.to_pydatetime().replace(second=0, microsecond=0), last.to_pydatetime()
+        start, end = st.slider(label, min_value=low, max_value=high, value=(low, high),
+                               step=datetime.timedelta(minutes=1), format="YYYY-MM-DD HH:mm", key=key)
+        start, end = pd.Timestamp(start), pd.Timestamp(end) + pd.Timedelta(minutes=1) - pd.Timedelta(1)
+    else:
+        low, high = first.date(), last.date()
+        start, end = st.slider(label, min_value=low, max_value=high, value=(low, high), format="YYYY-MM-DD",
+                               key=key)
+        start, end = pd.Timestamp(start), pd.Timestamp(end) + pd.Timedelta(days=1) - pd.Timedelta(1)
+    if index.tz is not None:
+        start, end = start.tz_localize("UTC").tz_convert(index.tz), end.tz_localize("UTC").tz_convert(index.tz)
+    return start, end
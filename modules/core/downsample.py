@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+# Points per trace sent to the browser: about one per horizontal pixel of a wide-layout chart
+MAX_POINTS = 1500
+
+
+def lttb_indices(y: np.ndarray, n_out: int, x: np.ndarray = None) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: positions of `n_out` points that preserve the visual shape
+
+    The first and last points are kept; each bucket in between keeps the point forming the
+    largest triangle with the previously kept point and the average of the next bucket.
+
+    Args:
+        y: values (no NaN)
+        n_out: number of points to keep
+        x: abscissas (default: positions)
+
+    Returns:
+        sorted int positions into y
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    y = np.asarray(y, dtype=np.float64)
+    x = np.arange(n, dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)  # n_out - 2 buckets between the end points
+    starts = edges[:-1]
+    counts = np.diff(edges)
+    # average point of every bucket, the last bucket is followed by the final point alone
+    next_x = np.append(np.add.reduceat(x[:-1], starts)[1:] / counts[1:], x[-1])
+    next_y = np.append(np.add.reduceat(y[:-1], starts)[1:] / counts[1:], y[-1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i, (lo, hi) in enumerate(zip(starts, edges[1:])):
+        area = np.abs((x[a] - next_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def downsample(series: pd.Series, max_points: int = MAX_POINTS) -> pd.Series:
+    """Series reduced to at most `max_points` points with LTTB (NaN are dropped first)"""
+    series = series.dropna()
+    if len(series) <= max_points:
+        return series
+    x = series.index.asi8 if isinstance(series.index, pd.DatetimeIndex) else None
+    return series.iloc[lttb_indices(series.to_numpy(dtype=np.float64), max_points, x)]
+
@@ -0,0 +1,151 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+
+logger = logging.getLogger(__name__)
+
+
+class FetchCoordinator:
+    """
+    Shared front door for market data downloads
+
+    - single-flight: concurrent requests for the same (ticker, interval, window)
+      wait on one in-flight download
+    - batching: tickers requested within `batch_window` seconds for the same
+      window are merged into multi-ticker downloads of at most `max_batch` tickers
+    - concurrency: batches run on a bounded thread pool with retry/backoff, so a
+      large universe costs about as much as its slowest batch
+    """
+
+    def __init__(self, download, max_workers: int = 8, batch_window: float = 0.02, max_batch: int = 10,
+                 timeout: float = 60.0, retries: int = 3, backoff: float = 0.5):
+        """
+        Args:
+            download: callable (tickers, interval, start=None, period=None) -> dict of DataFrames
+            max_workers: maximum number of concurrent downloads
+            batch_window: seconds to wait for other requests to join a batch
+            max_batch: maximum tickers per download call
+            timeout: seconds a caller waits for its data before TimeoutError (the download
+                itself is not cancelled, see fetch)
+            retries: attempts per batch before giving up
+            backoff: first retry delay in seconds, doubled at each attempt
+        """
+        self.download = download
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._pending = {}
+        self.stats = {"requests": 0, "coalesced": 0, "batches": 0, "retries": 0, "failures": 0}
+
+    def submit(self, tickers, interval: str = "1d", start=None, period: str = None) -> dict:
+        """
+        Schedule downloads without waiting
+
+        Returns:
+            Dictionary ticker -> Future resolving to that ticker's OHLCV DataFrame
+        """
+        group = (interval, None if start is None else str(start), period)
+        futures, flush_now, start_timer = {}, [], False
+        with self._lock:
+            for t in dict.fromkeys(tickers):
+                self.stats["requests"] += 1
+                key = (t,) + group
+                fut = self._inflight.get(key)
+                if fut is not None:
+                    self.stats["coalesced"] += 1
+                else:
+                    fut = Future()
+                    self._inflight[key] = fut
+                    pending = self._pending.setdefault(group, [])
+                    start_timer = start_timer or not pending
+                    pending.append(t)
+                    if len(pending) >= self.max_batch:
+                        flush_now.append(self._pending.pop(group))
+                        start_timer = False
+                futures[t] = fut
+
+        for batch in flush_now:
+            self._pool.submit(self._run_batch, group, start, batch)
+        if start_timer:
+            timer = threading.Timer(self.batch_window, self._flush, args=(group, start))
+            timer.daemon = True
+            timer.start()
+        return futures
+
+    def fetch(self, tickers, interval: str = "1d", start=None, period: str = None) -> dict:
+        """
+        Download OHLCV bars, sharing work with every concurrent caller
+
+        The timeout only bounds this caller's wait: the batch keeps running on the pool
+        (it may serve other callers), and a retry of the same request joins it while it
+        is still in flight instead of starting a second download.
+
+        Returns:
+            Dictionary ticker -> OHLCV DataFrame
+
+        Raises:
+            TimeoutError: some tickers were not downloaded within `timeout` seconds
+        """
+        futures = self.submit(tickers, interval, start=start, period=period)
+        done, not_done = wait(futures.values(), timeout=self.timeout)
+        if not_done:
+            raise TimeoutError(f"Market data download timed out after {self.timeout}s")
+        return {t: fut.result() for t, fut in futures.items()}
+
+    def _count(self, event: str):
+        with self._lock:
+            self.stats[event] += 1
+
+    def _flush(self, group, start):
+        with self._lock:
+            batch = self._pending.pop(group, None)
+        if batch:
+            self._pool.submit(self._run_batch, group, start, batch)
+
+    def _run_batch(self, group, start, tickers):
+        interval, _, period = group
+        self._count("batches")
+        delay = self.backoff
+        for attempt in range(1, self.retries + 1):
+            try:
+                result = self.download(tickers, interval, start=start, period=period)
+                break
+            except Exception as e:
+                if attempt == self.retries:
+                    self._count("failures")
+                    self._resolve(group, tickers, error=e)
+                    return
+                self._count("retries")
+                logger.warning("Download of %s failed (%s), retrying in %.1fs", tickers, e, delay)
+                time.sleep(delay)
+                delay *= 2
+        self._resolve(group, tickers, result=result)
+
+    def _resolve(self, group, tickers, result=None, error=None):
+        with self._lock:
+            futures = [self._inflight.pop((t,) + group) for t in tickers]
+        for t, fut in zip(tickers, futures):
+            if error is not None:
+                fut.set_exception(error)
+            else:
+                fut.set_result(result.get(t))
+
+
+_coordinator = None
+
+
+def get_coordinator() -> FetchCoordinator:
+    """Process-wide coordinator (shared by every dashboard session) for the active provider"""
+    global _coordinator
+    from modules.core.providers import get_provider
+
+    provider = get_provider()
+    if _coordinator is None or _coordinator.download != provider.download:
+        _coordinator = FetchCoordinator(provider.download)
+    return _coordinator
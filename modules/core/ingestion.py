@@ -0,0 +1,207 @@
+"""
+Background market data ingestion
+
+Run as a separate process:
+
+    python -m modules.core.ingestion --interval 1m --poll 30 ENGI.PA BTC-USD
+
+It polls the active provider and writes the latest bars of each ticker into a
+memory-mapped ring buffer shared by every dashboard session (readers copy out the
+bars they need, checked against the writer's sequence number).
+"""
+import os
+import time
+import logging
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+from modules.core.price_store import BAR_DTYPE, OHLCV_COLUMNS, normalize_ohlcv
+
+logger = logging.getLogger(__name__)
+
+_SHM_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+DEFAULT_BUFFER_DIR = os.environ.get("BAR_BUFFER_DIR", os.path.join(_SHM_DIR, "quant_bars"))
+
+# Header: [capacity, sequence, count, updated_at]; sequence is odd while a write is in progress,
+# count is the number of bars ever written and updated_at the time of the last write
+_HEADER_DTYPE = np.dtype([("capacity", "<i8"), ("sequence", "<i8"), ("count", "<i8"), ("updated_at", "<f8")])
+
+
+class BarRingBuffer:
+    """
+    Fixed-capacity ring of OHLCV bars in a memory-mapped file (one per ticker and interval)
+
+    A single writer appends bars; any number of reader processes map the same
+    file. Readers use the header sequence number (seqlock) to detect torn reads.
+    """
+
+    def __init__(self, ticker: str, interval: str = "1m", capacity: int = 2048,
+                 directory: str = DEFAULT_BUFFER_DIR, readonly: bool = False):
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in ticker)
+        self.path = os.path.join(directory, f"{safe}__{interval}.ring")
+        self.ticker = ticker
+        self.interval = interval
+
+        if readonly:
+            header = np.memmap(self.path, dtype=_HEADER_DTYPE, mode="r", shape=(1,))
+            capacity = int(header["capacity"][0])
+        elif not os.path.exists(self.path):
+            os.makedirs(directory, exist_ok=True)
+            size = _HEADER_DTYPE.itemsize + capacity * BAR_DTYPE.itemsize
+            with open(self.path, "wb") as f:
+                f.truncate(size)
+            header = np.memmap(self.path, dtype=_HEADER_DTYPE, mode="r+", shape=(1,))
+            header["capacity"] = capacity
+
+        mode = "r" if readonly else "r+"
+        self._header = np.memmap(self.path, dtype=_HEADER_DTYPE, mode=mode, shape=(1,))
+        self.capacity = int(self._header["capacity"][0])
+        self._bars = np.memmap(self.path, dtype=BAR_DTYPE, mode=mode,
+                               offset=_HEADER_DTYPE.itemsize, shape=(self.capacity,))
+
+    @classmethod
+    def open(cls, ticker: str, interval: str = "1m", directory: str = DEFAULT_BUFFER_DIR):
+        """Open an existing buffer read-only, or return None if the ingester never wrote it"""
+        try:
+            return cls(ticker, interval, directory=directory, readonly=True)
+        except (OSError, ValueError):
+            return None
+
+    @property
+    def count(self) -> int:
+        return int(self._header["count"][0])
+
+    @property
+    def updated_at(self) -> float:
+        """Wall-clock time of the last write (seconds since epoch)"""
+        return float(self._header["updated_at"][0])
+
+    def write(self, frame: pd.DataFrame):
+        """Append bars newer than the last stored one (the last stored bar is refreshed in place)"""
+        frame = normalize_ohlcv(frame)
+        ts = frame.index.values.astype("datetime64[ns]").astype(np.int64)
+        count = self.count
+        if count:
+            last = self._bars["ts"][(count - 1) % self.capacity]
+            keep = ts >= last
+            ts, frame = ts[keep], frame[keep]
+            if len(ts) and ts[0] == last:
+                count -= 1
+        if not len(ts):
+            return
+        ts, frame = ts[-self.capacity:], frame.iloc[-self.capacity:]
+
+        self._header["sequence"] += 1
+        slots = (count + np.arange(len(ts))) % self.capacity
+        self._bars["ts"][slots] = ts
+        for c in OHLCV_COLUMNS:
+            self._bars[c][slots] = frame[c].to_numpy()
+        self._header["count"] = count + len(ts)
+        self._header["updated_at"] = time.time()
+        self._header["sequence"] += 1
+        self._bars.flush()
+        self._header.flush()
+
+    def latest(self, n: int = None) -> np.ndarray:
+        """
+        Last `n` bars (all buffered bars by default), oldest first
+
+        The bars are copied out of the shared mapping and the copy is kept only if no
+        write started or ended meanwhile (seqlock), so the result is never torn.
+        """
+        for _ in range(100):
+            seq = int(self._header["sequence"][0])
+            if seq % 2:
+                time.sleep(0.0005)
+                continue
+            count = self.count
+            n_avail = min(count, self.capacity)
+            n = n_avail if n is None else min(n, n_avail)
+            end = count % self.capacity or (self.capacity if count else 0)
+            start = end - n
+            if start >= 0:
+                bars = self._bars[start:end].copy()
+            else:
+                bars = np.concatenate([self._bars[start:], self._bars[:end]])
+            if int(self._header["sequence"][0]) == seq:
+                return bars
+        raise RuntimeError(f"Ring buffer {self.path} is being rewritten continuously")
+
+    def to_frame(self, n: int = None) -> pd.DataFrame:
+        """Latest bars as an OHLCV DataFrame (UTC index)"""
+        bars = self.latest(n)
+        index = pd.DatetimeIndex(np.asarray(bars["ts"]).astype("datetime64[ns]")).tz_localize("UTC")
+        return pd.DataFrame({c: bars[c] for c in OHLCV_COLUMNS}, index=index)
+
+
+def read_latest_bars(ticker: str, interval: str = "1m", max_age: float = 120.0):
+    """
+    Latest bars published by the ingestion process
+
+    Returns:
+        OHLCV DataFrame, or None when no ingester feeds this ticker or its data is older than `max_age` seconds
+    """
+    buffer = BarRingBuffer.open(ticker, interval)
+    if buffer is None or buffer.count == 0 or time.time() - buffer.updated_at > max_age:
+        return None
+    return buffer.to_frame()
+
+
+def run_ingestion(tickers, interval: str = "1m", poll_seconds: float = 30.0, capacity: int = 2048,
+                  period: str = "1d", iterations: int = None):
+    """
+    Poll `tickers` forever (or `iterations` times) and publish their bars
+
+    The first poll loads `period` of history, later polls only ask for bars since
+    the last one published.
+    """
+    from modules.core.fetch_coordinator import get_coordinator
+
+    buffers = {t: BarRingBuffer(t, interval, capacity=capacity) for t in tickers}
+    coordinator = get_coordinator()
+    done = 0
+    while iterations is None or done < iterations:
+        started = time.time()
+        by_start = {}
+        for t, buffer in buffers.items():
+            last = buffer.latest(1)
+            # tz-aware: yfinance reads a naive start in the exchange's timezone
+            key = pd.Timestamp(int(last["ts"][0])).tz_localize("UTC") if len(last) else None
+            by_start.setdefault(key, []).append(t)
+        for start, group in by_start.items():
+            try:
+                if start is None:
+                    bars = coordinator.fetch(group, interval, period=period)
+                else:
+                    bars = coordinator.fetch(group, interval, start=start)
+            except Exception as e:
+                logger.warning("Ingestion of %s failed: %s", group, e)
+                continue
+            for t in group:
+                buffers[t].write(bars.get(t))
+        done += 1
+        logger.info("Ingested %d tickers in %.2fs", len(tickers), time.time() - started)
+        if iterations is None or done < iterations:
+            time.sleep(max(0.0, poll_seconds - (time.time() - started)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Poll market data into shared ring buffers")
+    parser.add_argument("tickers", nargs="*", help="tickers to ingest (default: Quant A supported tickers)")
+    parser.add_argument("--interval", default="1m")
+    parser.add_argument("--poll", type=float, default=30.0, help="seconds between polls")
+    parser.add_argument("--capacity", type=int, default=2048, help="bars kept per ticker")
+    args = parser.parse_args()
+
+    tickers = args.tickers
+    if not tickers:
+        from modules.Quant_A.data_fetcher import DataFetcher
+        tickers = list(DataFetcher().supported_tickers)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    run_ingestion(tickers, args.interval, args.poll, args.capacity)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import bisect
+import logging
+import tempfile
+import functools
+import threading
+from collections import deque
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Off by default: set INSTRUMENTATION=1 (or call enable()) to collect stage timings
+_enabled = os.environ.get("INSTRUMENTATION", "").lower() not in ("", "0", "false", "no")
+# Snapshot written after every dashboard run when set: .prom (Prometheus text) or .jsonl (JSON lines)
+METRICS_EXPORT = os.environ.get("METRICS_EXPORT") or None
+# A .jsonl export larger than this is rotated to <path>.1 (one previous file kept)
+EXPORT_MAX_BYTES = int(float(os.environ.get("METRICS_EXPORT_MB", 16)) * 2 ** 20)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = tuple(float(2 ** k) for k in range(10, 31, 2))  # 1 KB .. 1 GB
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(flag: bool = True):
+    global _enabled
+    _enabled = flag
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus layout) plus the latest samples for exact percentiles"""
+
+    def __init__(self, buckets, recent: int = 1024):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=recent)
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        self.recent.append(value)
+
+    def percentile(self, q: float) -> float:
+        return float(np.percentile(self.recent, q)) if self.recent else np.nan
+
+
+class Registry:
+    """Process-wide stage latencies, payload sizes and counters"""
+
+    def __init__(self):
+        self.latency = {}
+        self.sizes = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            if stage not in self.latency:
+                self.latency[stage] = Histogram(LATENCY_BUCKETS)
+            self.latency[stage].observe(seconds)
+
+    def observe_size(self, stage: str, nbytes: int):
+        with self._lock:
+            if stage not in self.sizes:
+                self.sizes[stage] = Histogram(SIZE_BUCKETS)
+            self.sizes[stage].observe(nbytes)
+
+    def increment(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self.latency.clear()
+            self.sizes.clear()
+            self.counters.clear()
+
+    def summary(self) -> pd.DataFrame:
+        """One row per stage: calls, latency percentiles (ms) over the latest samples, mean payload"""
+        with self._lock:
+            rows = {}
+            for stage, h in self.latency.items():
+                rows[stage] = {"Calls": h.count, "Mean (ms)": h.sum / h.count * 1000,
+                               "p50 (ms)": h.percentile(50) * 1000, "p95 (ms)": h.percentile(95) * 1000,
+                               "p99 (ms)": h.percentile(99) * 1000, "Max (ms)": h.max * 1000}
+            for stage, h in self.sizes.items():
+                rows.setdefault(stage, {})["Mean payload (KB)"] = h.sum / h.count / 1024
+        return pd.DataFrame.from_dict(rows, orient="index").sort_index()
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format, with the result cache counters"""
+        lines = []
+
+        def histogram(name, help_text, histograms):
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} histogram"])
+            for stage, h in sorted(histograms.items()):
+                cumulative = np.cumsum(h.counts)
+                for bound, total in zip(list(h.buckets) + ["+Inf"], cumulative):
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {total}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {h.sum}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {h.count}')
+
+        with self._lock:
+            histogram("quant_stage_seconds", "Latency of dashboard and batch stages", self.latency)
+            histogram("quant_payload_bytes", "Size of computed results and chart payloads", self.sizes)
+            if self.counters:
+                lines.extend(["# HELP quant_events_total Instrumented event counts", "# TYPE quant_events_total counter"])
+                lines.extend(f'quant_events_total{{event="{k}"}} {v}' for k, v in sorted(self.counters.items()))
+
+        from modules.core.result_cache import get_result_cache
+        cache = get_result_cache()
+        lines.extend(["# HELP quant_result_cache_total Result cache lookups and evictions",
+                      "# TYPE quant_result_cache_total counter"])
+        lines.extend(f'quant_result_cache_total{{event="{k}"}} {v}' for k, v in sorted(cache.stats.items()))
+        lines.extend(["# HELP quant_result_cache_bytes Memory held by the result cache",
+                      "# TYPE quant_result_cache_bytes gauge", f"quant_result_cache_bytes {cache.bytes}"])
+        return "\n".join(lines) + "\n"
+
+    def to_json_lines(self) -> str:
+        """One JSON record per stage (plus one for the result cache), stamped with the current time"""
+        from modules.core.result_cache import get_result_cache
+        stamp = pd.Timestamp.now(tz="UTC").isoformat()
+        records = [{"timestamp": stamp, "stage": stage, **{k: (None if pd.isna(v) else float(v))
+                                                           for k, v in row.items()}}
+                   for stage, row in self.summary().iterrows()]
+        records.append({"timestamp": stamp, "stage": "result_cache", **get_result_cache().stats,
+                        "bytes": get_result_cache().bytes, **self.counters})
+        return "".join(json.dumps(r) + "\n" for r in records)
+
+    def export(self, path: str):
+        """
+        Write a Prometheus text file (replaced atomically) or append JSON lines, by extension
+
+        Concurrent sessions are serialized; failures are logged, never raised into the page.
+        """
+        try:
+            with self._export_lock:
+                if path.endswith(".jsonl"):
+                    if os.path.exists(path) and os.path.getsize(path) > EXPORT_MAX_BYTES:
+                        os.replace(path, path + ".1")
+                    with open(path, "a") as f:
+                        f.write(self.to_json_lines())
+                    return
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "w") as f:
+                        f.write(self.to_prometheus())
+                    os.chmod(tmp, 0o644)
+                    os.replace(tmp, path)
+                except BaseException:
+                    os.remove(tmp)
+                    raise
+        except OSError as e:
+            logger.warning("Metrics export to %s failed: %s", path, e)
+
+
+_registry = Registry()
+
+
+def get_registry() -> Registry:
+    return _registry
+
+
+def record_size(stage: str, nbytes: int):
+    if _enabled:
+        _registry.observe_size(stage, nbytes)
+
+
+class timed:
+    """
+    Time a stage, as a context manager or a decorator
+
+        with timed("fetch.historical"):
+            ...
+
+        @timed("figure.frontier")
+        def frontier_figure(...):
+
+    When instrumentation is disabled the cost is one global flag check.
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._start = None
+
+    def __enter__(self):
+        if _enabled:
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self._start is not None:
+            _registry.observe(self.stage, time.perf_counter() - self._start)
+            self._start = None
+        return False
+
+    def __call__(self, func):
+        stage = self.stage
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _registry.observe(stage, time.perf_counter() - start)
+        return wrapper
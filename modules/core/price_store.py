@@ -0,0 +1,276 @@
+import os
+import json
+import time
+import threading
+import numpy as np
+import pandas as pd
+
+# Columns kept for every bar, in storage order
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# One record per bar: UTC timestamp (ns) + OHLCV as float64
+BAR_DTYPE = np.dtype([("ts", "<i8")] + [(c, "<f8") for c in OHLCV_COLUMNS])
+
+DEFAULT_STORE_DIR = os.environ.get(
+    "PRICE_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "prices")
+)
+
+# Marker for "leave the recorded coverage untouched"
+_KEEP = object()
+
+_PERIOD_OFFSETS = {
+    "d": lambda n: pd.DateOffset(days=n),
+    "wk": lambda n: pd.DateOffset(weeks=n),
+    "mo": lambda n: pd.DateOffset(months=n),
+    "y": lambda n: pd.DateOffset(years=n),
+}
+
+
+def is_intraday(interval: str) -> bool:
+    """True for minute/hour bars (1m, 5m, 1h...), False for 1d, 1wk, 1mo..."""
+    return interval.endswith("m") or interval.endswith("h")
+
+
+def period_start(period: str, now: pd.Timestamp = None):
+    """
+    Translate a yfinance period string into a naive UTC start timestamp
+
+    Args:
+        period: '5d', '1mo', '6mo', '1y', '5y', 'ytd' or 'max'
+        now: reference time (defaults to current UTC time)
+
+    Returns:
+        pd.Timestamp, or None for 'max'
+    """
+    now = pd.Timestamp.utcnow().tz_localize(None) if now is None else now
+    if period == "max":
+        return None
+    if period == "ytd":
+        return pd.Timestamp(year=now.year, month=1, day=1)
+    for suffix in ("wk", "mo", "d", "y"):
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return (now - _PERIOD_OFFSETS[suffix](int(period[:-len(suffix)]))).normalize()
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def naive_utc(ts) -> pd.Timestamp:
+    """Timestamp as naive UTC, the convention of the store (tz-aware values are converted)"""
+    ts = pd.Timestamp(ts)
+    return ts if ts.tz is None else ts.tz_convert("UTC").tz_localize(None)
+
+
+def normalize_ohlcv(frame: pd.DataFrame) -> pd.DataFrame:
+    """Flatten a single-ticker download into OHLCV float columns with a naive UTC index"""
+    if frame is None or len(frame) == 0:
+        return pd.DataFrame(columns=OHLCV_COLUMNS, dtype=float)
+    frame = frame.copy()
+    if isinstance(frame.columns, pd.MultiIndex):
+        frame.columns = frame.columns.get_level_values(-1)
+    frame = frame.reindex(columns=OHLCV_COLUMNS).astype(float)
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    frame.index = index
+    frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+    return frame.dropna(how="all")
+
+
+def _grow_npy(path: str, start: int, rows: np.ndarray) -> bool:
+    """
+    Write `rows` from row `start` of a 1-D bar .npy file in place and patch the row count in its header
+
+    Rows are written before the header, so a reader opening the file meanwhile sees the
+    previous count. Returns False (nothing written) when the file cannot be grown in place.
+    """
+    from numpy.lib import format as npy
+    with open(path, "r+b") as f:
+        version = npy.read_magic(f)
+        reader = {(1, 0): npy.read_array_header_1_0, (2, 0): npy.read_array_header_2_0}.get(version)
+        if reader is None:
+            return False
+        shape, _, dtype = reader(f)
+        offset = f.tell()
+        if dtype != BAR_DTYPE or len(shape) != 1 or start > shape[0] or start + len(rows) < shape[0]:
+            return False
+        f.seek(0)
+        header = f.read(offset)
+        old_shape, new_shape = f"'shape': ({shape[0]},)".encode(), f"'shape': ({start + len(rows)},)".encode()
+        if old_shape not in header:
+            return False
+        # the header dict is padded with spaces up to the data offset
+        text = header.replace(old_shape, new_shape)[:-1].rstrip(b" ")
+        if len(text) + 1 > offset:
+            return False
+        f.seek(offset + start * BAR_DTYPE.itemsize)
+        f.write(rows.tobytes())
+        f.flush()
+        f.seek(0)
+        f.write(text.ljust(offset - 1, b" ") + b"\n")
+    return True
+
+
+class PriceStore:
+    """
+    On-disk columnar bar store, one memory-mappable .npy file per ticker and interval
+
+    Reads are served from disk; only bars after the last stored timestamp are
+    downloaded and appended to the file in place.
+    """
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR, download=None, refresh_after: float = 60.0):
+        """
+        Args:
+            root: directory holding the bar files
+            download: callable (tickers, interval, start=None, period=None) -> dict of DataFrames,
+                usually a MarketDataProvider.download
+            refresh_after: seconds during which stored bars are served without any network call
+        """
+        self.root = root
+        self.download = download
+        self.refresh_after = refresh_after
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, ticker: str, interval: str) -> str:
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in ticker)
+        return os.path.join(self.root, f"{safe}__{interval}")
+
+    def _lock(self, ticker: str, interval: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((ticker, interval), threading.Lock())
+
+    def _read_meta(self, ticker: str, interval: str) -> dict:
+        try:
+            with open(self._path(ticker, interval) + ".json") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def load_bars(self, ticker: str, interval: str) -> np.ndarray:
+        """Memory-map the stored bars (structured array, empty if nothing stored)"""
+        path = self._path(ticker, interval) + ".npy"
+        if not os.path.exists(path):
+            return np.empty(0, dtype=BAR_DTYPE)
+        return np.load(path, mmap_mode="r")
+
+    def read(self, ticker: str, interval: str = "1d", start=None) -> pd.DataFrame:
+        """Return stored bars as an OHLCV DataFrame, optionally from `start` onwards"""
+        bars = self.load_bars(ticker, interval)
+        if start is not None and len(bars):
+            bars = bars[np.searchsorted(bars["ts"], pd.Timestamp(start).value):]
+        index = pd.DatetimeIndex(np.asarray(bars["ts"]).astype("datetime64[ns]"), name="Date")
+        if is_intraday(interval):
+            index = index.tz_localize("UTC")
+        return pd.DataFrame({c: np.asarray(bars[c]) for c in OHLCV_COLUMNS}, index=index)
+
+    def append(self, ticker: str, interval: str, frame: pd.DataFrame, covered_from=_KEEP):
+        """
+        Merge new bars into the store
+
+        Stored bars at or after the first new timestamp are replaced, so a partial
+        last bar gets overwritten by its final version. `covered_from` records the
+        start of a full download (None meaning 'max').
+
+        A tail update writes the new bars after the stored ones and patches the row
+        count, so its cost does not depend on the stored history. Full downloads, and
+        updates that would shorten the file, rewrite it (atomically replaced).
+        """
+        frame = normalize_ohlcv(frame)
+        with self._lock(ticker, interval):
+            old = self.load_bars(ticker, interval)
+            new = np.empty(len(frame), dtype=BAR_DTYPE)
+            new["ts"] = frame.index.values.astype("datetime64[ns]").astype(np.int64)
+            for c in OHLCV_COLUMNS:
+                new[c] = frame[c].to_numpy()
+            cut = int(np.searchsorted(old["ts"], new["ts"][0])) if len(new) else len(old)
+
+            path = self._path(ticker, interval)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npy"
+            grown = covered_from is _KEEP and len(old) > 0 and _grow_npy(path + ".npy", cut, new)
+            if not grown:
+                np.save(tmp, np.concatenate([old[:cut], new]))
+                os.replace(tmp, path + ".npy")
+
+            meta = self._read_meta(ticker, interval)
+            meta["fetched_at"] = time.time()
+            if covered_from is not _KEEP:
+                meta["covered_from"] = None if covered_from is None else str(covered_from)
+            with open(tmp + ".json", "w") as f:
+                json.dump(meta, f)
+            os.replace(tmp + ".json", path + ".json")
+
+    def _needs(self, ticker: str, interval: str, start):
+        """Return ('full', None), ('tail', last_ts) or (None, None) when the store is fresh"""
+        meta = self._read_meta(ticker, interval)
+        bars = self.load_bars(ticker, interval)
+        if not len(bars) or "covered_from" not in meta:
+            return "full", None
+        covered = meta["covered_from"]
+        if covered is not None and (start is None or pd.Timestamp(covered) > start):
+            return "full", None
+        if time.time() - meta.get("fetched_at", 0) < self.refresh_after:
+            return None, None
+        return "tail", pd.Timestamp(int(bars["ts"][-1]))
+
+    def fetch_many(self, tickers, period: str = "1y", interval: str = "1d") -> dict:
+        """
+        Return OHLCV bars for several tickers, downloading only what the store lacks
+
+        Tickers needing the same download window are grouped into one request.
+
+        Returns:
+            Dictionary ticker -> OHLCV DataFrame covering `period`
+        """
+        tickers = list(dict.fromkeys(tickers))
+        start = period_start(period)
+
+        full, tails = [], {}
+        for t in tickers:
+            kind, last = self._needs(t, interval, start)
+            if kind == "full":
+                full.append(t)
+            elif kind == "tail":
+                tails.setdefault(last, []).append(t)
+
+        if full:
+            for t, frame in self.download(full, interval, period=period).items():
+                if len(frame):
+                    self.append(t, interval, frame, covered_from=start)
+        for last, group in tails.items():
+            # the last stored bar is downloaded again (it may have been partial); intraday starts
+            # are passed tz-aware, a naive time would be read in the exchange's timezone
+            download_start = last.date() if not is_intraday(interval) else last.tz_localize("UTC")
+            for t, frame in self.download(group, interval, start=download_start).items():
+                frame = normalize_ohlcv(frame)
+                frame = frame[frame.index >= (last.normalize() if not is_intraday(interval) else last)]
+                if len(frame):
+                    self.append(t, interval, frame)
+
+        return {t: self.read(t, interval, start=start) for t in tickers}
+
+    def fetch(self, ticker: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
+        """Single-ticker version of fetch_many"""
+        return self.fetch_many([ticker], period=period, interval=interval)[ticker]
+
+
+_stores = {}
+
+
+def get_price_store() -> PriceStore:
+    """
+    Process-wide PriceStore of the active provider (one sub-directory per provider)
+
+    Downloads go through the shared FetchCoordinator.
+    """
+    from modules.core.providers import get_provider
+    from modules.core.fetch_coordinator import get_coordinator
+
+    provider = get_provider()
+    coordinator = get_coordinator()
+    store = _stores.get(provider.name)
+    if store is None or store.download != coordinator.fetch:
+        _stores[provider.name] = PriceStore(os.path.join(DEFAULT_STORE_DIR, provider.name),
+                                            download=coordinator.fetch)
+    return _stores[provider.name]
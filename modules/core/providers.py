@@ -0,0 +1,293 @@
+import os
+import zlib
+import numpy as np
+import pandas as pd
+from modules.core.price_store import OHLCV_COLUMNS, normalize_ohlcv, period_start, is_intraday, naive_utc, PriceStore
+
+# Trading session used for synthetic intraday bars (09:30-16:00 New York, in UTC)
+SESSION_OPEN_UTC = pd.Timedelta(hours=14, minutes=30)
+SESSION_MINUTES = 390
+
+
+def interval_minutes(interval: str) -> int:
+    """Bar length in minutes for intraday intervals ('1m', '15m', '1h'...)"""
+    if interval.endswith("m"):
+        return int(interval[:-1])
+    if interval.endswith("h"):
+        return 60 * int(interval[:-1])
+    raise ValueError(f"Not an intraday interval: {interval}")
+
+
+def _window(frame: pd.DataFrame, start=None, period: str = None) -> pd.DataFrame:
+    """Keep the bars requested through either `start` or `period`"""
+    if start is not None:
+        return frame[frame.index >= naive_utc(start)]
+    first = period_start(period) if period is not None else None
+    return frame if first is None else frame[frame.index >= first]
+
+
+class MarketDataProvider:
+    """
+    Base class for market data backends
+
+    Every backend returns normalized OHLCV frames (see price_store.normalize_ohlcv)
+    so the store and fetchers never depend on where bars come from.
+    """
+
+    name = "base"
+
+    def download(self, tickers, interval: str = "1d", start=None, period: str = None) -> dict:
+        """
+        Download OHLCV bars for several tickers
+
+        Args:
+            tickers: iterable of ticker symbols
+            interval: bar size ('1m', '1h', '1d', '1wk', '1mo'...)
+            start: first timestamp wanted, naive UTC or tz-aware (takes precedence over period)
+            period: yfinance-style lookback ('5d', '1y', 'max'...)
+
+        Returns:
+            Dictionary ticker -> OHLCV DataFrame
+        """
+        raise NotImplementedError
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live data from Yahoo Finance"""
+
+    name = "yfinance"
+
+    def download(self, tickers, interval="1d", start=None, period=None):
+        import yfinance as yf
+
+        tickers = list(tickers)
+        kwargs = {"start": start} if start is not None else {"period": period or "1y"}
+        data = yf.download(tickers, interval=interval, group_by="ticker", auto_adjust=True,
+                           progress=False, **kwargs)
+        if data is None or len(data) == 0:
+            return {t: normalize_ohlcv(None) for t in tickers}
+
+        result = {}
+        for t in tickers:
+            if isinstance(data.columns, pd.MultiIndex):
+                frame = data[t] if t in data.columns.get_level_values(0) else None
+            else:
+                frame = data
+            result[t] = normalize_ohlcv(frame)
+        return result
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Replay recorded bars from disk
+
+    Looks for `<ticker>_<interval>.csv` (Date index + OHLCV columns) first, then
+    for a PriceStore file of the same ticker/interval under `directory`.
+    """
+
+    name = "replay"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._store = PriceStore(directory, download=None)
+
+    def download(self, tickers, interval="1d", start=None, period=None):
+        result = {}
+        for t in tickers:
+            csv_path = os.path.join(self.directory, f"{t}_{interval}.csv")
+            if os.path.exists(csv_path):
+                frame = normalize_ohlcv(pd.read_csv(csv_path, index_col=0, parse_dates=True))
+            else:
+                frame = normalize_ohlcv(self._store.read(t, interval))
+            result[t] = _window(frame, start, period)
+        return result
+
+
+class SyntheticProvider(MarketDataProvider):
+    """
+    Seeded synthetic prices: geometric Brownian motion with Poisson jumps
+
+    Each ticker gets its own drift/volatility and a path that only depends on
+    (seed, ticker, interval), so repeated or incremental downloads are consistent.
+    """
+
+    name = "synthetic"
+
+    def __init__(self, seed: int = 0, origin: str = "2000-01-03", jump_intensity: float = 5.0,
+                 jump_mean: float = -0.01, jump_std: float = 0.04):
+        """
+        Args:
+            seed: global seed
+            origin: first bar of every generated history
+            jump_intensity: expected number of jumps per year
+            jump_mean, jump_std: log-size of jumps
+        """
+        self.seed = seed
+        self.origin = pd.Timestamp(origin)
+        self.jump_intensity = jump_intensity
+        self.jump_mean = jump_mean
+        self.jump_std = jump_std
+
+    # bars per block: every block draws its shocks from its own seed, so a bar never depends on the window
+    BLOCK = 2048
+
+    def _rng(self, ticker: str, interval: str, *key) -> np.random.Generator:
+        return np.random.default_rng([self.seed, zlib.crc32(ticker.encode()), zlib.crc32(interval.encode()), *key])
+
+    def calendar(self, interval: str, end=None, start=None) -> pd.DatetimeIndex:
+        """Bar timestamps from `start` (defaults to `origin`) to `end` (defaults to now)"""
+        end = pd.Timestamp.utcnow().tz_localize(None) if end is None else pd.Timestamp(end)
+        first = self.origin if start is None else max(self.origin, pd.Timestamp(start).normalize())
+        days = pd.bdate_range(first, end.normalize())
+        if not is_intraday(interval):
+            return days
+        step = interval_minutes(interval)
+        offsets = SESSION_OPEN_UTC + pd.to_timedelta(np.arange(0, SESSION_MINUTES, step), unit="min")
+        stamps = (days.values[:, None] + offsets.values[None, :]).ravel()
+        return pd.DatetimeIndex(stamps[stamps <= end.to_datetime64()])
+
+    def generate(self, ticker: str, interval: str = "1d", end=None, start=None) -> pd.DataFrame:
+        """
+        Synthetic OHLCV bars of one ticker from `start` (default: `origin`) to `end`
+
+        Bars are numbered from `origin` and generated in blocks of BLOCK bars. The log price
+        at every block boundary follows a coarse random walk (one draw per block) and each
+        block is a path with its own shocks pinned to those two boundaries. A bar therefore
+        only depends on (seed, ticker, interval, position): adding bars or asking for a
+        shorter window never changes the past, and only the blocks overlapping the window
+        are generated.
+        """
+        daily = not is_intraday(interval)
+        stream = "1d" if daily else interval
+        aggregated = daily and interval not in ("1d", "5d")
+        # whole periods for the weekly / monthly aggregates, plus the previous bar for the first open
+        lookback = pd.Timedelta(days=100 if aggregated else 7)
+        first_day = None if start is None else pd.Timestamp(start).normalize() - lookback
+        index = self.calendar(stream, end, first_day)
+        if start is not None:
+            # bars before `start` are only used for the first open
+            keep = max(0, int(index.searchsorted(pd.Timestamp(start))) - 1) if not aggregated else 0
+            index = index[keep:]
+        n = len(index)
+        if n == 0:
+            return normalize_ohlcv(None)
+
+        rng = self._rng(ticker, stream)
+        mu = rng.normal(0.06, 0.10)
+        sigma = rng.uniform(0.15, 0.60)
+        s0 = rng.uniform(10, 500)
+        dt = 1 / 252 if daily else interval_minutes(interval) / (252 * SESSION_MINUTES)
+        per_day = 1 if daily else len(range(0, SESSION_MINUTES, interval_minutes(interval)))
+
+        # position of every bar counted from origin (business days x bars per session)
+        day_pos = np.busday_count(self.origin.date(), index.normalize().values.astype("datetime64[D]"))
+        minutes = ((index - index.normalize()) - SESSION_OPEN_UTC) // pd.Timedelta(minutes=1)
+        pos = day_pos * per_day + (0 if daily else np.asarray(minutes) // interval_minutes(interval))
+
+        # log close at the end of each block: drift and variance of one block, jumps included
+        block = self.BLOCK
+        last_block = int(pos[-1]) // block
+        drift = (mu - 0.5 * sigma ** 2 + self.jump_intensity * self.jump_mean) * dt * block
+        spread_var = (sigma ** 2 + self.jump_intensity * (self.jump_mean ** 2 + self.jump_std ** 2)) * dt * block
+        steps = drift + np.sqrt(spread_var) * self._rng(ticker, stream, 1).standard_normal(last_block + 1)
+        levels = np.log(s0) + np.concatenate([[0.0], np.cumsum(steps)])
+
+        log_close = np.empty(n)
+        spread = np.empty((2, n))
+        volume = np.empty(n)
+        blocks = pos // block
+        for k in np.unique(blocks):
+            rng_k = self._rng(ticker, stream, 2, int(k))
+            log_ret = (mu - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * rng_k.standard_normal(block)
+            jumps = rng_k.poisson(self.jump_intensity * dt, block)
+            log_ret += jumps * self.jump_mean + np.sqrt(jumps) * self.jump_std * rng_k.standard_normal(block)
+            if k == 0:
+                log_ret[0] = 0.0
+            path = np.cumsum(log_ret)
+            path += np.arange(1, block + 1) / block * (levels[k + 1] - levels[k] - path[-1])  # pin the block end
+            sel = blocks == k
+            offset = pos[sel] - k * block
+            log_close[sel] = levels[k] + path[offset]
+            spread[:, sel] = np.abs(rng_k.standard_normal((2, block)))[:, offset] * sigma * np.sqrt(dt) * 0.5
+            volume[sel] = np.round(rng_k.lognormal(13, 0.5, block))[offset]
+        close = np.exp(log_close)
+
+        open_ = np.empty(n)
+        open_[0] = s0 if pos[0] == 0 else close[0]
+        open_[1:] = close[:-1]
+        frame = pd.DataFrame({
+            "Open": open_,
+            "High": np.maximum(open_, close) * (1 + spread[0]),
+            "Low": np.minimum(open_, close) * (1 - spread[1]),
+            "Close": close,
+            "Volume": volume,
+        }, index=index)
+        if start is not None and not aggregated:
+            frame = frame[frame.index >= pd.Timestamp(start)]
+
+        if interval in ("1d", "5d") or not daily:
+            return frame
+        rule = {"1wk": "W-FRI", "1mo": "ME", "3mo": "QE"}[interval]
+        agg = frame.resample(rule).agg({"Open": "first", "High": "max", "Low": "min",
+                                        "Close": "last", "Volume": "sum"})
+        return agg.dropna()
+
+    def download(self, tickers, interval="1d", start=None, period=None):
+        first = naive_utc(start) if start is not None else (period_start(period) if period is not None else None)
+        return {t: _window(self.generate(t, interval, start=first), start, period)[OHLCV_COLUMNS] for t in tickers}
+
+
+def synthetic_panel(n_assets: int, n_bars: int, seed: int = 0, interval: str = "1d") -> pd.DataFrame:
+    """
+    Close-price panel of any size (dates x assets) generated in one vectorized pass
+
+    Unlike SyntheticProvider the panel is not tied to a calendar origin, which
+    makes it suited to benchmarks of arbitrary length.
+    """
+    rng = np.random.default_rng(seed)
+    dt = 1 / 252 if not is_intraday(interval) else interval_minutes(interval) / (252 * SESSION_MINUTES)
+    mu = rng.normal(0.06, 0.10, n_assets)
+    sigma = rng.uniform(0.15, 0.60, n_assets)
+
+    log_ret = rng.standard_normal((n_bars, n_assets))
+    log_ret *= sigma * np.sqrt(dt)
+    log_ret += (mu - 0.5 * sigma ** 2) * dt
+    jumps = rng.poisson(5.0 * dt, (n_bars, n_assets))
+    log_ret += jumps * -0.01
+    log_ret[0] = 0.0
+    np.cumsum(log_ret, axis=0, out=log_ret)
+    np.exp(log_ret, out=log_ret)
+    log_ret *= rng.uniform(10, 500, n_assets)
+
+    freq = "B" if not is_intraday(interval) else f"{interval_minutes(interval)}min"
+    index = pd.date_range(end=pd.Timestamp("2025-01-01"), periods=n_bars, freq=freq)
+    return pd.DataFrame(log_ret, index=index, columns=[f"SYN{i:05d}" for i in range(n_assets)])
+
+
+def provider_from_spec(spec: str) -> MarketDataProvider:
+    """Build a provider from 'yfinance', 'synthetic[:seed]' or 'replay:<directory>'"""
+    kind, _, arg = spec.partition(":")
+    if kind == "yfinance":
+        return YFinanceProvider()
+    if kind == "synthetic":
+        return SyntheticProvider(seed=int(arg) if arg else 0)
+    if kind == "replay":
+        return ReplayProvider(arg)
+    raise ValueError(f"Unknown market data provider: {spec}")
+
+
+_provider = None
+
+
+def get_provider() -> MarketDataProvider:
+    """Active provider, chosen by the MARKET_DATA_PROVIDER environment variable (default yfinance)"""
+    global _provider
+    if _provider is None:
+        _provider = provider_from_spec(os.environ.get("MARKET_DATA_PROVIDER", "yfinance"))
+    return _provider
+
+
+def set_provider(provider: MarketDataProvider):
+    """Swap the provider used by every fetcher (e.g. SyntheticProvider for offline profiling)"""
+    global _provider
+    _provider = provider
@@ -0,0 +1,202 @@
+import os
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+import numpy as np
+import pandas as pd
+from modules.core.instrumentation import enabled, record_size, timed
+
+DEFAULT_CACHE_MB = float(os.environ.get("RESULT_CACHE_MB", 256))
+# Evicted results are pickled there when set (and read back on a later miss)
+DEFAULT_SPILL_DIR = os.environ.get("RESULT_CACHE_DIR") or None
+
+
+def data_version(data) -> str:
+    """Content hash of a Series / DataFrame / array: changes whenever a bar is added or revised"""
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(data, (pd.Series, pd.DataFrame)):
+        digest.update(np.ascontiguousarray(data.index.asi8 if isinstance(data.index, pd.DatetimeIndex)
+                                           else data.index.to_numpy()).tobytes())
+        if isinstance(data, pd.DataFrame):
+            digest.update("|".join(map(str, data.columns)).encode())
+        data = data.to_numpy()
+    digest.update(np.ascontiguousarray(data).tobytes())
+    return digest.hexdigest()
+
+
+def make_key(namespace: str, *parts) -> str:
+    """
+    Content-addressed key: namespace + inputs, where pandas / numpy inputs count by their data version
+
+    e.g. make_key("quant_a.backtest", ticker, period, strategy, params, prices)
+    """
+    normalized = [data_version(p) if isinstance(p, (pd.Series, pd.DataFrame, np.ndarray)) else
+                  sorted(p.items()) if isinstance(p, dict) else p for p in parts]
+    return namespace + ":" + hashlib.blake2b(repr(normalized).encode(), digest_size=16).hexdigest()
+
+
+def nbytes(value) -> int:
+    """Approximate memory footprint of a cached result"""
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        return int(np.sum(value.memory_usage(index=True, deep=False)))
+    if isinstance(value, (np.ndarray, pd.Index)):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(nbytes(v) for v in value.values()) + 64 * len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(nbytes(v) for v in value) + 8 * len(value)
+    if hasattr(value, "__dict__"):
+        return nbytes(vars(value))
+    return 64
+
+
+class ResultCache:
+    """
+    Process-wide LRU cache of computed results, shared by every dashboard session
+
+    - bounded by `max_bytes` (approximate footprint of the cached values)
+    - evicted entries optionally spill to `spill_dir` and are reloaded on a later miss
+    - get_or_compute is single-flight: concurrent sessions asking for the same key wait
+      on one computation
+    Cached values are shared between sessions and must not be modified by callers.
+    """
+
+    def __init__(self, max_bytes: int = int(DEFAULT_CACHE_MB * 2 ** 20), spill_dir: str = DEFAULT_SPILL_DIR):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0, "spills": 0}
+
+    def _spill_path(self, key: str) -> str:
+        return os.path.join(self.spill_dir, key.replace(":", "__") + ".pkl")
+
+    def get(self, key: str, default=None):
+        """Cached value (memory, then spill directory) or `default`"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return self._entries[key][0]
+        if self.spill_dir:
+            try:
+                with open(self._spill_path(key), "rb") as f:
+                    value = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+            else:
+                with self._lock:
+                    self.stats["disk_hits"] += 1
+                self.put(key, value)
+                return value
+        with self._lock:
+            self.stats["misses"] += 1
+        return default
+
+    def put(self, key: str, value):
+        """Store a result, evicting least recently used entries beyond the byte budget"""
+        size = nbytes(value)
+        evicted = []
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return value  # larger than the whole budget: not kept
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                old_key, (old_value, old_size) = self._entries.popitem(last=False)
+                self.bytes -= old_size
+                self.stats["evictions"] += 1
+                evicted.append((old_key, old_value))
+        for old_key, old_value in evicted:
+            self._spill(old_key, old_value)
+        return value
+
+    def _spill(self, key: str, value):
+        if not self.spill_dir:
+            return
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = self._spill_path(key)
+        if os.path.exists(path):
+            return
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+            with self._lock:
+                self.stats["spills"] += 1
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def get_or_compute(self, key: str, compute):
+        """
+        Cached result for `key`, computed once by `compute()` on a miss
+
+        Concurrent callers with the same key share the in-flight computation.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+
+        with self._lock:
+            if key in self._entries:  # computed by another session in the meantime
+                return self._entries[key][0]
+            fut = self._inflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = self._inflight[key] = Future()
+        if not owner:
+            return fut.result()
+
+        # "quant_a.backtest:<hash>:metrics" is timed as compute.quant_a.backtest.metrics
+        parts = key.split(":")
+        stage = "compute." + ".".join(parts[:1] + parts[2:3])
+        try:
+            with timed(stage):
+                value = compute()
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            if enabled():
+                record_size(stage, nbytes(value))
+            self.put(key, value)
+            fut.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def summary(self) -> str:
+        """One-line hit/miss report"""
+        lookups = self.stats["hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        rate = (self.stats["hits"] + self.stats["disk_hits"]) / lookups if lookups else 0.0
+        return (f"{len(self._entries)} results, {self.bytes / 2 ** 20:.1f}/{self.max_bytes / 2 ** 20:.0f} MB, "
+                f"hit rate {rate:.0%} ({self.stats['hits']} hits, {self.stats['disk_hits']} from disk, "
+                f"{self.stats['misses']} misses, {self.stats['evictions']} evictions)")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """Process-wide result cache (shared by every dashboard session)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache()
+        return _cache
@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+
+# Streaming rolling-window analytics shared by both dashboards.
+# Each chunk is processed with a constant number of vectorized O(n) passes
+# whatever the window length: running sums come from cumulative sums over the
+# chunk plus the last `window - 1` bars carried from the previous chunk, and
+# rolling extrema and drawdowns use the van Herk/Gil-Werman block algorithm (the
+# vectorized counterpart of a monotonic deque). Feeding a series in one chunk or many
+# gives the same output.
+
+
+def sliding_max(x: np.ndarray, window: int) -> np.ndarray:
+    """Maximum of every full window of `x` (len(x) - window + 1 values) in O(n)"""
+    n = len(x)
+    padded = np.full(-(-n // window) * window, -np.inf)
+    padded[:n] = x
+    blocks = padded.reshape(-1, window)
+    prefix = np.maximum.accumulate(blocks, axis=1).ravel()
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    return np.maximum(suffix[:n - window + 1], prefix[window - 1:n])
+
+
+def sliding_max_drawdown(x: np.ndarray, window: int) -> np.ndarray:
+    """
+    Deepest fall min(x_j - x_i), i <= j, inside every full window of `x` in O(n)
+
+    With blocks of `window` values, a window is a block suffix followed by a block prefix:
+    its deepest fall lies in the suffix, in the prefix, or goes from the suffix maximum to
+    the prefix minimum, and all three come from running extrema within blocks.
+    """
+    n = len(x)
+    if n < window:
+        return np.empty(0)
+    padded = np.full(-(-n // window) * window, np.nan)
+    padded[:n] = x
+    blocks = padded.reshape(-1, window)
+    backward = blocks[:, ::-1]
+    with np.errstate(invalid="ignore"):  # -inf padding before the first bar gives NaN, skipped by fmin
+        prefix_min = np.fmin.accumulate(blocks, axis=1).ravel()
+        prefix_dd = np.fmin.accumulate(blocks - np.fmax.accumulate(blocks, axis=1), axis=1).ravel()
+        suffix_max = np.fmax.accumulate(backward, axis=1)[:, ::-1].ravel()
+        suffix_dd = np.fmin.accumulate(np.fmin.accumulate(backward, axis=1) - backward, axis=1)[:, ::-1].ravel()
+        start = np.arange(n - window + 1)
+        end = start + window - 1
+        across = np.fmin(np.fmin(suffix_dd[start], prefix_dd[end]), prefix_min[end] - suffix_max[start])
+    # a window aligned on a block is that block's prefix
+    return np.where(start % window == 0, prefix_dd[end], across)
+
+
+def _window_sums(x: np.ndarray, window: int) -> np.ndarray:
+    cs = np.concatenate([[0.0], np.cumsum(x)])
+    return cs[window:] - cs[:-window]
+
+
+class RollingMetrics:
+    """
+    Rolling return, volatility, Sharpe, win rate and drawdown over the last `window` bars
+
+    Drawdown is measured against the highest NAV of the trailing window and the
+    rolling max drawdown is the deepest peak-to-trough fall of the NAV inside that window.
+    Window statistics are NaN until `window` bars have been seen.
+    """
+
+    COLUMNS = ["Rolling Return (%)", "Rolling Volatility (%)", "Rolling Sharpe", "Rolling Win Rate (%)",
+               "Drawdown (%)", "Rolling Max Drawdown (%)"]
+
+    def __init__(self, window: int = 63, periods_per_year: int = 252, risk_free_rate: float = 0.0):
+        self.window = window
+        self.periods_per_year = periods_per_year
+        self.risk_free_rate = risk_free_rate
+        self.seen = 0
+        self.log_nav = 0.0
+        # last window - 1 values of the previous chunk (padding before the first bar)
+        self._returns = np.zeros(window - 1)
+        self._log_nav = np.full(window - 1, -np.inf)
+
+    def update_chunk(self, returns: np.ndarray) -> np.ndarray:
+        """
+        Feed the next chunk of period returns (NaN counts as a flat bar)
+
+        Returns:
+            (len(returns), 6) array aligned with COLUMNS
+        """
+        r = np.nan_to_num(np.asarray(returns, dtype=np.float64), nan=0.0)
+        n, w, ppy = len(r), self.window, self.periods_per_year
+        out = np.full((n, len(self.COLUMNS)), np.nan)
+        if n == 0:
+            return out
+
+        ext = np.concatenate([self._returns, r])
+        log_growth = np.log1p(ext)
+        sums = _window_sums(ext, w)
+        sums_sq = _window_sums(ext * ext, w)
+        wins = _window_sums((ext > 0).astype(np.float64), w)
+        growth = _window_sums(log_growth, w)
+
+        log_nav = np.concatenate([self._log_nav, self.log_nav + np.cumsum(log_growth[w - 1:])])
+        drawdown = np.expm1(log_nav[w - 1:] - sliding_max(log_nav, w))
+        worst = np.expm1(np.minimum(sliding_max_drawdown(log_nav, w), 0.0))
+
+        mean = sums / w
+        std = np.sqrt(np.maximum(sums_sq - w * mean * mean, 0.0) / max(w - 1, 1))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe = np.where(std > 0, np.sqrt(ppy) * (mean - self.risk_free_rate / ppy) / std, 0.0)
+
+        full = (self.seen + np.arange(1, n + 1)) >= w
+        out[full, 0] = np.expm1(growth[full]) * 100
+        out[full, 1] = std[full] * np.sqrt(ppy) * 100
+        out[full, 2] = sharpe[full]
+        out[full, 3] = wins[full] / w * 100
+        out[:, 4] = drawdown * 100
+        out[full, 5] = worst[full] * 100
+
+        self.seen += n
+        self.log_nav = log_nav[-1]
+        if w > 1:
+            self._returns = ext[-(w - 1):]
+            self._log_nav = log_nav[-(w - 1):]
+        return out
+
+
+def iter_rolling_metrics(chunks, window: int = 63, periods_per_year: int = 252,
+                         risk_free_rate: float = 0.0):
+    """
+    Generator of rolling metrics over an iterable of return Series chunks
+
+    Yields:
+        DataFrame per chunk, indexed like the chunk, with RollingMetrics.COLUMNS
+    """
+    state = RollingMetrics(window, periods_per_year, risk_free_rate)
+    for chunk in chunks:
+        yield pd.DataFrame(state.update_chunk(chunk.to_numpy()), index=chunk.index, columns=RollingMetrics.COLUMNS)
+
+
+def rolling_metrics(returns: pd.Series, window: int = 63, periods_per_year: int = 252,
+                    risk_free_rate: float = 0.0, chunk_size: int = 100_000) -> pd.DataFrame:
+    """Rolling metrics of a whole return Series (processed in chunks of `chunk_size` bars)"""
+    returns = returns.dropna()
+    chunks = (returns.iloc[i:i + chunk_size] for i in range(0, len(returns), chunk_size))
+    frames = list(iter_rolling_metrics(chunks, window, periods_per_year, risk_free_rate))
+    if not frames:
+        return pd.DataFrame(columns=RollingMetrics.COLUMNS, dtype=float)
+    return pd.concat(frames)
@@ -0,0 +1,124 @@
+import sys
+import time
+import logging
+import inspect
+import functools
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from modules.core.result_cache import make_key
+
+logger = logging.getLogger(__name__)
+
+# Optional override: backend(func, ttl, max_entries) -> cached function (see set_cache_backend)
+_backend = None
+
+
+def in_streamlit() -> bool:
+    """True inside a Streamlit script run; False for batch jobs, worker processes and plain imports"""
+    if "streamlit" not in sys.modules:  # never imports streamlit itself
+        return False
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    return get_script_run_ctx(suppress_warning=True) is not None
+
+
+def set_cache_backend(backend):
+    """
+    Replace the cache used by @cache_data functions (None restores the default)
+
+    Args:
+        backend: callable (func, ttl, max_entries) -> cached function, e.g. a disk cache for batch jobs
+    """
+    global _backend
+    _backend = backend
+
+
+def _copy(value):
+    """Copy of pandas / NumPy values (tuples of them included), other values as is"""
+    if isinstance(value, tuple):
+        return tuple(_copy(v) for v in value)
+    return value.copy() if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)) else value
+
+
+def memory_cache(func, ttl: float = None, max_entries: int = 128):
+    """
+    In-process TTL + LRU cache, used outside Streamlit
+
+    Like st.cache_data, arguments whose name starts with "_" are not part of the key, and
+    pandas / NumPy results are returned as copies, so callers may modify them.
+    """
+    signature = inspect.signature(func)
+    hashed = [name for name in signature.parameters if not name.startswith("_")]
+    entries = OrderedDict()  # key -> (expiry, value)
+    lock = threading.Lock()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = make_key(func.__qualname__, *[p for name in hashed for p in (name, bound.arguments[name])])
+        now = time.monotonic()
+        with lock:
+            if key in entries and entries[key][0] > now:
+                entries.move_to_end(key)
+                return _copy(entries[key][1])
+        value = func(*args, **kwargs)
+        with lock:
+            entries[key] = (now + ttl if ttl else float("inf"), value)
+            while len(entries) > max_entries:
+                entries.popitem(last=False)
+        return _copy(value)
+
+    def clear():
+        with lock:
+            entries.clear()
+
+    wrapper.clear = clear
+    return wrapper
+
+
+def _streamlit_cache(func, ttl: float = None, max_entries: int = 128):
+    import streamlit as st
+    return st.cache_data(ttl=ttl, max_entries=max_entries)(func)
+
+
+def cache_data(ttl: float = None, max_entries: int = 128):
+    """
+    Drop-in for @st.cache_data(ttl=...) that does not need Streamlit
+
+    The backend is chosen at call time: st.cache_data inside a Streamlit run, the in-process
+    memory_cache otherwise, or the backend installed with set_cache_backend(). Importing a
+    decorated module therefore never imports streamlit.
+    """
+    def decorator(func):
+        cached = {}  # backend -> cached function, built on first use
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            backend = _backend or (_streamlit_cache if in_streamlit() else memory_cache)
+            if backend not in cached:
+                with lock:  # concurrent first calls must share one cache
+                    if backend not in cached:
+                        cached[backend] = backend(func, ttl, max_entries)
+            return cached[backend](*args, **kwargs)
+
+        def clear():
+            with lock:
+                cached_funcs = list(cached.values())
+            for cached_func in cached_funcs:
+                cached_func.clear()
+
+        wrapper.clear = clear
+        return wrapper
+    return decorator
+
+
+def report_error(message: str):
+    """Show an error in the dashboard when running under Streamlit, log it otherwise"""
+    if in_streamlit():
+        import streamlit as st
+        st.error(message)
+    else:
+        logger.error(message)
@@ -0,0 +1,226 @@
+import os
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from modules.core.analytics import compute_metrics
+from modules.core.price_store import get_price_store, period_start
+from modules.Quant_A.strategies import ONLINE_STRATEGIES, OnlineStrategy
+from modules.Quant_B.rebalancing import simulate_rebalancing
+from modules.Quant_B.risk import historical_var
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPORT_DIR = os.environ.get(
+    "REPORT_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "reports")
+)
+
+# Quant B portfolios reported every day (override with --portfolios config.json)
+DEFAULT_PORTFOLIOS = [
+    {"name": "Tech equal weight", "tickers": ["AAPL", "MSFT", "GOOGL"], "rebalance": "month-end"},
+]
+
+REPORT_METRICS = ["Total Return (%)", "Annualized Return (%)", "Volatility (Annual %)", "Sharpe Ratio",
+                  "Max Drawdown (%)"]
+
+
+def _safe(name: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+
+
+def _write_atomic(path: str, text: str):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _truncate_rows(path: str, n_rows: int):
+    """Drop the rows written after the last saved state (a run stopped between the two writes)"""
+    table = pd.read_csv(path)
+    if len(table) > n_rows:
+        _write_atomic(path, table.iloc[:n_rows].to_csv(index=False))
+
+
+def _ticker_job(ticker: str, report_dir: str, period: str, initial_capital: float) -> list:
+    """
+    Advance every online strategy of one ticker by the bars added since the previous run
+
+    Strategy state lives in state/<ticker>/<strategy>.json and the backtest rows are
+    appended to equity/<ticker>__<strategy>.csv, so a daily run only processes the new bar.
+    The state is saved after the rows, and the file is cut back to the state's bar count on
+    load, so rerunning after a crash never duplicates rows. The bar of the current UTC day
+    is still moving (24/7 markets) and is left for the next run.
+    """
+    store = get_price_store()
+    state_dir = os.path.join(report_dir, "state", _safe(ticker))
+    equity_dir = os.path.join(report_dir, "equity")
+    os.makedirs(state_dir, exist_ok=True)
+    os.makedirs(equity_dir, exist_ok=True)
+
+    bars = store.read(ticker, "1d")
+    bars = bars[bars.index < pd.Timestamp.utcnow().tz_localize(None).normalize()]
+    rows = []
+    for name, cls in ONLINE_STRATEGIES.items():
+        state_path = os.path.join(state_dir, _safe(name) + ".json")
+        equity_path = os.path.join(equity_dir, f"{_safe(ticker)}__{_safe(name)}.csv")
+        if os.path.exists(state_path):
+            with open(state_path) as f:
+                strategy = OnlineStrategy.from_dict(json.load(f))
+            prices = bars["Close"]
+            if os.path.exists(equity_path):
+                _truncate_rows(equity_path, strategy.n_bars)
+        else:
+            strategy = cls(initial_capital=initial_capital)
+            start = period_start(period)
+            prices = bars["Close"] if start is None else bars["Close"][bars.index >= start]
+            if os.path.exists(equity_path):
+                os.remove(equity_path)  # no state: the equity file is rebuilt from scratch
+
+        if strategy.last_timestamp is not None:
+            prices = prices[prices.index > pd.Timestamp(strategy.last_timestamp)]
+        prices = prices.dropna()
+        new = [dict(Date=ts.strftime("%Y-%m-%d"), **strategy.update(float(p), ts.isoformat()))
+               for ts, p in zip(prices.index, prices.to_numpy(dtype=np.float64))]
+        if new:
+            pd.DataFrame(new).to_csv(equity_path, mode="a", header=not os.path.exists(equity_path), index=False)
+            _write_atomic(state_path, json.dumps(strategy.to_dict()))
+
+        row = {"Ticker": ticker, "Strategy": name, "Last Bar": strategy.last_timestamp, "New Bars": len(new),
+               "Signal": strategy.signal, "Portfolio Value": strategy.portfolio_value}
+        if os.path.exists(equity_path):
+            nav = pd.read_csv(equity_path, usecols=["Date", "Portfolio_Value"], index_col="Date")["Portfolio_Value"]
+            metrics = compute_metrics(nav, "nav", risk_free_rate=0.02).iloc[0]
+            row.update({m: metrics[m] for m in REPORT_METRICS})
+        rows.append(row)
+    return rows
+
+
+def _portfolio_job(portfolio: dict, report_dir: str, period: str) -> dict:
+    """NAV and metrics of one configured Quant B portfolio (vectorized, recomputed in full)"""
+    store = get_price_store()
+    tickers = portfolio["tickers"]
+    start = period_start(period)
+    prices = pd.DataFrame({t: store.read(t, "1d", start=start)["Close"] for t in tickers}).dropna(how="all")
+    if prices.empty:
+        return {"Portfolio": portfolio["name"], "Tickers": ", ".join(tickers)}
+
+    weights = np.asarray(portfolio.get("weights") or [1 / len(tickers)] * len(tickers), dtype=np.float64)
+    result = simulate_rebalancing(prices, weights / weights.sum(), rule=portfolio.get("rebalance"),
+                                  threshold=portfolio.get("threshold"), cost_bps=portfolio.get("cost_bps", 0.0),
+                                  start_capital=portfolio.get("start_capital", 1_000_000))
+    nav_dir = os.path.join(report_dir, "portfolios")
+    os.makedirs(nav_dir, exist_ok=True)
+    result.nav.to_frame("NAV").to_csv(os.path.join(nav_dir, _safe(portfolio["name"]) + ".csv"))
+
+    metrics = compute_metrics(result.nav, "nav").iloc[0]
+    row = {"Portfolio": portfolio["name"], "Tickers": ", ".join(tickers), "Last Bar": result.nav.index[-1],
+           "NAV": result.nav.iloc[-1], "Rebalances": len(result.rebalances)}
+    row.update({m: metrics[m] for m in REPORT_METRICS})
+    var, cvar = historical_var(result.nav.pct_change().dropna(), 0.95)
+    row.update({"VaR 95% (%)": var * 100, "CVaR 95% (%)": cvar * 100})
+    return row
+
+
+def _html(date: str, strategies: pd.DataFrame, portfolios: pd.DataFrame, elapsed: float) -> str:
+    style = ("body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;font-size:13px}"
+             "td,th{border:1px solid #ddd;padding:4px 8px;text-align:right}th{background:#f0f4f8}")
+    best = strategies.sort_values("Sharpe Ratio", ascending=False).head(20) if len(strategies) else strategies
+    return (f"<html><head><meta charset='utf-8'><title>Daily report {date}</title><style>{style}</style></head><body>"
+            f"<h1>Daily report — {date}</h1>"
+            f"<p>{strategies['Ticker'].nunique() if len(strategies) else 0} tickers, {len(strategies)} strategy runs, "
+            f"{len(portfolios)} portfolios, generated in {elapsed:.1f}s.</p>"
+            f"<h2>Portfolios</h2>{portfolios.to_html(index=False, float_format='{:,.2f}'.format)}"
+            f"<h2>Top strategies by Sharpe ratio</h2>{best.to_html(index=False, float_format='{:,.2f}'.format)}"
+            f"<h2>All strategies</h2>{strategies.to_html(index=False, float_format='{:,.2f}'.format)}"
+            "</body></html>")
+
+
+def generate_daily_report(tickers, portfolios=DEFAULT_PORTFOLIOS, report_dir: str = DEFAULT_REPORT_DIR,
+                          period: str = "5y", initial_capital: float = 10000, max_workers: int = None,
+                          batch_size: int = 200) -> str:
+    """
+    Run every online strategy on every ticker plus the configured portfolios and write the report
+
+    Prices are brought up to date through the price store in batches of `batch_size` tickers,
+    then tickers are processed on a process pool, each worker holding one ticker at a time.
+
+    Args:
+        tickers: single-asset universe
+        portfolios: list of {"name", "tickers", optional "weights", "rebalance", "threshold", "cost_bps"}
+        report_dir: output directory (state, equity files and one sub-directory per day)
+        period: history loaded the first time a ticker is seen
+        initial_capital: capital of each single-asset strategy
+        max_workers: pool size (default: CPU count); 0 runs in this process
+
+    Returns:
+        path of the HTML report
+    """
+    started = time.time()
+    store = get_price_store()
+    universe = list(dict.fromkeys(list(tickers) + [t for p in portfolios for t in p["tickers"]]))
+    for i in range(0, len(universe), batch_size):
+        try:
+            store.fetch_many(universe[i:i + batch_size], period=period)
+        except Exception as e:
+            logger.warning("Price update failed for %s: %s", universe[i:i + batch_size], e)
+
+    args = [(t, report_dir, period, initial_capital) for t in tickers]
+    if max_workers == 0:
+        outputs = [_ticker_job(*a) for a in args] + [_portfolio_job(p, report_dir, period) for p in portfolios]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count() or 1) as pool:
+            ticker_futures = [pool.submit(_ticker_job, *a) for a in args]
+            portfolio_futures = [pool.submit(_portfolio_job, p, report_dir, period) for p in portfolios]
+            outputs = [f.result() for f in ticker_futures] + [f.result() for f in portfolio_futures]
+
+    strategies = pd.DataFrame([row for rows in outputs[:len(tickers)] for row in rows])
+    portfolio_table = pd.DataFrame(outputs[len(tickers):])
+
+    date = pd.Timestamp.now().strftime("%Y-%m-%d")
+    day_dir = os.path.join(report_dir, date)
+    os.makedirs(day_dir, exist_ok=True)
+    strategies.to_csv(os.path.join(day_dir, "strategies.csv"), index=False)
+    portfolio_table.to_csv(os.path.join(day_dir, "portfolios.csv"), index=False)
+    try:
+        strategies.to_parquet(os.path.join(day_dir, "strategies.parquet"), index=False)
+        portfolio_table.to_parquet(os.path.join(day_dir, "portfolios.parquet"), index=False)
+    except ImportError:
+        logger.info("pyarrow / fastparquet not installed, Parquet output skipped")
+
+    html = _html(date, strategies, portfolio_table, time.time() - started)
+    path = os.path.join(day_dir, "report.html")
+    _write_atomic(path, html)
+    _write_atomic(os.path.join(report_dir, "latest.html"), html)
+    logger.info("Report for %d tickers written to %s in %.1fs", len(tickers), path, time.time() - started)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the daily strategy and portfolio report (no Streamlit)")
+    parser.add_argument("tickers", nargs="*", help="tickers to report (default: Quant A supported tickers)")
+    parser.add_argument("--portfolios", help="JSON file with a list of portfolios (default: built-in list)")
+    parser.add_argument("--output", default=DEFAULT_REPORT_DIR, help="report directory")
+    parser.add_argument("--period", default="5y", help="history loaded for tickers seen for the first time")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (0: no pool)")
+    args = parser.parse_args()
+
+    tickers = args.tickers
+    if not tickers:
+        from modules.Quant_A.data_fetcher import DataFetcher
+        tickers = list(DataFetcher().supported_tickers)
+    portfolios = DEFAULT_PORTFOLIOS
+    if args.portfolios:
+        with open(args.portfolios) as f:
+            portfolios = json.load(f)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    print(generate_daily_report(tickers, portfolios, args.output, args.period, max_workers=args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# Offline data and throwaway storage, set before the modules read their defaults
+_ROOT = tempfile.mkdtemp(prefix="quant_tests_")
+os.environ.setdefault("MARKET_DATA_PROVIDER", "synthetic")
+for name in ("PRICE_STORE_DIR", "BAR_BUFFER_DIR", "CORRELATION_CUBE_DIR", "REPORT_DIR"):
+    os.environ.setdefault(name, os.path.join(_ROOT, name.lower()))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
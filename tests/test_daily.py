@@ -0,0 +1,74 @@
+import os
+import json
+import pandas as pd
+import pytest
+from modules.core.price_store import get_price_store
+from modules.Quant_A.strategies import ONLINE_STRATEGIES
+from modules.reports import daily
+from modules.reports.daily import _safe, _ticker_job
+
+TICKER = "AAPL"
+
+
+class ShortStore:
+    """Price store that hides the last `drop` bars, as seen by an earlier daily run"""
+
+    def __init__(self, drop: int):
+        self.store = get_price_store()
+        self.drop = drop
+
+    def read(self, ticker, interval):
+        return self.store.read(ticker, interval).iloc[:-self.drop]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def prices():
+    get_price_store().fetch_many([TICKER], period="1y")
+
+
+def equity(report_dir, name):
+    return pd.read_csv(os.path.join(report_dir, "equity", f"{TICKER}__{_safe(name)}.csv"))
+
+
+def state(report_dir, name):
+    with open(os.path.join(report_dir, "state", TICKER, _safe(name) + ".json")) as f:
+        return json.load(f)
+
+
+def test_rerun_adds_no_rows(tmp_path):
+    report_dir = str(tmp_path)
+    first = _ticker_job(TICKER, report_dir, "1y", 10000)
+    tables = {name: equity(report_dir, name) for name in ONLINE_STRATEGIES}
+    second = _ticker_job(TICKER, report_dir, "1y", 10000)
+    assert all(row["New Bars"] == 0 for row in second)
+    for name in ONLINE_STRATEGIES:
+        pd.testing.assert_frame_equal(equity(report_dir, name), tables[name])
+        assert len(tables[name]) == state(report_dir, name)["n_bars"]
+    assert [row["Portfolio Value"] for row in first] == [row["Portfolio Value"] for row in second]
+
+
+def test_resume_matches_a_single_run(tmp_path, monkeypatch):
+    full_dir, resumed_dir = str(tmp_path / "full"), str(tmp_path / "resumed")
+    _ticker_job(TICKER, full_dir, "1y", 10000)
+    with monkeypatch.context() as m:
+        m.setattr(daily, "get_price_store", lambda: ShortStore(drop=10))
+        _ticker_job(TICKER, resumed_dir, "1y", 10000)
+    rows = _ticker_job(TICKER, resumed_dir, "1y", 10000)
+    assert all(row["New Bars"] == 10 for row in rows)
+    for name in ONLINE_STRATEGIES:
+        resumed = equity(resumed_dir, name)
+        assert resumed["Date"].is_unique
+        pd.testing.assert_frame_equal(resumed, equity(full_dir, name))
+
+
+def test_rows_written_before_a_crash_are_not_duplicated(tmp_path):
+    report_dir = str(tmp_path)
+    _ticker_job(TICKER, report_dir, "1y", 10000)
+    tables = {name: equity(report_dir, name) for name in ONLINE_STRATEGIES}
+    for name, table in tables.items():
+        # the run died after appending rows but before saving the state
+        path = os.path.join(report_dir, "equity", f"{TICKER}__{_safe(name)}.csv")
+        table.tail(5).to_csv(path, mode="a", header=False, index=False)
+    _ticker_job(TICKER, report_dir, "1y", 10000)
+    for name in ONLINE_STRATEGIES:
+        pd.testing.assert_frame_equal(equity(report_dir, name), tables[name])
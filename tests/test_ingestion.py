@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+from modules.core.ingestion import BarRingBuffer
+from modules.core.providers import SyntheticProvider
+
+
+def _bars(n, start="2026-01-05 14:30"):
+    return SyntheticProvider().download(["AAA"], "1m", start=pd.Timestamp(start))["AAA"].iloc[:n]
+
+
+def test_ring_buffer_round_trip(tmp_path):
+    bars = _bars(100)
+    writer = BarRingBuffer("AAA", "1m", capacity=256, directory=str(tmp_path))
+    writer.write(bars)
+    reader = BarRingBuffer.open("AAA", "1m", directory=str(tmp_path))
+    frame = reader.to_frame()
+    assert reader.count == 100
+    np.testing.assert_array_equal(frame.to_numpy(), bars.to_numpy())
+    assert (frame.index.tz_localize(None) == bars.index).all()
+
+
+def test_ring_buffer_wraps_and_refreshes_last_bar(tmp_path):
+    bars = _bars(300)
+    buffer = BarRingBuffer("AAA", "1m", capacity=64, directory=str(tmp_path))
+    for i in range(0, 300, 50):
+        buffer.write(bars.iloc[i:i + 50])
+    np.testing.assert_array_equal(buffer.to_frame().to_numpy(), bars.iloc[-64:].to_numpy())
+
+    revised = bars.iloc[-1:].copy()
+    revised["Close"] += 1.0  # the last (partial) bar gets its final value
+    buffer.write(revised)
+    assert buffer.count == 300
+    assert buffer.to_frame()["Close"].iloc[-1] == revised["Close"].iloc[-1]
+
+    buffer.write(bars.iloc[:10])  # older bars are ignored
+    assert buffer.count == 300
+    assert len(buffer.latest(5)) == 5
+
+
+def test_latest_returns_a_copy(tmp_path):
+    buffer = BarRingBuffer("AAA", "1m", capacity=64, directory=str(tmp_path))
+    buffer.write(_bars(10))
+    snapshot = buffer.latest()
+    buffer.write(_bars(20).iloc[10:])
+    assert not np.shares_memory(snapshot, buffer._bars)
+    assert len(snapshot) == 10
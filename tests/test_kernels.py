@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.core.providers import synthetic_panel
+from modules.Quant_A.kernels import rolling_mean, rolling_means, rolling_std
+from modules.Quant_A.strategies import TradingStrategies
+
+
+@pytest.fixture
+def prices():
+    price = synthetic_panel(1, 2000, seed=1).iloc[:, 0].to_numpy(copy=True)
+    price[[0, 1, 2, 500, 1203]] = np.nan  # leading gap (late listing) and isolated gaps
+    return price
+
+
+@pytest.mark.parametrize("window", [1, 2, 20, 63])
+def test_rolling_mean_matches_pandas(prices, window):
+    expected = pd.Series(prices).rolling(window).mean().to_numpy()
+    np.testing.assert_allclose(rolling_mean(prices, window), expected, rtol=1e-12, atol=1e-10)
+    np.testing.assert_allclose(rolling_means(prices, [window])[0], expected, rtol=1e-12, atol=1e-10)
+
+
+@pytest.mark.parametrize("window", [2, 20, 63])
+def test_rolling_std_matches_pandas(prices, window):
+    expected = pd.Series(prices).rolling(window).std().to_numpy()
+    np.testing.assert_allclose(rolling_std(prices, window), expected, rtol=1e-6, atol=1e-8)
+
+
+def test_rolling_std_is_stable_on_long_series():
+    rng = np.random.default_rng(0)
+    x = 1e4 + np.cumsum(rng.standard_normal(200_000)) * 0.01
+    exact = np.lib.stride_tricks.sliding_window_view(x, 20).std(axis=1, ddof=1)
+    np.testing.assert_allclose(rolling_std(x, 20)[19:], exact, atol=1e-9)
+
+
+def test_strategy_columns_match_pandas():
+    prices = synthetic_panel(1, 500, seed=3).iloc[:, 0]
+    result = TradingStrategies.sma_crossover(prices, 10, 30)
+    np.testing.assert_allclose(result["SMA_Short"], prices.rolling(10).mean(), rtol=1e-12)
+    np.testing.assert_allclose(result["SMA_Long"], prices.rolling(30).mean(), rtol=1e-12)
+    frame = result.to_frame()
+    pd.testing.assert_series_equal(result.iloc[-1], frame.iloc[-1])
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from sklearn.covariance import ledoit_wolf
+from modules.core.providers import synthetic_panel
+from modules.Quant_B import optimization
+from modules.Quant_B.optimization import RollingCovariance, cached_covariance, optimize_portfolio, risk_parity_weights
+
+
+@pytest.fixture
+def returns():
+    optimization._COV_CACHE.clear()
+    return synthetic_panel(6, 800, seed=9).pct_change().dropna()
+
+
+def assert_ledoit_wolf(returns, window, cov, mean):
+    tail = returns.to_numpy()[-window:]
+    np.testing.assert_allclose(cov, ledoit_wolf(tail)[0], rtol=1e-9, atol=1e-15)
+    np.testing.assert_allclose(mean, tail.mean(axis=0), rtol=1e-9, atol=1e-15)
+
+
+def test_rolling_covariance_matches_sklearn(returns):
+    est = RollingCovariance(returns.shape[1])
+    est.add(returns.to_numpy()[-252:])
+    assert_ledoit_wolf(returns, 252, est.covariance(), est.mean)
+    assert est.shrinkage() == pytest.approx(ledoit_wolf(returns.to_numpy()[-252:])[1], rel=1e-9)
+
+
+def test_incremental_updates_match_sklearn(returns):
+    window = 120
+    for end in [300, 301, 310, 420, 421, 600, len(returns)]:
+        cov, mean = cached_covariance(returns.iloc[:end], window)
+        assert_ledoit_wolf(returns.iloc[:end], window, cov, mean)
+
+
+def test_one_new_bar_updates_in_place(returns):
+    cached_covariance(returns.iloc[:400], 120)
+    est = next(iter(optimization._COV_CACHE.values()))[0]
+    updates = est.updates
+    cached_covariance(returns.iloc[:401], 120)
+    assert next(iter(optimization._COV_CACHE.values()))[0] is est
+    assert est.updates == updates + 2  # one bar in, one out
+
+
+def test_revised_bars_rebuild_the_estimate(returns):
+    cached_covariance(returns.iloc[:500], 200)
+    revised = returns.iloc[:520].copy()
+    revised.iloc[450] *= 2  # inside the cached window
+    cov, mean = cached_covariance(revised, 200)
+    assert_ledoit_wolf(revised, 200, cov, mean)
+
+
+def test_risk_parity_equal_contributions(returns):
+    cov = np.cov(returns.to_numpy().T)
+    w = risk_parity_weights(cov)
+    contributions = w * (cov @ w)
+    assert w.sum() == pytest.approx(1.0)
+    np.testing.assert_allclose(contributions, contributions.mean(), rtol=1e-4)
+
+
+def test_risk_parity_respects_max_weight(returns):
+    scaled = returns.copy()
+    scaled.iloc[:, 1:] *= 5  # the first asset is much less volatile, so it gets the largest weight
+    weights = optimize_portfolio(scaled, "Risk Parity", max_weight=0.3)
+    assert weights.sum() == pytest.approx(1.0)
+    assert weights.max() <= 0.3 + 1e-9
+    assert weights.iloc[0] == pytest.approx(0.3)
+
+
+@pytest.mark.parametrize("method", optimization.OPTIMIZERS)
+def test_optimizers_are_long_only_and_bounded(returns, method):
+    weights = optimize_portfolio(returns, method, max_weight=0.4)
+    assert weights.sum() == pytest.approx(1.0, abs=1e-6)
+    assert (weights >= -1e-9).all() and (weights <= 0.4 + 1e-6).all()
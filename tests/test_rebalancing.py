@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from modules.core.analytics import periods_per_year
+from modules.core.providers import synthetic_panel
+from modules.Quant_B.rebalancing import rebalance_positions, simulate_rebalancing
+
+
+def loop_nav(px, weights, positions=None, threshold=None, cost_bps=0.0, start_capital=1_000_000, listed=None):
+    """Bar-by-bar reference: hold shares, trade back to the targets (of listed assets) on rebalance bars"""
+    cost_rate = cost_bps / 1e4
+    listed = np.ones(px.shape, dtype=bool) if listed is None else listed
+    px = np.where(listed, px, 0.0)
+    shares = None
+    nav = np.empty(len(px))
+    for t in range(len(px)):
+        target = weights * listed[t] / (weights * listed[t]).sum()
+        if shares is None:
+            value = start_capital * (1 - cost_rate * np.abs(target).sum())
+            shares = value * target / np.where(listed[t], px[t], 1.0)
+        else:
+            value = shares @ px[t]
+            drifted = shares * px[t] / value
+            if (threshold is not None and np.abs(drifted - target).max() > threshold) or (
+                    threshold is None and t in positions):
+                value *= 1 - cost_rate * np.abs(drifted - target).sum()
+                shares = value * target / np.where(listed[t], px[t], 1.0)
+        nav[t] = shares @ px[t]
+    return nav
+
+
+@pytest.fixture
+def prices():
+    return synthetic_panel(4, 700, seed=11)
+
+
+WEIGHTS = np.array([0.4, 0.3, 0.2, 0.1])
+
+
+@pytest.mark.parametrize("rule", [None, 1, 21, "month-end", "quarter-end"])
+def test_periodic_matches_loop(prices, rule):
+    result = simulate_rebalancing(prices, WEIGHTS, rule=rule, cost_bps=10)
+    positions = set(rebalance_positions(prices.index, rule).tolist())
+    expected = loop_nav(prices.to_numpy(), WEIGHTS, positions=positions, cost_bps=10)
+    np.testing.assert_allclose(result.nav.to_numpy(), expected, rtol=1e-12)
+    assert len(result.rebalances) == len(positions)
+
+
+@pytest.mark.parametrize("threshold", [0.01, 0.05])
+def test_drift_threshold_matches_loop(prices, threshold):
+    result = simulate_rebalancing(prices, WEIGHTS, threshold=threshold, cost_bps=5)
+    expected = loop_nav(prices.to_numpy(), WEIGHTS, threshold=threshold, cost_bps=5)
+    np.testing.assert_allclose(result.nav.to_numpy(), expected, rtol=1e-12)
+
+
+def test_cash_sleeve_accrues_rate(prices):
+    result = simulate_rebalancing(prices, WEIGHTS, rule=21, cash_weight=0.2, cash_rate=0.03)
+    cash = (1.03) ** (np.arange(len(prices)) / periods_per_year("1d"))
+    px = np.column_stack([prices.to_numpy(), cash])
+    weights = np.append(WEIGHTS * 0.8, 0.2)
+    positions = set(rebalance_positions(prices.index, 21).tolist())
+    np.testing.assert_allclose(result.nav.to_numpy(), loop_nav(px, weights, positions=positions), rtol=1e-12)
+
+
+def test_late_listing_is_bought_at_next_rebalance(prices):
+    late = prices.copy()
+    late.iloc[:100, 3] = np.nan
+    result = simulate_rebalancing(late, WEIGHTS, rule=40, cost_bps=10)
+    listed = ~late.isna().to_numpy()
+    expected = loop_nav(prices.to_numpy(), WEIGHTS, positions=set(range(0, 700, 40)), cost_bps=10,
+                        listed=listed)
+    np.testing.assert_allclose(result.nav.to_numpy(), expected, rtol=1e-12)
+    # not held before it lists: the first rebalance after bar 100 (bar 120) buys it
+    first_full = loop_nav(prices.to_numpy()[:120, :3], WEIGHTS[:3] / WEIGHTS[:3].sum(), positions={0, 40, 80},
+                          cost_bps=10)
+    np.testing.assert_allclose(result.nav.iloc[:120].to_numpy(), first_full, rtol=1e-12)
+
+
+@pytest.mark.parametrize("rule", [0, -5])
+def test_non_positive_period_is_rejected(prices, rule):
+    with pytest.raises(ValueError):
+        simulate_rebalancing(prices, WEIGHTS, rule=rule)
+
+
+def test_unknown_calendar_rule_is_rejected(prices):
+    with pytest.raises(ValueError):
+        rebalance_positions(prices.index, "week-end")
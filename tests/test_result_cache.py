@@ -0,0 +1,83 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from modules.core.result_cache import ResultCache, data_version, make_key
+
+
+def block(n=1000):
+    return np.zeros(n)  # 8 kB per 1000 floats
+
+
+def test_lru_eviction_by_bytes():
+    cache = ResultCache(max_bytes=20_000)
+    cache.put("a", block())
+    cache.put("b", block())
+    assert cache.get("a") is not None  # a is now the most recent
+    cache.put("c", block())
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.bytes == 16_000
+    assert cache.stats["evictions"] == 1
+
+
+def test_oversized_value_is_not_kept():
+    cache = ResultCache(max_bytes=1000)
+    value = block()
+    assert cache.put("big", value) is value
+    assert cache.get("big") is None and cache.bytes == 0
+
+
+def test_spilled_entries_reload_from_disk(tmp_path):
+    cache = ResultCache(max_bytes=10_000, spill_dir=str(tmp_path))
+    frame = pd.DataFrame({"x": np.arange(1000.0)})
+    cache.put("quant_b:frame", frame)
+    cache.put("quant_b:other", block())  # evicts and spills the frame
+    assert cache.stats["spills"] == 1
+    pd.testing.assert_frame_equal(cache.get("quant_b:frame"), frame)
+    assert cache.stats["disk_hits"] == 1
+    assert cache.get("missing") is None
+    assert cache.stats["misses"] == 1
+
+
+def test_get_or_compute_is_single_flight():
+    cache = ResultCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return block()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("test:key", compute)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+
+
+def test_failed_computation_is_not_cached():
+    cache = ResultCache()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("test:fail", fail)
+    assert cache.get_or_compute("test:fail", lambda: 42) == 42
+
+
+def test_keys_follow_the_data():
+    prices = pd.Series([1.0, 2.0, 3.0], index=pd.date_range("2024-01-01", periods=3))
+    revised = prices.copy()
+    revised.iloc[-1] = 3.5
+    assert data_version(prices) == data_version(prices.copy())
+    assert data_version(prices) != data_version(revised)
+    assert make_key("quant_a.backtest", "AAPL", {"b": 1, "a": 2}, prices) == \
+        make_key("quant_a.backtest", "AAPL", {"a": 2, "b": 1}, prices.copy())
+    assert make_key("quant_a.backtest", "AAPL", prices) != make_key("quant_a.backtest", "AAPL", revised)
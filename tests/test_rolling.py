@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.core.rolling import rolling_metrics, sliding_max, sliding_max_drawdown
+
+WINDOW = 63
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(2)
+    return pd.Series(rng.standard_normal(1500) * 0.01, index=pd.bdate_range("2020-01-01", periods=1500))
+
+
+def test_rolling_metrics_match_pandas(returns):
+    got = rolling_metrics(returns, WINDOW, risk_free_rate=0.02)
+    roll = returns.rolling(WINDOW)
+    std = roll.std()
+    nav = (1 + returns).cumprod()
+    peak = nav.rolling(WINDOW, min_periods=1).max()
+    expected = pd.DataFrame({
+        "Rolling Return (%)": ((1 + returns).rolling(WINDOW).apply(np.prod, raw=True) - 1) * 100,
+        "Rolling Volatility (%)": std * np.sqrt(252) * 100,
+        "Rolling Sharpe": np.sqrt(252) * (roll.mean() - 0.02 / 252) / std,
+        "Rolling Win Rate (%)": (returns > 0).astype(float).rolling(WINDOW).mean() * 100,
+        "Drawdown (%)": (nav / peak - 1) * 100,
+        "Rolling Max Drawdown (%)": nav.rolling(WINDOW).apply(lambda v: (v / np.maximum.accumulate(v)).min() - 1,
+                                                             raw=True) * 100,
+    })
+    pd.testing.assert_frame_equal(got, expected, check_exact=False, rtol=1e-10, atol=1e-10, check_freq=False)
+
+
+def test_chunked_feed_gives_the_same_output(returns):
+    whole = rolling_metrics(returns, WINDOW)
+    chunked = rolling_metrics(returns, WINDOW, chunk_size=97)
+    np.testing.assert_allclose(chunked.to_numpy(), whole.to_numpy(), rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize("window", [1, 2, 7, 64])
+def test_sliding_extrema_match_brute_force(window):
+    x = np.cumsum(np.random.default_rng(window).standard_normal(200))
+    views = np.lib.stride_tricks.sliding_window_view(x, window)
+    np.testing.assert_array_equal(sliding_max(x, window), views.max(axis=1))
+    falls = [(v - np.maximum.accumulate(v)).min() for v in views]
+    np.testing.assert_allclose(sliding_max_drawdown(x, window), falls, atol=1e-12)
@@ -0,0 +1,62 @@
+import os
+import numpy as np
+import pytest
+from modules.core.providers import synthetic_panel
+from modules.Quant_B.rolling_correlation import cube_path, evict_cubes, rolling_correlation_cube
+
+
+@pytest.fixture
+def returns():
+    return synthetic_panel(5, 400, seed=13).pct_change().dropna()
+
+
+@pytest.mark.parametrize("budget", [256, 0.01])  # one chunk, then many small ones
+def test_cube_matches_pandas(returns, tmp_path, budget):
+    window = 30
+    cube = rolling_correlation_cube(returns, window, path=str(tmp_path / "corr.npy"), memory_budget_mb=budget)
+    expected = returns.rolling(window).corr().to_numpy().reshape(len(returns), 5, 5)
+    assert np.isnan(cube.cube[:window - 1]).all()
+    np.testing.assert_allclose(cube.cube[window - 1:], expected[window - 1:], atol=1e-6)
+    np.testing.assert_allclose(cube.pair(returns.columns[0], returns.columns[3]).iloc[window - 1:],
+                               expected[window - 1:, 0, 3], atol=1e-6)
+    np.testing.assert_allclose(cube.at(returns.index[200]).to_numpy(), expected[200], atol=1e-6)
+
+
+def test_betas_match_pandas(returns, tmp_path):
+    window = 40
+    benchmark = returns.iloc[:, 0] * 0.5 + returns.iloc[:, 1] * 0.5
+    cube = rolling_correlation_cube(returns, window, benchmark=benchmark, path=str(tmp_path / "corr.npy"))
+    expected = returns.rolling(window).cov(benchmark).div(benchmark.rolling(window).var(), axis=0)
+    np.testing.assert_allclose(cube.betas.iloc[window - 1:], expected.iloc[window - 1:], rtol=1e-5, atol=1e-6)
+
+
+def test_average_is_mean_off_diagonal(returns, tmp_path):
+    window = 30
+    cube = rolling_correlation_cube(returns, window, path=str(tmp_path / "corr.npy"))
+    corr = returns.rolling(window).corr().to_numpy().reshape(len(returns), 5, 5)
+    expected = (corr.sum(axis=(1, 2)) - 5) / 20
+    np.testing.assert_allclose(cube.average().iloc[window - 1:], expected[window - 1:], atol=1e-6)
+
+
+def test_existing_cube_is_reused(returns, tmp_path):
+    path = cube_path(returns, 30, returns.mean(axis=1), directory=str(tmp_path))
+    first = rolling_correlation_cube(returns, 30, path=path)
+    mtime = os.path.getmtime(path)
+    os.utime(path, (mtime - 100, mtime - 100))
+    second = rolling_correlation_cube(returns, 30, path=path)
+    assert os.path.getmtime(path) > mtime - 100  # touched for the eviction order, not rebuilt
+    np.testing.assert_array_equal(np.asarray(first.cube), np.asarray(second.cube))
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_eviction_keeps_recent_cubes_within_budget(returns, tmp_path):
+    paths = []
+    for i, window in enumerate([20, 30, 40]):
+        path = cube_path(returns, window, directory=str(tmp_path))
+        rolling_correlation_cube(returns, window, path=path)
+        os.utime(path, (1000 + i, 1000 + i))  # oldest first
+        paths.append(path)
+    size = os.path.getsize(paths[0]) + os.path.getsize(paths[0][:-4] + "_beta.npy")
+    evict_cubes(str(tmp_path), budget_mb=1.5 * size / 2 ** 20, keep=paths[0])
+    assert [os.path.exists(p) for p in paths] == [True, False, False]
+    assert not os.path.exists(paths[1][:-4] + "_beta.npy")